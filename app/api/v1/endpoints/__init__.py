@@ -1,2 +1,76 @@
-from . import ping, dig, whois, nslookup, traceroute, dns_full, nmap
-__all__ = ["ping", "dig", "whois", "nslookup", "traceroute", "dns_full", "nmap"]
+import importlib
+from types import ModuleType
+from typing import Dict
+
+# Routeurs importés à la demande (voir app.services.tool_registry.ENDPOINTS) :
+# le module d'un outil inutilisable n'est jamais chargé
+__all__ = ["ping", "dig", "whois", "nslookup", "traceroute", "dns_full", "nmap", "monitoring"]
+
+# Préfixe d'URL des routes de chaque module
+PREFIXES = {
+    "ping": "/v1/ping",
+    "dig": "/v1/dig",
+    "nslookup": "/v1/nslookup",
+    "dns_full": "/v1/dns-full",
+    "whois": "/v1/whois",
+    "traceroute": "/v1/traceroute",
+    "nmap": "/v1/nmap",
+    "monitoring": "/v1/monitoring",
+}
+
+
+def load(name: str) -> ModuleType:
+    return importlib.import_module(f"{__name__}.{name}")
+
+
+def __getattr__(name: str) -> ModuleType:
+    if name in __all__:
+        return load(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class LazyRouters:
+    """
+    Routeurs déclarés au démarrage et inclus dans l'application à la première requête
+    sur leur préfixe (ou à la première demande du schéma OpenAPI) : le module de
+    l'endpoint, et les services qu'il utilise, ne sont importés qu'à ce moment.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.pending: Dict[str, str] = {}  # module → tag OpenAPI
+
+    def add(self, name: str, tag: str) -> None:
+        self.pending[name] = tag
+
+    def load(self, name: str) -> None:
+        tag = self.pending.pop(name)
+        self.app.include_router(load(name).router, prefix="/v1", tags=[tag])
+        self.app.openapi_schema = None  # schéma recalculé avec les nouvelles routes
+
+    def load_all(self) -> None:
+        for name in list(self.pending):
+            self.load(name)
+
+    def load_path(self, path: str) -> None:
+        if path == self.app.openapi_url:
+            return self.load_all()
+        for name in list(self.pending):
+            prefix = PREFIXES[name]
+            if path == prefix or path.startswith(prefix + "/"):
+                self.load(name)
+
+
+class LazyRouterMiddleware:
+    """
+    Middleware ASGI : charge le routeur de la route demandée avant le routage.
+    """
+
+    def __init__(self, app, routers: LazyRouters):
+        self.app = app
+        self.routers = routers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and self.routers.pending:
+            self.routers.load_path(scope["path"])
+        await self.app(scope, receive, send)
@@ -1,13 +1,43 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from app.services.dig_service import DigService
-from app.models.response_model import CommandResponse
+from app.core.batch import expand_targets
+from app.services.batch_service import stream_batch
+from app.services.dns_resolver import RECORD_TYPES, DNSResolverError, cache_ttl, validate_server
+from app.models.output_model import DigResponse
+from app.core.responses import OutputFormat
+from app.models.batch_model import DigBatchRequest
 
 router = APIRouter()
 
-@router.get("/dig", response_model=CommandResponse)
-def dig_lookup(
+@router.get("/dig", response_model=DigResponse)
+async def dig_lookup(
     host: str = Query(..., description="Nom de domaine à interroger"),
-    record_type: str = Query("A", description="Type d'enregistrement DNS (A, MX, TXT, NS, etc.)")
+    record_type: str = Query("A", description="Type d'enregistrement DNS (A, AAAA, MX, TXT, NS, SOA, PTR)"),
+    dns_server: str = Query(None, description="Adresse IP du serveur DNS à utiliser (ex: 8.8.8.8)"),
+    output_format: OutputFormat = Depends()
 ):
+    not_modified = output_format.not_modified()
+    if not_modified is not None:
+        return not_modified
     service = DigService()
-    return service.run(host, record_type)
+    result = await service.run(host, record_type, dns_server)
+    # Valide tant que la réponse DNS l'est : TTL minimal des enregistrements
+    return output_format.render(result, max_age=cache_ttl(result.output) if result.success else None)
+
+@router.post("/dig/batch", summary="Requêtes DNS sur un lot d'hôtes (résultats en NDJSON)")
+async def dig_batch(request: DigBatchRequest):
+    try:
+        targets = expand_targets(request.hosts, request.cidr)
+        if request.record_type.upper() not in RECORD_TYPES:
+            raise ValueError(f"Type d'enregistrement non supporté : '{request.record_type}'")
+        if request.dns_server:
+            validate_server(request.dns_server)
+    except (ValueError, DNSResolverError) as e:
+        return JSONResponse(status_code=400, content={"success": False, "error": str(e)})
+
+    service = DigService()
+    return StreamingResponse(
+        stream_batch(targets, lambda host: service.run(host, request.record_type, request.dns_server)),
+        media_type="application/x-ndjson"
+    )
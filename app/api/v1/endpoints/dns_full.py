@@ -1,12 +1,19 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Query
 from app.services.dns_full_service import DNSFullService
-from app.models.response_model import CommandResponse
+from app.models.output_model import DnsFullResponse
+from app.core.responses import OutputFormat
 
 router = APIRouter()
 
-@router.get("/dns-full", response_model=CommandResponse)
-def dns_full_lookup(
+@router.get("/dns-full", response_model=DnsFullResponse)
+async def dns_full_lookup(
     host: str = Query(..., description="Nom de domaine à interroger"),
-    dns_server: str = Query(None, description="Adresse IP du serveur DNS à utiliser (ex: 8.8.8.8)")
+    dns_server: str = Query(None, description="Adresse IP du serveur DNS à utiliser (ex: 8.8.8.8)"),
+    output_format: OutputFormat = Depends()
 ):
-    return DNSFullService().run(host, dns_server)
+    not_modified = output_format.not_modified()
+    if not_modified is not None:
+        return not_modified
+    service = DNSFullService()
+    result = await service.run(host, dns_server)
+    return output_format.render(result, max_age=service.max_age(result.output) if result.success else None)
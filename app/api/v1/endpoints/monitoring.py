@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Query
+from fastapi.responses import JSONResponse
+from app.models.response_model import CommandResponse
+from app.models.monitoring_model import CheckRequest
+from app.services.monitoring import scheduler, MonitorLimitReached
+
+router = APIRouter()
+
+def not_found() -> JSONResponse:
+    return JSONResponse(status_code=404, content={"success": False, "error": "Vérification introuvable"})
+
+@router.post("/monitoring/checks", response_model=CommandResponse, status_code=201, summary="Planifier une vérification périodique")
+async def create_check(request: CheckRequest):
+    """
+    Enregistre une vérification (ping ou dig) exécutée en continu par l'API.
+
+    - Les exécutions sont étalées dans le temps et réalisées par un pool borné de workers
+    - L'historique est consultable via /v1/monitoring/checks/{check_id}/history
+    """
+    options = {"record_type": request.record_type, "dns_server": request.dns_server} if request.tool == "dig" else {}
+    try:
+        check = scheduler.add(request.tool, request.target, request.interval, options)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"success": False, "error": str(e)})
+    except MonitorLimitReached as e:
+        return JSONResponse(status_code=503, content={"success": False, "error": str(e)})
+    return CommandResponse(success=True, output=check.to_dict(), error=None)
+
+@router.get("/monitoring/checks", response_model=CommandResponse, summary="Lister les vérifications")
+async def list_checks(
+    offset: int = Query(0, ge=0, description="Index de la première vérification"),
+    limit: int = Query(100, ge=1, le=1000, description="Nombre maximal de vérifications")
+):
+    checks = list(scheduler.checks.values())[offset:offset + limit]
+    return CommandResponse(success=True, output={
+        "total": len(scheduler.checks),
+        "checks": [check.to_dict() for check in checks]
+    }, error=None)
+
+@router.get("/monitoring/checks/{check_id}", response_model=CommandResponse, summary="Détail d'une vérification")
+async def get_check(check_id: str):
+    check = scheduler.get(check_id)
+    if check is None:
+        return not_found()
+    return CommandResponse(success=True, output=check.to_dict(), error=None)
+
+@router.delete("/monitoring/checks/{check_id}", response_model=CommandResponse, summary="Supprimer une vérification")
+async def delete_check(check_id: str):
+    check = scheduler.remove(check_id)
+    if check is None:
+        return not_found()
+    return CommandResponse(success=True, output={"id": check.id}, error=None)
+
+@router.get("/monitoring/checks/{check_id}/history", response_model=CommandResponse, summary="Historique d'une vérification")
+async def check_history(
+    check_id: str,
+    resolution: str = Query("raw", description="Résolution : raw | 1m | 1h"),
+    since: int = Query(0, ge=0, description="Horodatage Unix de début (secondes)")
+):
+    """
+    Mesures brutes récentes, ou agrégats par minute / heure (count, failures, min, avg, max en ms).
+    """
+    check = scheduler.get(check_id)
+    if check is None:
+        return not_found()
+    try:
+        points = check.series.history(resolution, since)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"success": False, "error": str(e)})
+    return CommandResponse(success=True, output={"id": check.id, "resolution": resolution, "points": points}, error=None)
@@ -1,14 +1,66 @@
-from fastapi import APIRouter, Query
-from app.services.nmap_service import NmapService
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.services.nmap_service import NMAP_HTTP_MAX_AGE, NmapService
+from app.services.nmap_jobs import job_manager, JobQueueFull
+from app.services.streaming import STREAM_MEDIA_TYPES, encode_stream
 from app.models.response_model import CommandResponse
+from app.models.output_model import NmapResponse
+from app.core.responses import OutputFormat
 
 router = APIRouter()
 
-@router.get("/nmap", response_model=CommandResponse)
-def nmap_scan(
+@router.get("/nmap", response_model=NmapResponse)
+async def nmap_scan(
     host: str = Query(..., description="Cible à scanner (IP ou nom de domaine)"),
     scan_mode: str = Query("top100", description="Mode de scan : top100 | all | custom"),
     ports: str = Query(None, description="Ports à scanner si custom"),
-    only_open: bool = Query(False, description="Afficher uniquement les ports ouverts")
+    only_open: bool = Query(False, description="Afficher uniquement les ports ouverts"),
+    stream: str = Query(None, description="Diffusion des ports au fil de l'eau : ndjson | sse"),
+    max_age: int = Query(None, ge=0, description="Réutiliser un scan identique de moins de max_age secondes (hors diffusion)"),
+    output_format: OutputFormat = Depends()
 ):
-    return NmapService().run(host, scan_mode, ports, only_open)
\ No newline at end of file
+    if stream:
+        if stream not in STREAM_MEDIA_TYPES:
+            return JSONResponse(status_code=400, content={"success": False, "error": "Paramètre invalide : 'stream'"})
+        return StreamingResponse(
+            encode_stream(NmapService().stream(host, scan_mode, ports, only_open), stream),
+            media_type=STREAM_MEDIA_TYPES[stream]
+        )
+    not_modified = output_format.not_modified()
+    if not_modified is not None:
+        return not_modified
+    result = await NmapService().run(host, scan_mode, ports, only_open, max_age)
+    # Un scan réutilisé depuis le stockage est déjà âgé de cache_age secondes
+    cache_age = result.output.get("cache_age", 0) if isinstance(result.output, dict) else 0
+    return output_format.render(result, max_age=max(NMAP_HTTP_MAX_AGE - cache_age, 0))
+
+@router.post("/nmap/jobs", response_model=CommandResponse, status_code=202, summary="Lancer un scan nmap en tâche de fond")
+async def nmap_submit_job(
+    host: str = Query(..., description="Cible à scanner (IP ou nom de domaine)"),
+    scan_mode: str = Query("top100", description="Mode de scan : top100 | all | custom"),
+    ports: str = Query(None, description="Ports à scanner si custom"),
+    only_open: bool = Query(False, description="Afficher uniquement les ports ouverts"),
+    priority: int = Query(5, ge=0, le=9, description="Priorité (0 = la plus haute)")
+):
+    """
+    Place le scan en file d'attente et retourne immédiatement l'identifiant de la tâche.
+    """
+    try:
+        job = job_manager.submit(host, scan_mode, ports, only_open, priority)
+    except JobQueueFull as e:
+        return JSONResponse(status_code=503, content={"success": False, "error": str(e)})
+    return CommandResponse(success=True, output={"job_id": job["id"], "status": job["status"]}, error=None)
+
+@router.get("/nmap/jobs/{job_id}", response_model=CommandResponse, summary="Statut et résultat d'un scan")
+async def nmap_get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"success": False, "error": "Tâche introuvable"})
+    return CommandResponse(success=True, output=job, error=None)
+
+@router.delete("/nmap/jobs/{job_id}", response_model=CommandResponse, summary="Annuler un scan")
+async def nmap_cancel_job(job_id: str):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"success": False, "error": "Tâche introuvable"})
+    return CommandResponse(success=True, output={"job_id": job["id"], "status": job["status"]}, error=None)
@@ -1,9 +1,34 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from app.services.nslookup_service import NslookupService
-from app.models.response_model import CommandResponse
+from app.core.batch import expand_targets
+from app.services.batch_service import stream_batch
+from app.services.dns_resolver import DNSResolverError, validate_server
+from app.models.output_model import NslookupResponse
+from app.core.responses import OutputFormat
+from app.models.batch_model import NslookupBatchRequest
 
 router = APIRouter()
 
-@router.get("/nslookup", response_model=CommandResponse)
-def nslookup_lookup(host: str = Query(..., description="Nom de domaine ou IP")):
-    return NslookupService().run(host)
\ No newline at end of file
+@router.get("/nslookup", response_model=NslookupResponse)
+async def nslookup_lookup(
+    host: str = Query(..., description="Nom de domaine ou IP"),
+    dns_server: str = Query(None, description="Adresse IP du serveur DNS à utiliser (ex: 8.8.8.8)"),
+    output_format: OutputFormat = Depends()
+):
+    return output_format.render(await NslookupService().run(host, dns_server))
+
+@router.post("/nslookup/batch", summary="nslookup sur un lot d'hôtes (résultats en NDJSON)")
+async def nslookup_batch(request: NslookupBatchRequest):
+    try:
+        targets = expand_targets(request.hosts, request.cidr)
+        if request.dns_server:
+            validate_server(request.dns_server)
+    except (ValueError, DNSResolverError) as e:
+        return JSONResponse(status_code=400, content={"success": False, "error": str(e)})
+
+    service = NslookupService()
+    return StreamingResponse(
+        stream_batch(targets, lambda host: service.run(host, request.dns_server)),
+        media_type="application/x-ndjson"
+    )
@@ -1,29 +1,60 @@
 from fastapi import APIRouter, Query, Depends, HTTPException
-from app.models.response_model import CommandResponse
-from app.services.ping_service import execute_ping
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.models.output_model import PingResponse
+from app.core.responses import OutputFormat
+from app.models.batch_model import PingBatchRequest
+from app.services.ping_service import execute_ping, measure_ping, add_statistics
+from app.core.batch import expand_targets
+from app.services.batch_service import stream_batch
 from typing import Optional
 from app.core.security_middleware import validate_api_key, check_permissions
 
 router = APIRouter()
 
-@router.get("/ping", response_model=CommandResponse, summary="Vérifier la connectivité d'un hôte")
+@router.get("/ping", response_model=PingResponse, summary="Vérifier la connectivité d'un hôte")
 async def ping(
     host: str = Query(..., description="Nom d'hôte ou adresse IP à pinger"),
     count: Optional[int] = Query(4, description="Nombre de paquets à envoyer", ge=1, le=10),
     timeout: Optional[int] = Query(2, description="Délai d'attente en secondes", ge=1, le=5),
-    api_key: str = Depends(validate_api_key)
+    raw_output: bool = Query(True, description="Inclure la sortie brute de la commande"),
+    api_key: str = Depends(validate_api_key),
+    output_format: OutputFormat = Depends()
 ):
     """
     Vérifie la connectivité réseau avec un hôte distant en utilisant la commande PING.
     
     - Renvoie les temps de réponse et statistiques de perte de paquets
+    - RTT par paquet, gigue, écart type et percentiles (p50, p95, p99)
     - Utile pour vérifier si un serveur est en ligne et répondant
     """
     try:
         # L'authentification est déjà vérifiée par le middleware et la dépendance validate_api_key
-        result = await execute_ping(host, count, timeout)
-        return result
+        result = await execute_ping(host, count, timeout, raw_output)
+        return output_format.render(result)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erreur lors de l'exécution du ping: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Erreur lors de l'exécution du ping: {str(e)}")
+
+@router.post("/ping/batch", summary="Pinger un lot d'hôtes (résultats en NDJSON)")
+async def ping_batch(request: PingBatchRequest):
+    """
+    Ping une liste d'hôtes et/ou un bloc CIDR en parallèle.
+
+    - Une ligne JSON par cible, envoyée dès que son ping est terminé
+    - Authentification et validation effectuées une seule fois pour tout le lot
+    """
+    try:
+        targets = expand_targets(request.hosts, request.cidr)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"success": False, "error": str(e)})
+
+    return StreamingResponse(
+        stream_batch(
+            targets,
+            lambda host: measure_ping(host, request.count, request.timeout),
+            # Statistiques calculées ensemble pour les hôtes terminés au même moment
+            finalize=lambda responses: add_statistics(responses, request.raw_output)
+        ),
+        media_type="application/x-ndjson"
+    )
@@ -1,11 +1,23 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from app.services.traceroute_service import TracerouteService
-from app.models.response_model import CommandResponse
+from app.services.streaming import STREAM_MEDIA_TYPES, encode_stream
+from app.models.output_model import TracerouteResponse
+from app.core.responses import OutputFormat
 
 router = APIRouter()
 
-@router.get("/traceroute", response_model=CommandResponse)
-def trace_route(
-    host: str = Query(..., description="Hôte ou domaine à tracer")
+@router.get("/traceroute", response_model=TracerouteResponse)
+async def trace_route(
+    host: str = Query(..., description="Hôte ou domaine à tracer"),
+    stream: str = Query(None, description="Diffusion des sauts au fil de l'eau : ndjson | sse"),
+    output_format: OutputFormat = Depends()
 ):
-    return TracerouteService().run(host)
+    if stream:
+        if stream not in STREAM_MEDIA_TYPES:
+            return JSONResponse(status_code=400, content={"success": False, "error": "Paramètre invalide : 'stream'"})
+        return StreamingResponse(
+            encode_stream(TracerouteService().stream(host), stream),
+            media_type=STREAM_MEDIA_TYPES[stream]
+        )
+    return output_format.render(await TracerouteService().run(host))
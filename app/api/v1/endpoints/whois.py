@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Query
-from app.services.whois_service import WhoisService
-from app.models.response_model import CommandResponse
+from fastapi import APIRouter, Depends, Query
+from app.services.whois_service import WHOIS_HTTP_MAX_AGE, WhoisService
+from app.models.output_model import WhoisResponse
+from app.core.responses import OutputFormat
 
 router = APIRouter()
 
-@router.get("/whois", response_model=CommandResponse)
-def whois_lookup(
-    domain: str = Query(..., description="Nom de domaine à interroger (ex: google.com)")
+@router.get("/whois", response_model=WhoisResponse)
+async def whois_lookup(
+    domain: str = Query(..., description="Nom de domaine à interroger (ex: google.com)"),
+    parsed: bool = Query(False, description="Ajouter les champs principaux (registrar, dates, serveurs de noms) au texte brut"),
+    output_format: OutputFormat = Depends()
 ):
+    not_modified = output_format.not_modified()
+    if not_modified is not None:
+        return not_modified
     service = WhoisService()
-    return service.run(domain)
+    return output_format.render(await service.run(domain, parsed), max_age=WHOIS_HTTP_MAX_AGE)
@@ -0,0 +1,185 @@
+import atexit
+import json
+import os
+import queue
+import random
+import time
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 📝 Configuration des journaux (écriture disque hors de la boucle d'événements)
+LOG_DIR = os.getenv("LOG_DIR", "logs")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 5))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", 1.0))
+
+access_logger = logging.getLogger("api-access")
+security_logger = logging.getLogger("api-security")
+access_logger.setLevel(LOG_LEVEL)
+security_logger.setLevel(LOG_LEVEL)
+
+# Temps passé dans les outils (processus, requêtes DNS, ICMP) pour la requête en cours
+_tool_runtime: ContextVar[Optional[List[float]]] = ContextVar("tool_runtime", default=None)
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Une ligne JSON par enregistrement ; le message d'accès est déjà un dictionnaire.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {"time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds")}
+        if isinstance(record.msg, dict):
+            entry.update(record.msg)
+        else:
+            entry.update(level=record.levelname, message=record.getMessage())
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Met l'enregistrement en file sans le formater : le formatage se fait dans le thread d'écriture.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass  # sous forte charge, on perd une ligne plutôt que de bloquer la requête
+
+
+class _RotatingFileHandler(RotatingFileHandler):
+    """
+    Rotation décidée sur la taille courante du fichier, sans formater deux fois chaque ligne.
+    """
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.stream is None:
+            self.stream = self._open()
+        return 0 < self.maxBytes <= self.stream.tell()
+
+
+def _file_handler(name: str, formatter: logging.Formatter) -> RotatingFileHandler:
+    handler = _RotatingFileHandler(
+        os.path.join(LOG_DIR, name), maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT,
+        encoding="utf-8", delay=True
+    )
+    handler.setFormatter(formatter)
+    return handler
+
+
+def setup_logging() -> QueueListener:
+    """
+    Branche les journaux de sécurité (api.log) et d'accès (access.log) sur une file
+    vidée par un thread dédié.
+    """
+    os.makedirs(LOG_DIR, exist_ok=True)
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+
+    security_handler = _file_handler("api.log", logging.Formatter("[%(asctime)s] %(levelname)s: %(message)s"))
+    access_handler = _file_handler("access.log", JSONFormatter())
+    # Chaque fichier ne reçoit que les enregistrements de son journal
+    security_handler.addFilter(lambda record: record.name != access_logger.name)
+    access_handler.addFilter(lambda record: record.name == access_logger.name)
+
+    for logger in (security_logger, access_logger):
+        logger.addHandler(_DeferredQueueHandler(log_queue))
+        logger.propagate = False
+
+    listener = QueueListener(log_queue, security_handler, access_handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+listener: Optional[QueueListener] = None
+
+
+def start_logging() -> None:
+    """
+    Démarre l'écriture des journaux (lifespan de l'application) : importer l'application
+    n'ouvre aucun fichier.
+    """
+    global listener
+    if listener is None:
+        listener = setup_logging()
+
+
+def stop_logging() -> None:
+    """
+    Vide la file, arrête le thread d'écriture et détache les journaux.
+    """
+    global listener
+    if listener is None:
+        return
+    listener.stop()
+    for logger in (security_logger, access_logger):
+        logger.handlers = [handler for handler in logger.handlers if not isinstance(handler, _DeferredQueueHandler)]
+        logger.propagate = True
+    for handler in listener.handlers:
+        handler.close()
+    listener = None
+
+
+atexit.register(stop_logging)
+
+
+# ⏱️ Temps d'exécution des outils
+def start_request() -> List[float]:
+    """
+    Démarre le décompte du temps outil de la requête courante (propagé aux tâches filles).
+    """
+    runtime = [0.0]
+    _tool_runtime.set(runtime)
+    return runtime
+
+
+def add_tool_runtime(seconds: float) -> None:
+    runtime = _tool_runtime.get()
+    if runtime is not None:
+        runtime[0] += seconds
+
+
+@contextmanager
+def tool_timer():
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_tool_runtime(time.perf_counter() - start)
+
+
+# 🧾 Journal d'accès
+def should_log(status: int, sample_rate: float = None) -> bool:
+    """
+    Les erreurs sont toujours journalisées, les succès selon le taux d'échantillonnage.
+    """
+    sample_rate = ACCESS_LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+    return status >= 400 or sample_rate >= 1 or random.random() < sample_rate
+
+
+def log_request(method: str, endpoint: str, status: int, duration: float, role: Optional[str] = None,
+                client: Optional[str] = None, tool_runtime: Optional[float] = None) -> None:
+    if not should_log(status):
+        return
+    entry = {
+        "method": method,
+        "endpoint": endpoint,
+        "status": status,
+        "duration_ms": round(duration * 1000, 2),
+        "tool_runtime_ms": round(tool_runtime * 1000, 2) if tool_runtime is not None else None,
+        "role": role,
+        "client": client,
+    }
+    access_logger.log(logging.WARNING if status >= 400 else logging.INFO, entry)
@@ -0,0 +1,185 @@
+import asyncio
+import bisect
+import itertools
+import math
+import os
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+from app.core import metrics
+
+logger = logging.getLogger("admission")
+
+# 🚦 Contrôle d'admission : capacité globale exprimée en unités de coût
+ADMISSION_CAPACITY = int(os.getenv("ADMISSION_CAPACITY", 256))
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", 512))
+ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", 30))
+
+# Coût estimé d'une requête (≈ nombre de requêtes réseau ou poids relatif du processus lancé)
+ROUTE_COSTS = {
+    "/v1/ping": ("ping", 1),
+    "/v1/dig": ("dig", 1),
+    "/v1/nslookup": ("nslookup", 1),
+    "/v1/dns-full": ("dns-full", 6),
+    "/v1/whois": ("whois", 2),
+    "/v1/traceroute": ("traceroute", 4),
+    # Lots : coût par cible
+    "/v1/ping/batch": ("batch", 1),
+    "/v1/dig/batch": ("batch", 1),
+    "/v1/nslookup/batch": ("batch", 1),
+}
+NMAP_COSTS = {"top100": 20, "custom": 20, "all": 100}
+
+# Requêtes simultanées par outil (variable ADMISSION_SLOTS_<OUTIL>, tirets remplacés par _)
+DEFAULT_SLOTS = {
+    "ping": 128,
+    "dig": 128,
+    "nslookup": 128,
+    "dns-full": 64,
+    "whois": 32,
+    "traceroute": 32,
+    "nmap": 8,
+    "batch": 8,
+}
+
+# Rôle → priorité dans la file d'attente (0 = servi en premier)
+ROLE_PRIORITY = {"admin": 0, "developer": 1}
+
+
+class AdmissionRejected(Exception):
+    """File d'attente pleine ou attente trop longue : la requête est refusée (503)."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def get_slots(tool: str) -> int:
+    default = DEFAULT_SLOTS.get(tool, 16)
+    return int(os.getenv(f"ADMISSION_SLOTS_{tool.upper().replace('-', '_')}", default))
+
+
+def request_cost(endpoint: str, query_string: bytes, targets: int = 1) -> Optional[Tuple[str, int]]:
+    """
+    Outil et coût estimé de la requête (targets : nombre de cibles d'un lot),
+    ou None si elle n'est pas soumise à l'admission.
+    """
+    if endpoint == "/v1/nmap":
+        params = dict(parse_qsl(query_string.decode("latin-1")))
+        return "nmap", NMAP_COSTS.get(params.get("scan_mode", "top100"), NMAP_COSTS["top100"])
+    cost = ROUTE_COSTS.get(endpoint)
+    return (cost[0], cost[1] * targets) if cost else None
+
+
+class AdmissionController:
+    """
+    Créneaux globaux (en coût) et par outil ; les requêtes en excès attendent dans une
+    file ordonnée par priorité de rôle puis par ordre d'arrivée.
+
+    Une requête bloquée par la capacité globale réserve la place : les suivantes ne la
+    doublent pas (pas de famine des requêtes coûteuses). Une requête bloquée par la limite
+    de son outil laisse passer celles des autres outils.
+    """
+
+    def __init__(self, capacity: int = ADMISSION_CAPACITY, queue_size: int = ADMISSION_QUEUE_SIZE,
+                 max_wait: float = ADMISSION_MAX_WAIT):
+        self.capacity = capacity
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.used = 0
+        self.running: Dict[str, int] = {}
+        self.slots: Dict[str, int] = {}
+        # Durée moyenne (moyenne mobile exponentielle) par outil, pour estimer Retry-After
+        self.durations: Dict[str, float] = {}
+        self._waiting: List = []
+        self._counter = itertools.count()
+
+    def _fits(self, cost: int) -> bool:
+        return self.used + cost <= self.capacity
+
+    def _tool_free(self, tool: str) -> bool:
+        slots = self.slots.get(tool)
+        if slots is None:
+            slots = self.slots[tool] = get_slots(tool)
+        return self.running.get(tool, 0) < slots
+
+    def _grant(self, tool: str, cost: int) -> None:
+        self.used += cost
+        self.running[tool] = self.running.get(tool, 0) + 1
+
+    def _wake(self) -> None:
+        for entry in list(self._waiting):
+            _, _, tool, cost, future = entry
+            if future.done():
+                self._waiting.remove(entry)
+                continue
+            if not self._tool_free(tool):
+                continue
+            if not self._fits(cost):
+                break
+            self._waiting.remove(entry)
+            self._grant(tool, cost)
+            future.set_result(None)
+
+    def retry_after(self, tool: str) -> int:
+        waiting = sum(1 for entry in self._waiting if entry[2] == tool)
+        estimate = self.durations.get(tool, 1.0) * (waiting + 1) / max(get_slots(tool), 1)
+        return min(max(math.ceil(estimate), 1), 60)
+
+    async def acquire(self, tool: str, cost: int, role: Optional[str] = None) -> None:
+        """
+        Attend un créneau pour la requête.
+
+        Raises:
+            AdmissionRejected: File pleine ou délai d'attente dépassé
+        """
+        cost = min(cost, self.capacity)
+        future = asyncio.get_running_loop().create_future()
+        entry = (ROLE_PRIORITY.get(role, len(ROLE_PRIORITY)), next(self._counter), tool, cost, future)
+        bisect.insort(self._waiting, entry)
+        self._wake()
+        if future.done():
+            return
+        if len(self._waiting) > self.queue_size:
+            self._waiting.remove(entry)
+            raise AdmissionRejected("Serveur saturé, réessayez plus tard", self.retry_after(tool))
+
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # Créneau accordé au moment de l'abandon : il est rendu aussitôt
+                self.release(tool, cost)
+            else:
+                future.cancel()
+                if entry in self._waiting:
+                    self._waiting.remove(entry)
+                    self._wake()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise AdmissionRejected("Temps d'attente dépassé, réessayez plus tard", self.retry_after(tool))
+        finally:
+            admission_wait.observe(tool, value=time.perf_counter() - start)
+
+    def release(self, tool: str, cost: int, duration: float = None) -> None:
+        self.used -= min(cost, self.capacity)
+        self.running[tool] -= 1
+        if duration is not None:
+            previous = self.durations.get(tool)
+            self.durations[tool] = duration if previous is None else 0.8 * previous + 0.2 * duration
+        self._wake()
+
+    def stats(self) -> Dict[str, int]:
+        return {"used": self.used, "capacity": self.capacity, "waiting": len(self._waiting)}
+
+
+admission_wait = metrics.registry.register(metrics.Histogram(
+    "network_api_admission_wait_seconds", "Attente d'un créneau d'admission", ("tool",)
+))
+admission_controller = AdmissionController()
+metrics.registry.register(metrics.CallbackGauge(
+    "network_api_admission", "Contrôle d'admission (coût en cours, capacité, requêtes en attente)", ("stat",),
+    lambda: {(stat,): value for stat, value in admission_controller.stats().items()}
+))
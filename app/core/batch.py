@@ -0,0 +1,56 @@
+import ipaddress
+import json
+import os
+from typing import List, Optional
+from app.utils.validators import is_valid_host
+
+# 📦 Limites des traitements par lot
+BATCH_MAX_TARGETS = int(os.getenv("BATCH_MAX_TARGETS", 1024))
+BATCH_MAX_BODY = int(os.getenv("BATCH_MAX_BODY", 512 * 1024))
+
+
+def expand_targets(hosts: List[str], cidr: Optional[str] = None) -> List[str]:
+    """
+    Valide et développe les cibles d'un lot (liste d'hôtes et/ou bloc CIDR).
+
+    Returns:
+        List[str]: Cibles uniques, dans l'ordre de la requête
+
+    Raises:
+        ValueError: Cible invalide, lot vide ou trop volumineux
+    """
+    targets = []
+    for host in hosts:
+        host = host.strip()
+        if not is_valid_host(host):
+            raise ValueError(f"Hôte invalide: '{host}'")
+        targets.append(host)
+
+    if cidr:
+        try:
+            network = ipaddress.ip_network(cidr.strip(), strict=False)
+        except ValueError:
+            raise ValueError(f"Bloc CIDR invalide: '{cidr}'")
+        if network.num_addresses > BATCH_MAX_TARGETS + 2:
+            raise ValueError(f"Bloc CIDR trop large (maximum {BATCH_MAX_TARGETS} adresses)")
+        addresses = network.hosts() if network.num_addresses > 2 else iter(network)
+        targets.extend(str(address) for address in addresses)
+
+    targets = list(dict.fromkeys(targets))
+    if not targets:
+        raise ValueError("Aucune cible fournie (hosts ou cidr)")
+    if len(targets) > BATCH_MAX_TARGETS:
+        raise ValueError(f"Trop de cibles (maximum {BATCH_MAX_TARGETS})")
+    return targets
+
+
+def count_targets(body: bytes) -> int:
+    """
+    Nombre de cibles d'un corps de requête de lot, pour le rate limit et l'admission
+    (1 si le corps est invalide : le lot sera refusé par l'endpoint).
+    """
+    try:
+        request = json.loads(body)
+        return len(expand_targets(request.get("hosts") or [], request.get("cidr")))
+    except (ValueError, TypeError, AttributeError):
+        return 1
@@ -0,0 +1,11 @@
+# 🧾 Types d'enregistrements pris en charge (nom → code du protocole)
+RECORD_TYPES = {
+    "A": 1,
+    "NS": 2,
+    "CNAME": 5,
+    "SOA": 6,
+    "PTR": 12,
+    "MX": 15,
+    "TXT": 16,
+    "AAAA": 28,
+}
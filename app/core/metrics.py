@@ -0,0 +1,219 @@
+import asyncio
+import subprocess
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# 📊 Métriques au format texte Prometheus (exposées sur /metrics)
+
+# Secondes : de la requête DNS en cache au scan nmap complet
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+SPAWN_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def render(self) -> List[str]:
+        ...
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values) -> float:
+        return self._values.get(label_values, 0)
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+                for key, value in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *label_values, amount: float = 1) -> None:
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, *label_values, value: float) -> None:
+        self._values[label_values] = value
+
+
+class CallbackGauge(Metric):
+    """
+    Jauge calculée à la lecture : `collect` retourne {valeurs des labels: valeur}.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str], collect: Callable[[], Dict[Tuple, float]]):
+        super().__init__(name, documentation, labels)
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+                for key, value in sorted(self.collect().items())]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Par série : compteurs par intervalle (le dernier = +Inf), somme
+        self._series: Dict[Tuple, List] = {}
+
+    def observe(self, *label_values, value: float) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, *label_values) -> int:
+        series = self._series.get(label_values)
+        return sum(series[0]) if series else 0
+
+    @contextmanager
+    def time(self, *label_values):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(*label_values, value=time.perf_counter() - start)
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines += metric.header()
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# 🌐 Requêtes HTTP
+http_request_duration = registry.register(Histogram(
+    "network_api_http_request_duration_seconds", "Durée des requêtes HTTP par route", ("method", "endpoint")
+))
+http_requests = registry.register(Counter(
+    "network_api_http_requests_total", "Requêtes HTTP par route et code retour", ("method", "endpoint", "status")
+))
+rejections = registry.register(Counter(
+    "network_api_rejections_total", "Requêtes rejetées par le middleware de sécurité", ("reason",)
+))
+
+# 🛠️ Outils
+tool_spawn_duration = registry.register(Histogram(
+    "network_api_tool_spawn_seconds", "Temps de lancement des processus externes", ("tool",), SPAWN_BUCKETS
+))
+tool_run_duration = registry.register(Histogram(
+    "network_api_tool_run_seconds", "Durée d'exécution des outils", ("tool", "engine")
+))
+tool_inflight = registry.register(Gauge(
+    "network_api_tool_inflight", "Exécutions d'outils en cours", ("tool",)
+))
+tool_waiting = registry.register(Gauge(
+    "network_api_tool_waiting", "Exécutions en attente d'un créneau de concurrence", ("tool",)
+))
+tool_timeouts = registry.register(Counter(
+    "network_api_tool_timeouts_total", "Exécutions interrompues par un timeout", ("tool",)
+))
+tool_errors = registry.register(Counter(
+    "network_api_tool_errors_total", "Exécutions terminées en erreur (hors timeout)", ("tool",)
+))
+
+
+@contextmanager
+def track(tool: str, engine: str):
+    """
+    Compte l'exécution comme en cours et mesure sa durée.
+    """
+    tool_inflight.inc(tool)
+    try:
+        with tool_run_duration.time(tool, engine):
+            yield
+    finally:
+        tool_inflight.dec(tool)
+
+
+def record_failure(tool: str, error: BaseException) -> None:
+    """
+    Comptabilise une exception capturée par un service (timeout ou erreur).
+    """
+    if isinstance(error, (subprocess.TimeoutExpired, asyncio.TimeoutError, TimeoutError)):
+        tool_timeouts.inc(tool)
+    else:
+        tool_errors.inc(tool)
+
+
+def route_label(scope: dict) -> str:
+    """
+    Gabarit de la route (ex : /v1/nmap/jobs/{job_id}) pour borner le nombre de séries.
+    """
+    if scope.get("endpoint") is None:
+        return "unmatched"
+    path = scope["path"]
+    for name, value in scope.get("path_params", {}).items():
+        path = path.replace(f"/{value}", f"/{{{name}}}", 1)
+    return path
+
+
+def render() -> str:
+    return registry.render()
@@ -0,0 +1,293 @@
+import asyncio
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou de fichier POSIX
+    fcntl = None
+
+logger = logging.getLogger("api-security")
+
+# ⏱️ Configuration du rate limit (fenêtre glissante, par clé API)
+RATE_LIMIT_WINDOW = int(os.getenv("RATE_LIMIT_WINDOW", 60))
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", "redis://127.0.0.1:6379/0")
+RATE_LIMIT_REDIS_POOL = int(os.getenv("RATE_LIMIT_REDIS_POOL", 8))
+RATE_LIMIT_SHM_PATH = os.getenv(
+    "RATE_LIMIT_SHM_PATH",
+    os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "network-api-ratelimit")
+)
+RATE_LIMIT_SHM_SLOTS = int(os.getenv("RATE_LIMIT_SHM_SLOTS", 4096))
+RATE_LIMIT_FAIL_OPEN = os.getenv("RATE_LIMIT_FAIL_OPEN", "true").lower() in ("1", "true", "yes")
+
+
+def sliding_window_estimate(previous: int, current: int, now: float, window: int) -> float:
+    """
+    Compteur à fenêtre glissante : la fenêtre précédente est pondérée par sa part
+    encore couverte par la fenêtre courante.
+    """
+    elapsed = (now % window) / window
+    return previous * (1 - elapsed) + current
+
+
+def retry_after(previous: int, current: int, limit: int, now: float, window: int) -> float:
+    """
+    Délai (en secondes) avant que l'estimation repasse sous la limite.
+    """
+    remaining = window - (now % window)
+    if previous and current < limit:
+        # La part de la fenêtre précédente décroît linéairement
+        needed = (previous + current - limit + 1) / previous * window
+        return max(min(needed - (now % window), remaining), 1)
+    return max(remaining, 1)
+
+
+def hash_key(key: str) -> str:
+    # Les clés API ne sont jamais stockées en clair dans un backend partagé
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+
+# 🧠 Backend en mémoire (un worker)
+class MemoryBackend:
+    def __init__(self):
+        self._counters: Dict[str, List[int]] = {}
+
+    async def hit(self, key: str, limit: int, window: int, now: float, cost: int = 1) -> Tuple[bool, float]:
+        index = int(now // window)
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters[key] = [index, 0, 0]
+        elif counter[0] != index:
+            # Décalage des fenêtres : la courante devient la précédente (ou zéro si trop ancienne)
+            counter[1] = counter[2] if counter[0] == index - 1 else 0
+            counter[2] = 0
+            counter[0] = index
+
+        if sliding_window_estimate(counter[1], counter[2], now, window) >= limit:
+            return False, retry_after(counter[1], counter[2], limit, now, window)
+        counter[2] += cost
+        return True, 0
+
+
+# 🧩 Backend en mémoire partagée (tous les workers d'une même machine)
+SLOT = struct.Struct("!16sqII")  # empreinte de la clé, index de fenêtre, précédente, courante
+MAX_PROBES = 8
+
+
+class SharedMemoryBackend:
+    """
+    Table de taille fixe dans un fichier mappé en mémoire, protégée par un verrou fcntl.
+    """
+
+    def __init__(self, path: str = RATE_LIMIT_SHM_PATH, slots: int = RATE_LIMIT_SHM_SLOTS):
+        if fcntl is None:
+            raise RuntimeError("Backend 'shm' indisponible sur ce système")
+        self.slots = slots
+        size = SLOT.size * slots
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._map = mmap.mmap(self._fd, size)
+
+    def _find_slot(self, digest: bytes, index: int) -> int:
+        start = int.from_bytes(digest[:8], "big") % self.slots
+        victim, victim_index = start, None
+        for probe in range(MAX_PROBES):
+            slot = (start + probe) % self.slots
+            slot_digest, slot_index, _, _ = SLOT.unpack_from(self._map, slot * SLOT.size)
+            if slot_digest == digest or slot_digest == bytes(16):
+                return slot
+            # Emplacement le plus ancien (réutilisable si la sonde est pleine)
+            if victim_index is None or slot_index < victim_index:
+                victim, victim_index = slot, slot_index
+        return victim
+
+    def _hit(self, key: str, limit: int, window: int, now: float, cost: int) -> Tuple[bool, float]:
+        digest = bytes.fromhex(hash_key(key))
+        index = int(now // window)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            slot = self._find_slot(digest, index)
+            offset = slot * SLOT.size
+            slot_digest, slot_index, previous, current = SLOT.unpack_from(self._map, offset)
+            if slot_digest != digest:
+                slot_index, previous, current = index, 0, 0
+            elif slot_index != index:
+                previous = current if slot_index == index - 1 else 0
+                current = 0
+
+            if sliding_window_estimate(previous, current, now, window) >= limit:
+                SLOT.pack_into(self._map, offset, digest, index, previous, current)
+                return False, retry_after(previous, current, limit, now, window)
+            SLOT.pack_into(self._map, offset, digest, index, previous, current + cost)
+            return True, 0
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    async def hit(self, key: str, limit: int, window: int, now: float, cost: int = 1) -> Tuple[bool, float]:
+        # Section critique de quelques microsecondes : pas besoin de thread
+        return self._hit(key, limit, window, now, cost)
+
+
+# 🌐 Backend Redis (protocole RESP, plusieurs machines)
+class RedisConnection:
+    """
+    Connexion RESP : commandes envoyées en pipeline, une réponse lue par commande.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @staticmethod
+    def encode(*args) -> bytes:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    async def _read_reply(self):
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("Connexion Redis fermée")
+        prefix, payload = line[:1], line[1:-2]
+        if prefix in (b"+", b":"):
+            return int(payload) if prefix == b":" else payload.decode()
+        if prefix == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = await self.reader.readexactly(length + 2)
+            return data[:-2].decode()
+        if prefix == b"-":
+            raise ConnectionError(f"Erreur Redis : {payload.decode()}")
+        raise ConnectionError(f"Réponse Redis inattendue : {line!r}")
+
+    async def pipeline(self, *commands) -> list:
+        self.writer.write(b"".join(self.encode(*command) for command in commands))
+        await self.writer.drain()
+        return [await self._read_reply() for _ in commands]
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class RedisBackend:
+    """
+    Client RESP minimal : INCRBY / EXPIRE / GET envoyés en pipeline (un aller-retour par requête).
+
+    Les requêtes simultanées utilisent chacune une connexion d'un petit pool
+    (RATE_LIMIT_REDIS_POOL) : une réponse lente ne bloque pas les autres vérifications.
+    """
+
+    def __init__(self, url: str = RATE_LIMIT_REDIS_URL, timeout: float = 0.5, pool_size: int = RATE_LIMIT_REDIS_POOL):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._idle: List[RedisConnection] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop = None
+
+    async def _connect(self) -> RedisConnection:
+        connection = RedisConnection(*await asyncio.open_connection(self.host, self.port))
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            try:
+                await connection.pipeline(*setup)
+            except BaseException:
+                connection.close()
+                raise
+        return connection
+
+    async def _hit(self, connection: RedisConnection, key: str, limit: int, window: int, now: float,
+                   cost: int) -> Tuple[bool, float]:
+        index = int(now // window)
+        prefix = f"ratelimit:{hash_key(key)}:"
+        current_key, previous_key = f"{prefix}{index}", f"{prefix}{index - 1}"
+        current, _, previous = await connection.pipeline(
+            ("INCRBY", current_key, cost), ("EXPIRE", current_key, window * 2), ("GET", previous_key)
+        )
+        previous = int(previous or 0)
+        if sliding_window_estimate(previous, current - cost, now, window) >= limit:
+            # Requête refusée : elle ne doit pas consommer de quota
+            await connection.pipeline(("DECRBY", current_key, cost))
+            return False, retry_after(previous, current - cost, limit, now, window)
+        return True, 0
+
+    async def hit(self, key: str, limit: int, window: int, now: float, cost: int = 1) -> Tuple[bool, float]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Connexions liées à la boucle qui les a ouvertes
+            self._loop, self._slots, self._idle = loop, asyncio.Semaphore(self.pool_size), []
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else None
+            try:
+                if connection is None or connection.writer.is_closing():
+                    connection = await asyncio.wait_for(self._connect(), self.timeout)
+                result = await asyncio.wait_for(self._hit(connection, key, limit, window, now, cost), self.timeout)
+            except (OSError, ConnectionError, asyncio.TimeoutError, ValueError) as e:
+                # Réponse éventuellement à moitié lue : la connexion n'est pas réutilisée
+                if connection is not None:
+                    connection.close()
+                raise ConnectionError(f"Backend Redis indisponible : {e}")
+            except BaseException:
+                if connection is not None:
+                    connection.close()
+                raise
+            self._idle.append(connection)
+            return result
+
+
+# 🚦 Point d'entrée
+class RateLimiter:
+    def __init__(self, backend, window: int = RATE_LIMIT_WINDOW, fail_open: bool = RATE_LIMIT_FAIL_OPEN):
+        self.backend = backend
+        self.window = window
+        self.fail_open = fail_open
+
+    async def hit(self, key: str, limit: int, now: float = None, cost: int = 1) -> Tuple[bool, float]:
+        """
+        Comptabilise une requête pour la clé (cost requêtes, ex : nombre de cibles d'un lot).
+
+        Returns:
+            Tuple: (autorisée, délai conseillé avant nouvel essai en secondes)
+        """
+        now = time.time() if now is None else now
+        try:
+            # Autorisée si l'estimation plus le coût ne dépasse pas la limite
+            return await self.backend.hit(key, limit - cost + 1, self.window, now, cost)
+        except ConnectionError as e:
+            logger.error(f"⏱️ Rate limit indisponible : {e}")
+            return self.fail_open, 0 if self.fail_open else self.window
+
+
+def create_rate_limiter() -> RateLimiter:
+    if RATE_LIMIT_BACKEND == "redis":
+        return RateLimiter(RedisBackend())
+    if RATE_LIMIT_BACKEND == "shm":
+        try:
+            return RateLimiter(SharedMemoryBackend())
+        except (RuntimeError, OSError) as e:
+            logger.error(f"⏱️ Backend 'shm' indisponible ({e}), repli sur la mémoire locale")
+    return RateLimiter(MemoryBackend())
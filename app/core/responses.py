@@ -0,0 +1,176 @@
+import gzip
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional
+from fastapi import Query, Request
+from fastapi.responses import Response
+from app.models.response_model import CommandResponse
+from app.services.cache import TTLCache
+
+# Encodeurs facultatifs : orjson (JSON rapide), msgpack (binaire), brotli (compression br)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 🗜️ Compression des réponses au-delà de COMPRESSION_MIN_SIZE octets (gzip, ou br si brotli est installé)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", 5))
+
+# 🏷️ Cache HTTP : Cache-Control et ETag ; If-None-Match répond 304 sans relancer l'outil
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", 4 * 1024 * 1024))
+
+# ETag de la dernière réponse de chaque requête (chemin, paramètres, format), valable max-age secondes
+etag_cache = TTLCache(HTTP_CACHE_MAX_BYTES, name="etag")
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+def dumps(data: Any) -> bytes:
+    """
+    Encode en JSON UTF-8 compact (orjson s'il est installé).
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def project(output: Any, fields: Optional[List[str]]) -> Any:
+    """
+    Ne garde que les champs demandés de output (ou de chaque élément d'une liste, ex : sauts).
+    """
+    if not fields:
+        return output
+    if isinstance(output, dict):
+        return {key: value for key, value in output.items() if key in fields}
+    if isinstance(output, list):
+        return [project(item, fields) if isinstance(item, dict) else item for item in output]
+    return output
+
+
+def etag(body: bytes) -> str:
+    # ETag faible : le même contenu peut être servi compressé ou non
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def _accepted(header: str) -> List[str]:
+    # Valeurs d'un en-tête Accept / Accept-Encoding, sans celles explicitement refusées (q=0)
+    values = []
+    for part in header.split(","):
+        value, _, params = part.strip().partition(";")
+        if value and params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            values.append(value.strip().lower())
+    return values
+
+
+def compress(body: bytes, accept_encoding: str) -> Optional[tuple]:
+    """
+    (encodage, corps compressé) selon Accept-Encoding, ou None (corps trop petit ou non accepté).
+    """
+    if len(body) < COMPRESSION_MIN_SIZE:
+        return None
+    encodings = _accepted(accept_encoding)
+    if brotli is not None and "br" in encodings:
+        return "br", brotli.compress(body, quality=COMPRESSION_LEVEL)
+    if "gzip" in encodings:
+        return "gzip", gzip.compress(body, compresslevel=COMPRESSION_LEVEL)
+    return None
+
+
+class OutputFormat:
+    """
+    Négociation du format de réponse (dépendance FastAPI) : projection fields=,
+    JSON ou MessagePack selon Accept, compression selon Accept-Encoding, cache HTTP
+    (Cache-Control, ETag, 304) pour les endpoints qui fournissent une durée de validité.
+
+    La réponse est encodée directement : FastAPI ne revalide pas le modèle de réponse
+    (response_model sert uniquement à la documentation OpenAPI).
+    """
+
+    def __init__(
+        self,
+        request: Request,
+        fields: Optional[str] = Query(None, description="Champs de output à retourner, séparés par des virgules (ex: rtt_avg,packet_loss_percent)")
+    ):
+        self.accept = _accepted(request.headers.get("accept", ""))
+        self.accept_encoding = request.headers.get("accept-encoding", "")
+        self.if_none_match = [tag.strip() for tag in request.headers.get("if-none-match", "").split(",") if tag.strip()]
+        self.cache_key = (request.url.path, request.url.query, self.media_type())
+        self.fields = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+
+    def media_type(self) -> Optional[str]:
+        """
+        Type de contenu négocié, ou None si seul MessagePack est accepté et qu'il n'est pas installé.
+        """
+        if any(media_type in self.accept for media_type in MSGPACK_MEDIA_TYPES):
+            if msgpack is not None:
+                return MSGPACK_MEDIA_TYPES[0]
+            if not any(media_type in self.accept for media_type in (JSON_MEDIA_TYPE, "application/*", "*/*")):
+                return None
+        return JSON_MEDIA_TYPE
+
+    def content(self, response: CommandResponse) -> Dict:
+        return {"success": response.success, "output": project(response.output, self.fields), "error": response.error}
+
+    def encode(self, content: Dict, media_type: str) -> bytes:
+        if media_type == JSON_MEDIA_TYPE:
+            return dumps(content)
+        return msgpack.packb(content, default=str, use_bin_type=True)
+
+    def _matches(self, tag: str) -> bool:
+        return "*" in self.if_none_match or tag in self.if_none_match
+
+    def _not_modified(self, tag: str, max_age: int) -> Response:
+        return Response(status_code=304, headers={
+            "ETag": tag, "Cache-Control": f"public, max-age={max_age}", "Vary": "Accept, Accept-Encoding, X-API-Key"
+        })
+
+    def not_modified(self) -> Optional[Response]:
+        """
+        304 si If-None-Match correspond à la réponse encore fraîche de la même requête
+        (à appeler avant d'exécuter l'outil), sinon None.
+        """
+        if not HTTP_CACHE_ENABLED or not self.if_none_match:
+            return None
+        cached = etag_cache.get(self.cache_key)
+        if cached is None:
+            return None
+        (tag, max_age), age = cached
+        if not self._matches(tag):
+            return None
+        return self._not_modified(tag, max(int(max_age - age), 0))
+
+    def render(self, response: CommandResponse, status_code: int = 200, max_age: Optional[int] = None) -> Response:
+        """
+        Encode la réponse ; avec max_age (réponse réussie uniquement), ajoute Cache-Control et ETag.
+        """
+        media_type = self.media_type()
+        if media_type is None:
+            return Response(dumps({"success": False, "output": None, "error": "MessagePack indisponible sur ce serveur"}),
+                            status_code=406, media_type=JSON_MEDIA_TYPE)
+
+        body = self.encode(self.content(response), media_type)
+        headers = {"Vary": "Accept, Accept-Encoding"}
+        if HTTP_CACHE_ENABLED and max_age is not None and response.success and status_code == 200:
+            tag = etag(body)
+            etag_cache.set(self.cache_key, (tag, max_age), max_age, 200 + len(self.cache_key[1]))
+            if self._matches(tag):
+                return self._not_modified(tag, max_age)
+            # Réponse liée à la clé API (droits par rôle) : les caches intermédiaires la distinguent par clé
+            headers.update({"ETag": tag, "Cache-Control": f"public, max-age={max_age}",
+                            "Vary": "Accept, Accept-Encoding, X-API-Key"})
+        compressed = compress(body, self.accept_encoding)
+        if compressed:
+            headers["Content-Encoding"], body = compressed
+        return Response(body, status_code=status_code, media_type=media_type, headers=headers)
@@ -1,33 +1,25 @@
 import os
 import re
 import time
-import logging
-import ipaddress
-from typing import Dict, List, Optional, Set
-from fastapi import Request, HTTPException, Depends, Security
+from typing import Optional, Set
+from urllib.parse import parse_qsl
+from fastapi import HTTPException, Depends, Security
 from fastapi.responses import JSONResponse
 from fastapi.security.api_key import APIKeyHeader
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.status import HTTP_403_FORBIDDEN, HTTP_429_TOO_MANY_REQUESTS, HTTP_400_BAD_REQUEST
+from starlette.status import HTTP_403_FORBIDDEN, HTTP_429_TOO_MANY_REQUESTS, HTTP_400_BAD_REQUEST, HTTP_503_SERVICE_UNAVAILABLE
 from dotenv import load_dotenv
+from app.core import access_log, metrics
+from app.core.admission import AdmissionRejected, admission_controller, request_cost
+from app.core.rate_limiter import create_rate_limiter
+from app.core.batch import BATCH_MAX_BODY, count_targets
+from app.core.dns_types import RECORD_TYPES
+from app.utils.validators import DANGEROUS_PATTERN, VALID_DOMAIN, is_valid_ip, is_valid_scan_target
 
 # 🔄 Variables d’environnement
 load_dotenv()
 
-LOG_DIR = os.getenv("LOG_DIR", "logs")
-LOG_FILE = os.path.join(LOG_DIR, "api.log")
-
-os.makedirs(LOG_DIR, exist_ok=True)
-
-logger = logging.getLogger("api-security")
-logger.setLevel(logging.INFO)
-file_handler = logging.FileHandler(LOG_FILE, mode="a", encoding="utf-8")
-file_handler.setFormatter(logging.Formatter("[%(asctime)s] %(levelname)s: %(message)s"))
-logger.addHandler(file_handler)
-
-# 🧪 Expressions régulières
-DANGEROUS_PATTERN = re.compile(r"[;&|$`><()\[\]{}]|\.\.\/|\/etc\/|\/var\/|\/bin\/")
-VALID_DOMAIN = re.compile(r"^([a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}$")
+# 📝 Journaux écrits en arrière-plan (api.log pour la sécurité, access.log pour les accès)
+logger = access_log.security_logger
 
 # 🔑 Clés API
 API_KEYS = {
@@ -38,98 +30,196 @@ API_KEYS = {k: v for k, v in API_KEYS.items() if k}
 
 assert API_KEYS, "❌ Aucune clé API définie dans les variables d'environnement"
 
-ADMIN_ROUTES = {"/v1/nmap"}
+ADMIN_ROUTES = {"/v1/nmap", "/v1/monitoring"}
+# Lots : chaque cible compte comme une requête (rate limit et admission)
+BATCH_ROUTES = {"/v1/ping/batch", "/v1/dig/batch", "/v1/nslookup/batch"}
 API_KEY_NAME = "X-API-Key"
 api_key_header = APIKeyHeader(name=API_KEY_NAME, auto_error=False)
 
-# ⏱️ Historique en mémoire (remplaçable par Redis)
-request_history: Dict[str, List[tuple]] = {}
+# ⏱️ Rate limiter (memory, shm ou redis selon RATE_LIMIT_BACKEND)
+rate_limiter = create_rate_limiter()
 BLACKLISTED_IPS: Set[str] = set()
 
-def is_valid_ip(host: str) -> bool:
-    try:
-        ipaddress.ip_address(host)
-        return True
-    except ValueError:
-        return False
-
-class SecurityMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        client_ip = request.client.host
-        endpoint = request.url.path
-        query_params = dict(request.query_params)
-        api_key = request.headers.get("X-API-Key", "").strip()[:128]  # Strip & Limit
-        #logger.info(f"🔐 [DEBUG] Clé reçue depuis header : {api_key}")
-        #logger.info(f"🔐 [DEBUG] Clés autorisées : {list(API_KEYS.keys())}")
-        if api_key not in API_KEYS:
-            logger.warning(f"❌ Clé API invalide : '{api_key}'")
-
-
+def is_admin_route(endpoint: str) -> bool:
+    # Une route admin protège aussi ses sous-routes (ex: /v1/nmap/jobs)
+    return any(endpoint == route or endpoint.startswith(route + "/") for route in ADMIN_ROUTES)
+
+# 🧪 Validation des paramètres (précompilée, appliquée à chaque requête)
+HOST_PARAMS = frozenset(["host", "domain", "target", "hostname"])
+PORTS_PATTERN = re.compile(r"^(\d+,)*\d+$")
+API_KEY_HEADER = API_KEY_NAME.lower().encode("latin-1")
+
+def json_error(status_code: int, error: str, headers: dict = None) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content={"success": False, "error": error}, headers=headers)
+
+def validate_query(endpoint: str, query_string: bytes) -> Optional[JSONResponse]:
+    """
+    Valide les paramètres de la requête et retourne la réponse d'erreur au premier rejet.
+    """
+    for key, value in parse_qsl(query_string.decode("latin-1"), keep_blank_values=True):
+        if DANGEROUS_PATTERN.search(value):
+            logger.warning(f"🚫 Paramètre suspect ({key}) → {endpoint}?{query_string.decode('latin-1')}")
+            return json_error(HTTP_400_BAD_REQUEST, f"Paramètre invalide : '{key}'")
+
+        if not value:
+            continue
+
+        if key in HOST_PARAMS:
+            # nmap accepte aussi une liste d'hôtes ou un bloc CIDR
+            if endpoint.startswith("/v1/nmap") and is_valid_scan_target(value):
+                continue
+            if not (is_valid_ip(value) or VALID_DOMAIN.match(value)):
+                logger.warning(f"🚫 Hôte invalide: {value} - {endpoint}")
+                return json_error(HTTP_400_BAD_REQUEST, f"Hôte invalide: '{value}'")
+
+        elif key == "ports":
+            if not PORTS_PATTERN.match(value) or any(int(p) > 65535 for p in value.split(",")):
+                logger.warning(f"🚫 Ports invalides: {value} - {endpoint}")
+                return json_error(HTTP_400_BAD_REQUEST, "Format de ports invalide")
+
+        elif key == "record_type" and value.upper() not in RECORD_TYPES:
+            logger.warning(f"🚫 Type d'enregistrement invalide: {value} - {endpoint}")
+            return json_error(HTTP_400_BAD_REQUEST, f"Type d'enregistrement non supporté : '{value}'")
+    return None
+
+async def read_body(receive, limit: int) -> Optional[bytes]:
+    """
+    Lit le corps de la requête, ou None s'il dépasse limit octets.
+    """
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            break
+    return b"".join(chunks)
+
+def replay_body(body: bytes, receive):
+    # Le corps déjà lu est rendu à l'application, puis les messages suivants (déconnexion)
+    pending = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def replay():
+        return pending.pop() if pending else await receive()
+    return replay
+
+def get_api_key(scope) -> str:
+    for name, value in scope["headers"]:
+        if name == API_KEY_HEADER:
+            return value.decode("latin-1").strip()[:128]  # Strip & Limit
+    return ""
+
+class SecurityMiddleware:
+    """
+    Middleware ASGI : blocage d'IP, authentification, privilèges, rate limit et
+    validation des paramètres, avant tout traitement de la requête.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        endpoint = scope["path"]
+        client = scope.get("client")
+        client_ip = client[0] if client else ""
+        role = None
+        targets = 1
+
+        async def reject(response: JSONResponse, reason: str):
+            metrics.rejections.inc(reason)
+            await response(scope, receive, send)
+            access_log.log_request(scope["method"], endpoint, response.status_code,
+                                   time.perf_counter() - start, role, client_ip)
 
         if client_ip in BLACKLISTED_IPS:
             logger.warning(f"🔒 IP bloquée: {client_ip} - {endpoint}")
-            return JSONResponse(status_code=HTTP_403_FORBIDDEN, content={"success": False, "error": "Adresse IP bloquée"})
+            return await reject(json_error(HTTP_403_FORBIDDEN, "Adresse IP bloquée"), "blacklist")
 
         if endpoint.startswith("/v1/"):
-            if not api_key or api_key not in API_KEYS:
+            api_key = get_api_key(scope)
+            key_info = API_KEYS.get(api_key)
+            if key_info is None:
                 logger.warning(f"🔑 Auth échouée: {client_ip} - {endpoint}")
-                return JSONResponse(status_code=HTTP_403_FORBIDDEN, content={"success": False, "error": "Clé API invalide ou manquante"})
+                return await reject(json_error(HTTP_403_FORBIDDEN, "Clé API invalide ou manquante"), "auth")
+            role = key_info["role"]
 
             # Privilèges
-            if endpoint in ADMIN_ROUTES and API_KEYS[api_key]["role"] != "admin":
-                logger.warning(f"🔒 Privilèges insuffisants: {api_key} - {endpoint}")
-                return JSONResponse(status_code=HTTP_403_FORBIDDEN, content={"success": False, "error": "Privilèges insuffisants"})
-
-            # Rate limit
-            user_id = api_key
-            now = time.time()
-            rate_limit = API_KEYS[api_key]["rate_limit"]
-
-            if user_id not in request_history:
-                request_history[user_id] = []
-            request_history[user_id] = [(ts, ep) for ts, ep in request_history[user_id] if now - ts < 60]
+            if role != "admin" and is_admin_route(endpoint):
+                logger.warning(f"🔒 Privilèges insuffisants: {role} - {endpoint}")
+                return await reject(json_error(HTTP_403_FORBIDDEN, "Privilèges insuffisants"), "privileges")
+
+            # Lot : cibles comptées avant le rate limit et l'admission
+            if endpoint in BATCH_ROUTES and scope["method"] == "POST":
+                body = await read_body(receive, BATCH_MAX_BODY)
+                if body is None:
+                    return await reject(json_error(413,
+                                                   "Corps de requête trop volumineux"), "validation")
+                receive = replay_body(body, receive)
+                targets = count_targets(body)
+                if targets > key_info["rate_limit"]:
+                    logger.warning(f"⏱️ Lot trop volumineux: {role} - {endpoint} ({targets} cibles)")
+                    return await reject(json_error(413,
+                                                   f"Lot trop volumineux pour cette clé (maximum {key_info['rate_limit']} cibles)"), "rate_limit")
+
+            # Rate limit (fenêtre glissante, O(1) par requête, une par cible pour un lot)
+            allowed, wait = await rate_limiter.hit(api_key, key_info["rate_limit"], cost=targets)
+            if not allowed:
+                logger.warning(f"⏱️ Rate limit dépassé: {role} - {endpoint}")
+                return await reject(json_error(HTTP_429_TOO_MANY_REQUESTS, "Trop de requêtes",
+                                               {"Retry-After": str(int(wait + 0.999))}), "rate_limit")
 
-            if len(request_history[user_id]) >= rate_limit:
-                logger.warning(f"⏱️ Rate limit dépassé: {user_id} - {endpoint}")
-                return JSONResponse(status_code=HTTP_429_TOO_MANY_REQUESTS, content={"success": False, "error": "Trop de requêtes"})
-
-            request_history[user_id].append((now, endpoint))
-
-        logger.info(f"🔍 [DEBUG] Query params reçus : {query_params}")
         # 🔍 Validation des paramètres
-        for key, value in query_params.items():
-            if DANGEROUS_PATTERN.search(value):
-                logger.warning(f"🚫 Paramètre suspect ({key}) → {endpoint}?{request.query_params}")
-                return JSONResponse(status_code=HTTP_400_BAD_REQUEST, content={"success": False, "error": f"Paramètre invalide : '{key}'"})
-
-            if key in ["host", "domain", "target", "hostname"] and value:
-                if not (is_valid_ip(value) or VALID_DOMAIN.match(value)):
-                    logger.warning(f"🚫 Hôte invalide: {value} - {endpoint}")
-                    return JSONResponse(status_code=HTTP_400_BAD_REQUEST, content={"success": False, "error": f"Hôte invalide: '{value}'"})
-
-            if key == "ports" and value:
-                if not re.match(r"^(\d+,)*\d+$", value) or any(int(p) > 65535 for p in value.split(",") if p.isdigit()):
-                    logger.warning(f"🚫 Ports invalides: {value} - {endpoint}")
-                    return JSONResponse(status_code=HTTP_400_BAD_REQUEST, content={"success": False, "error": "Format de ports invalide"})
+        if scope["query_string"]:
+            rejection = validate_query(endpoint, scope["query_string"])
+            if rejection is not None:
+                return await reject(rejection, "validation")
+
+        # 🚦 Admission : créneaux global et par outil selon le coût estimé, priorité au rôle admin
+        cost = request_cost(endpoint, scope["query_string"], targets) if role is not None else None
+        if cost is not None:
+            try:
+                await admission_controller.acquire(cost[0], cost[1], role)
+            except AdmissionRejected as e:
+                logger.warning(f"🚦 Admission refusée: {role} - {endpoint}")
+                return await reject(json_error(HTTP_503_SERVICE_UNAVAILABLE, str(e),
+                                               {"Retry-After": str(e.retry_after)}), "admission")
+        admitted = time.perf_counter()
 
         # ✅ Traitement normal
-        try:
-            start = time.time()
-            response = await call_next(request)
-            duration = round((time.time() - start) * 1000)
-
-            log_msg = f"{request.method} {endpoint} → {response.status_code} ({duration}ms)"
-            logger.warning(f"⚠️ {log_msg}") if response.status_code >= 400 else logger.info(f"✅ {log_msg}")
-            return response
+        status = {"code": 500, "started": False}
+        tool_runtime = access_log.start_request()
 
-        except HTTPException as e:
-            logger.warning(f"🚨 HTTPException: {e.detail} ({e.status_code})")
-            return JSONResponse(status_code=e.status_code, content={"success": False, "error": e.detail})
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                status["started"] = True
+            await send(message)
 
+        try:
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
             logger.error(f"🔥 Erreur serveur: {str(e)}")
-            return JSONResponse(status_code=500, content={"success": False, "error": "Erreur interne du serveur"})
-        
+            if status["started"]:
+                raise
+            await json_error(500, "Erreur interne du serveur")(scope, receive, send)
+        finally:
+            duration = time.perf_counter() - start
+            if cost is not None:
+                admission_controller.release(cost[0], cost[1], time.perf_counter() - admitted)
+            route = metrics.route_label(scope)
+            metrics.http_request_duration.observe(scope["method"], route, value=duration)
+            metrics.http_requests.inc(scope["method"], route, status["code"])
+            access_log.log_request(scope["method"], endpoint, status["code"], duration, role, client_ip, tool_runtime[0])
+
 async def validate_api_key(api_key: str = Security(api_key_header)) -> str:
         """
         Valide la clé API fournie dans l'en-tête.
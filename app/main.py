@@ -1,32 +1,70 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.api.v1 import endpoints  # Import centralisé depuis __init__.py
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.api.v1 import endpoints  # Chargement des routeurs à la demande
+from app.core import access_log, metrics
 from app.core.security_middleware import SecurityMiddleware
+from app.services.tool_registry import ENDPOINTS, TOOL_REGISTRY_PROBE, registry
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 📝 Journaux écrits par un thread dédié pendant la vie de l'application
+    access_log.start_logging()
+    # 🩺 Planificateur du monitoring : démarré avec l'application, arrêté proprement à sa fermeture
+    scheduler = None
+    if ROOT_PATHS["monitoring"] in enabled:
+        from app.services.monitoring import scheduler
+        scheduler.start()
+    yield
+    if scheduler is not None:
+        await scheduler.stop()
+    access_log.stop_logging()
 
 app = FastAPI(
     title="Network Tools API",
     description="API pour exécuter des outils réseau via HTTP",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# 📡 Routeurs des outils, importés à la première requête sur leur préfixe (après le middleware de sécurité)
+routers = endpoints.LazyRouters(app)
+app.add_middleware(endpoints.LazyRouterMiddleware, routers=routers)
+
 # 🛡️ Middleware de sécurité
 app.add_middleware(SecurityMiddleware)
 
-# 📡 Inclusion des routes versionnées
-app.include_router(endpoints.ping.router, prefix="/v1", tags=["Ping"])
-app.include_router(endpoints.dig.router, prefix="/v1", tags=["DNS"])
-app.include_router(endpoints.nslookup.router, prefix="/v1", tags=["DNS"])
-app.include_router(endpoints.dns_full.router, prefix="/v1", tags=["DNS"])
-app.include_router(endpoints.whois.router, prefix="/v1", tags=["Whois"])
-app.include_router(endpoints.traceroute.router, prefix="/v1", tags=["Network"])
-app.include_router(endpoints.nmap.router, prefix="/v1", tags=["Scanner"])
+# 🧰 Détection des outils (chemins, versions, capacités) une seule fois au démarrage
+if TOOL_REGISTRY_PROBE:
+    registry.probe()
+
+# 📡 Routes versionnées : seuls les outils utilisables sont déclarés
+ROOT_PATHS = {
+    "ping": "/v1/ping", "dig": "/v1/dig", "nslookup": "/v1/nslookup", "whois": "/v1/whois",
+    "traceroute": "/v1/traceroute", "dns_full": "/v1/dns_full", "nmap": "/v1/nmap",
+    "monitoring": "/v1/monitoring/checks",
+}
+enabled = []
+for name, tag, requirement in ENDPOINTS:
+    if registry.usable(requirement):
+        routers.add(name, tag)
+        enabled.append(ROOT_PATHS[name])
 
 # 🏠 Route de bienvenue
 @app.get("/")
 def root():
     return {
         "message": "Bienvenue sur l'API Réseau ! Accédez à /docs pour Swagger UI.",
-        "endpoints": [
-            "/v1/ping", "/v1/dig", "/v1/nslookup", "/v1/whois",
-            "/v1/traceroute", "/v1/dns_full", "/v1/nmap"
-        ]
+        "endpoints": enabled
     }
+
+# ✅ Disponibilité (sans clé, comme /metrics) : outils détectés et endpoints utilisables
+@app.get("/ready", include_in_schema=False)
+def ready():
+    report = registry.report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+# 📊 Métriques Prometheus (hors /v1 : pas de clé API, à restreindre au réseau de supervision)
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+class BatchRequest(BaseModel):
+    hosts: List[str] = Field(default_factory=list, description="Liste d'hôtes (IP ou noms de domaine)")
+    cidr: Optional[str] = Field(None, description="Bloc d'adresses à parcourir (ex: 192.168.1.0/24)")
+
+class PingBatchRequest(BatchRequest):
+    count: int = Field(4, ge=1, le=10, description="Nombre de paquets à envoyer")
+    timeout: int = Field(2, ge=1, le=5, description="Délai d'attente en secondes")
+    raw_output: bool = Field(True, description="Inclure la sortie brute de chaque ping")
+
+class DigBatchRequest(BatchRequest):
+    record_type: str = Field("A", description="Type d'enregistrement DNS (A, AAAA, MX, TXT, NS, SOA, PTR)")
+    dns_server: Optional[str] = Field(None, description="Adresse IP du serveur DNS à utiliser")
+
+class NslookupBatchRequest(BatchRequest):
+    dns_server: Optional[str] = Field(None, description="Adresse IP du serveur DNS à utiliser")
@@ -0,0 +1,9 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+class CheckRequest(BaseModel):
+    tool: str = Field(..., description="Outil à exécuter : ping | dig")
+    target: str = Field(..., description="Hôte à surveiller (IP ou nom de domaine)")
+    interval: int = Field(60, ge=1, le=86400, description="Intervalle entre deux vérifications, en secondes")
+    record_type: str = Field("A", description="Type d'enregistrement DNS (dig uniquement)")
+    dns_server: Optional[str] = Field(None, description="Adresse IP du serveur DNS à utiliser (dig uniquement)")
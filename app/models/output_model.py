@@ -0,0 +1,108 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional, Union
+from app.models.response_model import CommandResponse
+
+# Modèles de sortie typés par outil (schémas OpenAPI des réponses)
+
+class PingOutput(BaseModel):
+    host: str
+    packets_sent: int
+    packets_received: int
+    packet_loss_percent: float
+    rtt_min: float
+    rtt_avg: float
+    rtt_max: float
+    rtts: List[Optional[float]] = []
+    rtt_stddev: float = 0
+    jitter: float = 0
+    rtt_p50: float = 0
+    rtt_p95: float = 0
+    rtt_p99: float = 0
+    raw_output: Optional[str] = None
+
+class DnsAnswer(BaseModel):
+    name: str
+    ttl: int
+    type: str
+    data: str
+
+class DnsQuestion(BaseModel):
+    name: str
+    type: str
+
+class DigOutput(BaseModel):
+    question: DnsQuestion
+    status: str
+    server: str
+    answers: List[DnsAnswer]
+
+class NslookupOutput(BaseModel):
+    dns_server: str
+    domain: Optional[str] = None
+    ip: Optional[str] = None
+
+class WhoisParsed(BaseModel):
+    registrar: Optional[str] = None
+    creation_date: Optional[str] = None
+    updated_date: Optional[str] = None
+    expiration_date: Optional[str] = None
+    name_servers: List[str] = []
+    status: List[str] = []
+
+class WhoisOutput(BaseModel):
+    domain: str
+    servers: List[str]
+    parsed: WhoisParsed
+    raw: str
+
+class TracerouteHop(BaseModel):
+    hop: int
+    ip: str
+    latency_ms: List[Union[float, str]] = []
+
+class NmapPort(BaseModel):
+    port: int
+    protocol: Optional[str] = None
+    state: str
+    service: Optional[str] = None
+    product: Optional[str] = None
+    version: Optional[str] = None
+    extrainfo: Optional[str] = None
+    address: Optional[str] = None
+
+class NmapHost(BaseModel):
+    address: Optional[str] = None
+    hostnames: List[str] = []
+    status: Optional[str] = None
+    ports: List[NmapPort]
+
+class NmapOutput(BaseModel):
+    host: str
+    hosts: List[NmapHost]
+    ports: List[NmapPort]
+    cache_age: Optional[int] = None
+
+# Réponses typées : output vaut "" ou None en cas d'échec
+
+class PingResponse(CommandResponse):
+    output: Optional[Union[PingOutput, str]] = None
+
+class DigResponse(CommandResponse):
+    output: Optional[Union[DigOutput, str]] = None
+
+class NslookupResponse(CommandResponse):
+    output: Optional[Union[NslookupOutput, str]] = None
+
+class DnsFullResponse(CommandResponse):
+    # Par type d'enregistrement : enregistrements, ou message d'erreur de ce type
+    output: Optional[Union[Dict[str, Union[List[DnsAnswer], str]], str]] = None
+
+class WhoisResponse(CommandResponse):
+    # Texte brut, ou champs principaux avec parsed=true
+    output: Optional[Union[WhoisOutput, str]] = None
+
+class TracerouteResponse(CommandResponse):
+    output: Optional[Union[List[TracerouteHop], str]] = None
+
+class NmapResponse(CommandResponse):
+    output: Optional[Union[NmapOutput, str]] = None
@@ -0,0 +1,47 @@
+import asyncio
+import os
+from typing import AsyncIterator, Awaitable, Callable, List
+from app.core.responses import dumps
+from app.models.response_model import CommandResponse
+
+# 📦 Exécution des traitements par lot (cibles et limites : app.core.batch)
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 64))
+
+
+async def stream_batch(
+    targets: List[str],
+    worker: Callable[[str], Awaitable[CommandResponse]],
+    concurrency: int = BATCH_CONCURRENCY,
+    finalize: Callable[[List[CommandResponse]], List[CommandResponse]] = None
+) -> AsyncIterator[bytes]:
+    """
+    Exécute le worker sur chaque cible avec une concurrence bornée et produit
+    une ligne NDJSON par cible, dans l'ordre de fin d'exécution.
+
+    finalize reçoit ensemble tous les résultats terminés au même moment (calculs groupés).
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(target: str):
+        async with semaphore:
+            try:
+                return target, await worker(target)
+            except Exception as e:
+                return target, CommandResponse(success=False, output=None, error=str(e))
+
+    tasks = [asyncio.ensure_future(run_one(target)) for target in targets]
+    try:
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            completed = [task.result() for task in done]
+            responses = [response for _, response in completed]
+            if finalize is not None:
+                responses = finalize(responses)
+            for (target, _), response in zip(completed, responses):
+                line = {"host": target, "success": response.success, "output": response.output, "error": response.error}
+                yield dumps(line) + b"\n"
+    finally:
+        # Client déconnecté : on abandonne les cibles restantes
+        for task in tasks:
+            task.cancel()
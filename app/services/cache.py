@@ -0,0 +1,80 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Cache en mémoire borné en taille, avec expiration par entrée et éviction LRU.
+
+    Args:
+        max_bytes: Taille approximative maximale du cache (en octets)
+        name: Nom du cache (utilisé dans les statistiques)
+    """
+
+    def __init__(self, max_bytes: int, name: str = "cache"):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, Any, float]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[Tuple[Any, float]]:
+        """
+        Retourne (valeur, âge en secondes) ou None si absente ou expirée.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, size, value, stored_at = entry
+            if expires_at <= now:
+                self._remove(key, size)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value, now - stored_at
+
+    def set(self, key: Hashable, value: Any, ttl: float, size: int) -> None:
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        now = time.monotonic()
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous[1]
+            self._entries[key] = (now + ttl, size, value, now)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._entries:
+                oldest_key, oldest = next(iter(self._entries.items()))
+                self._remove(oldest_key, oldest[1])
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _remove(self, key: Hashable, size: int) -> None:
+        del self._entries[key]
+        self.current_bytes -= size
+
+    def __len__(self) -> int:
+        return len(self._entries)
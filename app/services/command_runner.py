@@ -0,0 +1,161 @@
+import asyncio
+import os
+import signal
+import subprocess
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List
+from app.core import metrics
+from app.core.access_log import tool_timer
+
+logger = logging.getLogger("command-runner")
+
+# ⚙️ Nombre maximal d'exécutions simultanées par outil (surchargeable via .env)
+DEFAULT_CONCURRENCY = {
+    "ping": 64,
+    "dig": 64,
+    "nslookup": 64,
+    "whois": 16,
+    "traceroute": 16,
+    "nmap": 4,
+}
+
+_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def get_concurrency_limit(tool: str) -> int:
+    """
+    Retourne la limite de concurrence d'un outil (variable TOOL_CONCURRENCY_<OUTIL>).
+    """
+    default = DEFAULT_CONCURRENCY.get(tool, int(os.getenv("TOOL_CONCURRENCY_DEFAULT", 16)))
+    return int(os.getenv(f"TOOL_CONCURRENCY_{tool.upper()}", default))
+
+
+def _get_semaphore(tool: str) -> asyncio.Semaphore:
+    semaphore = _semaphores.get(tool)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(get_concurrency_limit(tool))
+        _semaphores[tool] = semaphore
+    return semaphore
+
+
+@asynccontextmanager
+async def _slot(tool: str):
+    """
+    Attend un créneau de concurrence pour l'outil puis mesure l'exécution (métriques, temps outil).
+    """
+    metrics.tool_waiting.inc(tool)
+    try:
+        await _get_semaphore(tool).acquire()
+    finally:
+        metrics.tool_waiting.dec(tool)
+    try:
+        with tool_timer(), metrics.track(tool, "subprocess"):
+            yield
+    finally:
+        _get_semaphore(tool).release()
+
+
+async def _spawn(tool: str, command: List[str]) -> asyncio.subprocess.Process:
+    # Session dédiée (POSIX) : tout le groupe de processus peut être tué d'un coup
+    with metrics.tool_spawn_duration.time(tool):
+        return await asyncio.create_subprocess_exec(
+            *command,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=os.name == "posix",
+        )
+
+
+async def _kill(process: asyncio.subprocess.Process) -> None:
+    try:
+        if os.name == "posix":
+            # Même si le processus principal est terminé, ses descendants peuvent garder les pipes ouverts
+            os.killpg(process.pid, signal.SIGKILL)
+        elif process.returncode is None:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+    await process.wait()
+
+
+async def run_command(tool: str, command: List[str], timeout: float) -> subprocess.CompletedProcess:
+    """
+    Exécute une commande système sans bloquer la boucle d'événements.
+
+    Args:
+        tool: Nom de l'outil (sert à appliquer la limite de concurrence)
+        command: Commande et arguments (jamais interprétés par un shell)
+        timeout: Délai maximal en secondes avant de tuer le processus
+
+    Returns:
+        subprocess.CompletedProcess: Code retour, stdout et stderr décodés
+
+    Raises:
+        subprocess.TimeoutExpired: Si la commande dépasse le délai (le processus est tué)
+    """
+    async with _slot(tool):
+        process = await _spawn(tool, command)
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Timeout ({timeout}s) pour {tool}, arrêt du processus {process.pid}")
+            await _kill(process)
+            raise subprocess.TimeoutExpired(command, timeout)
+        except asyncio.CancelledError:
+            await _kill(process)
+            raise
+
+    return subprocess.CompletedProcess(
+        command,
+        process.returncode,
+        stdout.decode("utf-8", errors="replace"),
+        stderr.decode("utf-8", errors="replace"),
+    )
+
+
+async def stream_command(tool: str, command: List[str], timeout: float) -> AsyncIterator[str]:
+    """
+    Exécute une commande et produit sa sortie standard ligne par ligne, au fil de l'eau.
+
+    Args:
+        tool: Nom de l'outil (sert à appliquer la limite de concurrence)
+        command: Commande et arguments (jamais interprétés par un shell)
+        timeout: Durée maximale totale en secondes
+
+    Raises:
+        subprocess.TimeoutExpired: Si la commande dépasse le délai (le processus est tué)
+        subprocess.CalledProcessError: Si la commande se termine avec un code non nul
+    """
+    async with _slot(tool):
+        process = await _spawn(tool, command)
+        # stderr est lu en parallèle pour ne jamais bloquer le processus
+        stderr_task = asyncio.ensure_future(process.stderr.read())
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                line = await asyncio.wait_for(process.stdout.readline(), timeout=remaining)
+                if not line:
+                    break
+                yield line.decode("utf-8", errors="replace").rstrip("\r\n")
+            await asyncio.wait_for(process.wait(), timeout=max(deadline - time.monotonic(), 0.1))
+            stderr = await stderr_task
+        except asyncio.TimeoutError:
+            logger.warning(f"Timeout ({timeout}s) pour {tool}, arrêt du processus {process.pid}")
+            raise subprocess.TimeoutExpired(command, timeout)
+        finally:
+            # Timeout, annulation ou client déconnecté : le processus ne doit pas survivre.
+            # Un processus déjà terminé et récupéré n'est pas signalé (son groupe peut avoir été réattribué).
+            if process.returncode is None:
+                await _kill(process)
+            stderr_task.cancel()
+
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(
+            process.returncode, command, stderr=stderr.decode("utf-8", errors="replace")
+        )
@@ -1,26 +1,21 @@
-import subprocess
-import re
+from app.core import metrics
 from app.models.response_model import CommandResponse
+from app.services.dns_resolver import resolve
 
 class DigService:
-    def run(self, host: str, record_type: str) -> CommandResponse:
+    async def run(self, host: str, record_type: str, dns_server: str = None) -> CommandResponse:
         try:
-            result = subprocess.run(
-                ["dig", host, record_type],
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                timeout=10
-            )
-
-            if result.returncode != 0:
-                return CommandResponse(
-                    success=False,
-                    output="",
-                    error=(result.stderr or "").strip()
-                )
-
-            parsed = self.parse_dig(result.stdout)
+            result = await resolve(host, record_type, dns_server)
+
+            parsed = {
+                "question": {
+                    "name": host.rstrip(".") + ".",
+                    "type": record_type.upper()
+                },
+                "status": result["status"],
+                "server": result["server"],
+                "answers": result["answers"]
+            }
             return CommandResponse(
                 success=True,
                 output=parsed,
@@ -28,41 +23,9 @@ class DigService:
             )
 
         except Exception as e:
+            metrics.record_failure("dig", e)
             return CommandResponse(
                 success=False,
                 output="",
                 error=str(e)
             )
-
-    def parse_dig(self, output: str) -> dict:
-        parsed = {
-            "question": {},
-            "answers": []
-        }
-
-        # Extraire la QUESTION
-        question_match = re.search(r";([^ ]+)\.\s+IN\s+(\w+)", output)
-        if question_match:
-            parsed["question"]["name"] = question_match.group(1) + "."
-            parsed["question"]["type"] = question_match.group(2)
-
-        # Extraire la ANSWER SECTION
-        answer_section = False
-        for line in output.splitlines():
-            if line.startswith(";; ANSWER SECTION:"):
-                answer_section = True
-                continue
-            if answer_section:
-                if line.startswith(";;"):
-                    break  # fin de la section
-                parts = line.split()
-                if len(parts) >= 5:
-                    name, ttl, _, typ, data = parts[:5]
-                    parsed["answers"].append({
-                        "name": name,
-                        "ttl": int(ttl),
-                        "type": typ,
-                        "data": data
-                    })
-
-        return parsed
@@ -1,64 +1,58 @@
-import subprocess
-import re
+import asyncio
+import os
+from typing import Optional
+from app.core import metrics
 from app.models.response_model import CommandResponse
+from app.services.dns_resolver import cache_ttl, resolve
+
+# ⏱️ Délai global pour l'ensemble des requêtes d'un appel dns-full
+DNS_FULL_DEADLINE = float(os.getenv("DNS_FULL_DEADLINE", 10))
 
 class DNSFullService:
-    def run(self, host: str, dns_server: str = None) -> CommandResponse:
+    record_types = ["A", "AAAA", "MX", "TXT", "NS", "SOA"]
+
+    async def run(self, host: str, dns_server: str = None) -> CommandResponse:
         try:
-            record_types = ["A", "AAAA", "MX", "TXT", "NS", "SOA"]
-            all_records = {}
+            # Toutes les requêtes partent en parallèle, avec un seul délai global
+            tasks = {
+                asyncio.ensure_future(self.lookup(host, record_type, dns_server)): record_type
+                for record_type in self.record_types
+            }
+            done, pending = await asyncio.wait(tasks, timeout=DNS_FULL_DEADLINE)
 
-            for record_type in record_types:
+            all_records = {}
+            for task in done:
+                record_type = tasks[task]
                 try:
-                    # Construction de la commande DIG avec serveur DNS personnalisé
-                    command = ["dig"]
-                    if dns_server:
-                        command.append(f"@{dns_server}")
-                    command += [host, record_type]
-
-                    result = subprocess.run(
-                        command,
-                        capture_output=True,
-                        text=True,
-                        encoding="utf-8",
-                        timeout=10
-                    )
-
-                    parsed = self.parse_dig(result.stdout)
-
-                    if parsed["answers"]:
-                        all_records[record_type] = parsed["answers"]
-                    else:
-                        all_records[record_type] = []  # Réponse vide
-
+                    all_records[record_type] = task.result()
                 except Exception as e:
+                    metrics.record_failure("dns_full", e)
                     all_records[record_type] = f"Error: {str(e)}"
 
-            return CommandResponse(success=True, output=all_records, error=None)
+            for task in pending:
+                task.cancel()
+                metrics.tool_timeouts.inc("dns_full")
+                all_records[tasks[task]] = f"Error: délai global de {DNS_FULL_DEADLINE:g}s dépassé"
+
+            # Ordre de sortie stable, quel que soit l'ordre d'arrivée
+            ordered = {record_type: all_records[record_type] for record_type in self.record_types}
+            return CommandResponse(success=True, output=ordered, error=None)
 
         except Exception as e:
+            metrics.record_failure("dns_full", e)
             return CommandResponse(success=False, output="", error=str(e))
 
-    def parse_dig(self, output: str) -> dict:
-        answers = []
-        inside_answer_section = False
-
-        for line in output.splitlines():
-            if line.startswith(";; ANSWER SECTION:"):
-                inside_answer_section = True
-                continue
+    def max_age(self, output: dict) -> Optional[int]:
+        """
+        Durée de validité HTTP : TTL minimal de tous les types, ou None si l'un d'eux a échoué.
+        """
+        if any(isinstance(answers, str) for answers in output.values()):
+            return None
+        return min(cache_ttl({"status": "NOERROR", "answers": answers}) for answers in output.values())
 
-            if inside_answer_section:
-                if line.startswith(";;") or line.strip() == "":
-                    break  # Fin de la section
-                parts = line.split()
-                if len(parts) >= 5:
-                    name, ttl, _, typ, data = parts[:5]
-                    answers.append({
-                        "name": name,
-                        "ttl": int(ttl),
-                        "type": typ,
-                        "data": data
-                    })
+    async def lookup(self, host: str, record_type: str, dns_server: str = None) -> list:
+        # Requête DNS native, avec serveur DNS personnalisé si fourni
+        result = await resolve(host, record_type, dns_server)
 
-        return {"answers": answers}
+        # On ne garde que les enregistrements du type demandé (pas les CNAME intermédiaires)
+        return [answer for answer in result["answers"] if answer["type"] == record_type]
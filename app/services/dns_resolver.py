@@ -0,0 +1,358 @@
+import asyncio
+import ipaddress
+import os
+import random
+import struct
+import logging
+from typing import Dict, List, Optional, Tuple
+from app.core import metrics
+from app.core.access_log import tool_timer
+from app.core.dns_types import RECORD_TYPES
+from app.services.cache import TTLCache
+from app.services.result_store import result_store
+
+logger = logging.getLogger("dns-resolver")
+
+# 🧾 Code du protocole → nom du type d'enregistrement (types pris en charge : app.core.dns_types)
+RECORD_NAMES = {code: name for name, code in RECORD_TYPES.items()}
+
+RCODES = {0: "NOERROR", 1: "FORMERR", 2: "SERVFAIL", 3: "NXDOMAIN", 4: "NOTIMP", 5: "REFUSED"}
+
+DNS_PORT = int(os.getenv("DNS_PORT", 53))
+DNS_TIMEOUT = float(os.getenv("DNS_TIMEOUT", 3))
+DNS_RETRIES = int(os.getenv("DNS_RETRIES", 1))
+UDP_PAYLOAD_SIZE = 4096
+
+# 🗃️ Cache partagé des réponses (dig, nslookup, dns-full)
+DNS_CACHE_ENABLED = os.getenv("DNS_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+DNS_CACHE_MAX_BYTES = int(os.getenv("DNS_CACHE_MAX_BYTES", 16 * 1024 * 1024))
+DNS_CACHE_NEGATIVE_TTL = int(os.getenv("DNS_CACHE_NEGATIVE_TTL", 30))
+DNS_CACHE_MAX_TTL = int(os.getenv("DNS_CACHE_MAX_TTL", 86400))
+CACHEABLE_STATUSES = {"NOERROR", "NXDOMAIN"}
+
+dns_cache = TTLCache(DNS_CACHE_MAX_BYTES, name="dns")
+metrics.registry.register(metrics.CallbackGauge(
+    "network_api_dns_cache", "État du cache DNS (entrées, octets, hits, misses, évictions)", ("stat",),
+    lambda: {(stat,): value for stat, value in dns_cache.stats().items()}
+))
+
+
+class DNSResolverError(Exception):
+    """Erreur de résolution (serveur injoignable, réponse invalide, type inconnu...)."""
+
+
+class DNSTimeoutError(DNSResolverError, TimeoutError):
+    """Aucune réponse du serveur DNS dans le délai imparti."""
+
+
+def get_default_server() -> str:
+    """
+    Retourne le serveur DNS à utiliser par défaut (DNS_SERVER ou /etc/resolv.conf).
+    """
+    server = os.getenv("DNS_SERVER")
+    if server:
+        return server
+    try:
+        with open("/etc/resolv.conf", encoding="utf-8") as resolv:
+            for line in resolv:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] == "nameserver":
+                    return parts[1].split("%")[0]
+    except OSError:
+        pass
+    return "127.0.0.1"
+
+
+def validate_server(server: str) -> str:
+    try:
+        return str(ipaddress.ip_address(server))
+    except ValueError:
+        raise DNSResolverError(f"Serveur DNS invalide : '{server}'")
+
+
+# 🧱 Construction des messages
+def encode_name(name: str) -> bytes:
+    labels = [label for label in name.rstrip(".").split(".") if label]
+    encoded = bytearray()
+    for label in labels:
+        raw = label.encode("idna") if not label.isascii() else label.encode("ascii")
+        if len(raw) > 63:
+            raise DNSResolverError(f"Label trop long : '{label}'")
+        encoded.append(len(raw))
+        encoded += raw
+    encoded.append(0)
+    return bytes(encoded)
+
+
+def build_query(name: str, record_type: str, query_id: int) -> bytes:
+    """
+    Construit une requête DNS (récursion demandée) avec une option EDNS0.
+    """
+    qtype = RECORD_TYPES[record_type]
+    header = struct.pack("!HHHHHH", query_id, 0x0100, 1, 0, 0, 1)
+    question = encode_name(name) + struct.pack("!HH", qtype, 1)
+    # OPT : nom racine, type 41, taille UDP annoncée
+    opt = b"\x00" + struct.pack("!HHIH", 41, UDP_PAYLOAD_SIZE, 0, 0)
+    return header + question + opt
+
+
+# 🔍 Analyse des réponses
+def decode_name(message: bytes, offset: int) -> Tuple[str, int]:
+    labels = []
+    end = None
+    jumps = 0
+    while True:
+        if offset >= len(message):
+            raise DNSResolverError("Nom tronqué dans la réponse")
+        length = message[offset]
+        if length & 0xC0 == 0xC0:
+            if offset + 1 >= len(message):
+                raise DNSResolverError("Pointeur tronqué dans la réponse")
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | message[offset + 1]
+            jumps += 1
+            if jumps > 64:
+                raise DNSResolverError("Boucle de compression dans la réponse")
+            continue
+        offset += 1
+        if length == 0:
+            break
+        labels.append(message[offset:offset + length].decode("ascii", errors="replace"))
+        offset += length
+    return ".".join(labels) + ".", end if end is not None else offset
+
+
+def decode_rdata(message: bytes, rtype: int, offset: int, length: int) -> str:
+    rdata = message[offset:offset + length]
+    if rtype == RECORD_TYPES["A"] and length == 4:
+        return str(ipaddress.IPv4Address(rdata))
+    if rtype == RECORD_TYPES["AAAA"] and length == 16:
+        return str(ipaddress.IPv6Address(rdata))
+    if rtype in (RECORD_TYPES["NS"], RECORD_TYPES["CNAME"], RECORD_TYPES["PTR"]):
+        return decode_name(message, offset)[0]
+    if rtype == RECORD_TYPES["MX"]:
+        preference = struct.unpack_from("!H", message, offset)[0]
+        return f"{preference} {decode_name(message, offset + 2)[0]}"
+    if rtype == RECORD_TYPES["TXT"]:
+        strings = []
+        position = 0
+        while position < length:
+            size = rdata[position]
+            chunk = rdata[position + 1:position + 1 + size].decode("utf-8", errors="replace")
+            strings.append('"' + chunk.replace('"', '\\"') + '"')
+            position += 1 + size
+        return " ".join(strings)
+    if rtype == RECORD_TYPES["SOA"]:
+        mname, position = decode_name(message, offset)
+        rname, position = decode_name(message, position)
+        serial, refresh, retry, expire, minimum = struct.unpack_from("!IIIII", message, position)
+        return f"{mname} {rname} {serial} {refresh} {retry} {expire} {minimum}"
+    return rdata.hex()
+
+
+def parse_response(message: bytes) -> Dict:
+    """
+    Analyse un message DNS et retourne l'en-tête utile et la section ANSWER.
+
+    Returns:
+        Dict: id, rcode, status, truncated et answers (name, ttl, type, data)
+    """
+    if len(message) < 12:
+        raise DNSResolverError("Réponse DNS trop courte")
+    query_id, flags, qdcount, ancount, _, _ = struct.unpack_from("!HHHHHH", message, 0)
+    offset = 12
+    for _ in range(qdcount):
+        _, offset = decode_name(message, offset)
+        offset += 4
+
+    answers = []
+    for _ in range(ancount):
+        name, offset = decode_name(message, offset)
+        rtype, _, ttl, rdlength = struct.unpack_from("!HHIH", message, offset)
+        offset += 10
+        if rtype in RECORD_NAMES:
+            answers.append({
+                "name": name,
+                "ttl": ttl,
+                "type": RECORD_NAMES[rtype],
+                "data": decode_rdata(message, rtype, offset, rdlength)
+            })
+        offset += rdlength
+
+    rcode = flags & 0x000F
+    return {
+        "id": query_id,
+        "rcode": rcode,
+        "status": RCODES.get(rcode, str(rcode)),
+        "truncated": bool(flags & 0x0200),
+        "answers": answers
+    }
+
+
+# 📡 Transport
+class _UDPQueryProtocol(asyncio.DatagramProtocol):
+    def __init__(self, query_id: int):
+        self.query_id = query_id
+        self.future = asyncio.get_running_loop().create_future()
+
+    def datagram_received(self, data, addr):
+        if len(data) >= 2 and struct.unpack_from("!H", data)[0] == self.query_id and not self.future.done():
+            self.future.set_result(data)
+
+    def error_received(self, exc):
+        if not self.future.done():
+            self.future.set_exception(exc)
+
+
+async def _query_udp(packet: bytes, query_id: int, server: str, port: int, timeout: float) -> bytes:
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(
+        lambda: _UDPQueryProtocol(query_id), remote_addr=(server, port)
+    )
+    try:
+        transport.sendto(packet)
+        return await asyncio.wait_for(protocol.future, timeout)
+    finally:
+        transport.close()
+
+
+async def _query_tcp(packet: bytes, server: str, port: int, timeout: float) -> bytes:
+    async def exchange():
+        reader, writer = await asyncio.open_connection(server, port)
+        try:
+            writer.write(struct.pack("!H", len(packet)) + packet)
+            await writer.drain()
+            length = struct.unpack("!H", await reader.readexactly(2))[0]
+            return await reader.readexactly(length)
+        finally:
+            writer.close()
+
+    return await asyncio.wait_for(exchange(), timeout)
+
+
+async def resolve(
+    name: str,
+    record_type: str = "A",
+    server: Optional[str] = None,
+    port: Optional[int] = None,
+    timeout: float = None,
+    use_cache: bool = True
+) -> Dict:
+    """
+    Résout un nom en parlant directement le protocole DNS (UDP puis TCP si tronqué).
+
+    Args:
+        name: Nom de domaine à interroger
+        record_type: Type d'enregistrement (A, AAAA, MX, TXT, NS, SOA, PTR, CNAME)
+        server: Adresse IP du serveur DNS (par défaut : configuration système)
+        port: Port du serveur DNS
+        timeout: Délai d'attente par tentative en secondes
+        use_cache: False pour toujours interroger le serveur (la réponse est tout de même mise en cache)
+
+    Returns:
+        Dict: status (NOERROR, NXDOMAIN...), server et answers
+    """
+    record_type = record_type.upper()
+    if record_type not in RECORD_TYPES:
+        raise DNSResolverError(f"Type d'enregistrement non supporté : '{record_type}'")
+
+    server = validate_server(server or get_default_server())
+    port = port or DNS_PORT
+    timeout = timeout or DNS_TIMEOUT
+
+    cache_key = (name.lower().rstrip("."), record_type, server, port)
+    if DNS_CACHE_ENABLED and use_cache:
+        cached = dns_cache.get(cache_key)
+        if cached is not None:
+            return _from_cache(*cached)
+        # Second niveau : stockage persistant partagé entre workers
+        stored = await result_store.get("dns", _store_params(cache_key))
+        if stored is not None:
+            result = _decrement_ttls(*stored)
+            _store(cache_key, result)
+            return result
+
+    query_id = random.getrandbits(16)
+    packet = build_query(name, record_type, query_id)
+
+    last_error: Exception = None
+    for _ in range(DNS_RETRIES + 1):
+        try:
+            with tool_timer(), metrics.track("dns", "native"):
+                response = parse_response(await _query_udp(packet, query_id, server, port, timeout))
+                if response["truncated"]:
+                    response = parse_response(await _query_tcp(packet, server, port, timeout))
+            result = {"status": response["status"], "server": server, "answers": response["answers"]}
+            if DNS_CACHE_ENABLED:
+                _store(cache_key, result)
+                result_store.save("dns", _store_params(cache_key), result, cache_ttl(result))
+            return result
+        except asyncio.TimeoutError as e:
+            last_error = e
+        except OSError as e:
+            last_error = e
+            break
+
+    logger.warning(f"Aucune réponse de {server} pour {name} {record_type}: {last_error!r}")
+    if isinstance(last_error, asyncio.TimeoutError):
+        raise DNSTimeoutError(f"Aucune réponse du serveur DNS {server} (timeout)")
+    raise DNSResolverError(f"Serveur DNS {server} injoignable : {last_error}")
+
+
+def cache_ttl(result: Dict) -> int:
+    """
+    Durée de mise en cache : TTL minimal des réponses, ou TTL négatif si vide / NXDOMAIN.
+    """
+    if result["status"] not in CACHEABLE_STATUSES:
+        return 0
+    if not result["answers"]:
+        return DNS_CACHE_NEGATIVE_TTL
+    return min(min(answer["ttl"] for answer in result["answers"]), DNS_CACHE_MAX_TTL)
+
+
+def _store(cache_key: Tuple, result: Dict) -> None:
+    answers = tuple(
+        (answer["name"], answer["ttl"], answer["type"], answer["data"]) for answer in result["answers"]
+    )
+    size = 200 + sum(96 + len(name) + len(data) for name, _, _, data in answers)
+    dns_cache.set(cache_key, (result["status"], result["server"], answers), cache_ttl(result), size)
+
+
+def _store_params(cache_key: Tuple) -> Dict:
+    name, record_type, server, port = cache_key
+    return {"name": name, "type": record_type, "server": server, "port": port}
+
+
+def _decrement_ttls(result: Dict, age: float) -> Dict:
+    elapsed = int(age)
+    return dict(result, answers=[dict(answer, ttl=max(answer["ttl"] - elapsed, 0)) for answer in result["answers"]])
+
+
+def _from_cache(value: Tuple, age: float) -> Dict:
+    status, server, answers = value
+    elapsed = int(age)
+    return {
+        "status": status,
+        "server": server,
+        "answers": [
+            {"name": name, "ttl": max(ttl - elapsed, 0), "type": rtype, "data": data}
+            for name, ttl, rtype, data in answers
+        ]
+    }
+
+
+def reverse_name(address: str) -> str:
+    return ipaddress.ip_address(address).reverse_pointer + "."
+
+
+def is_ip_address(value: str) -> bool:
+    try:
+        ipaddress.ip_address(value)
+        return True
+    except ValueError:
+        return False
+
+
+def collect(answers: List[Dict], record_type: str) -> List[str]:
+    return [answer["data"] for answer in answers if answer["type"] == record_type]
@@ -0,0 +1,171 @@
+import asyncio
+import os
+import socket
+import struct
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("icmp-engine")
+
+ICMP_ECHO_REPLY = 0
+ICMP_ECHO_REQUEST = 8
+PAYLOAD_SIZE = 56
+
+
+class ICMPUnavailable(Exception):
+    """Aucun socket ICMP utilisable (ni datagramme non privilégié, ni brut)."""
+
+
+def checksum(data: bytes) -> int:
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def build_echo_request(identifier: int, sequence: int) -> bytes:
+    payload = struct.pack("!d", time.time()) + bytes(range(PAYLOAD_SIZE - 8))
+    header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, identifier, sequence)
+    return struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, checksum(header + payload), identifier, sequence) + payload
+
+
+class ICMPEngine:
+    """
+    Moteur d'echo ICMP multiplexé : un seul socket pour toutes les requêtes en cours,
+    réponses associées par identifiant et numéro de séquence.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.sock, self.mode = self._open_socket()
+        self.sock.setblocking(False)
+        if self.mode == "dgram":
+            # Le noyau impose comme identifiant le "port" local du socket
+            self.sock.bind(("0.0.0.0", 0))
+            self.identifier = self.sock.getsockname()[1]
+        else:
+            self.identifier = os.getpid() & 0xFFFF
+        self._sequence = 0
+        self._pending: Dict[Tuple[str, int], Tuple[asyncio.Future, float]] = {}
+        loop.add_reader(self.sock.fileno(), self._on_readable)
+
+    @staticmethod
+    def _open_socket() -> Tuple[socket.socket, str]:
+        try:
+            return socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP), "dgram"
+        except OSError:
+            pass
+        try:
+            return socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP), "raw"
+        except OSError as e:
+            raise ICMPUnavailable(f"Socket ICMP indisponible : {e}")
+
+    def close(self) -> None:
+        self.loop.remove_reader(self.sock.fileno())
+        self.sock.close()
+        for future, _ in self._pending.values():
+            if not future.done():
+                future.cancel()
+        self._pending.clear()
+
+    def _next_sequence(self) -> int:
+        self._sequence = (self._sequence + 1) & 0xFFFF
+        return self._sequence
+
+    def _on_readable(self) -> None:
+        while True:
+            try:
+                packet, (address, _) = self.sock.recvfrom(65535)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                logger.debug(f"Erreur de réception ICMP : {e}")
+                return
+            received_at = time.perf_counter()
+            if self.mode == "raw":
+                packet = packet[(packet[0] & 0x0F) * 4:]
+            if len(packet) < 8:
+                continue
+            icmp_type, _, _, identifier, sequence = struct.unpack_from("!BBHHH", packet)
+            if icmp_type != ICMP_ECHO_REPLY or identifier != self.identifier:
+                continue
+            pending = self._pending.pop((address, sequence), None)
+            if pending is None:
+                continue
+            future, sent_at = pending
+            if not future.done():
+                future.set_result((received_at - sent_at) * 1000)
+
+    async def echo(self, address: str, timeout: float) -> Optional[float]:
+        """
+        Envoie une requête echo et retourne le RTT en ms (None si perdu).
+        """
+        sequence = self._next_sequence()
+        future = self.loop.create_future()
+        key = (address, sequence)
+        packet = build_echo_request(self.identifier, sequence)
+        self._pending[key] = (future, time.perf_counter())
+        try:
+            self.sock.sendto(packet, (address, 0))
+            return await asyncio.wait_for(future, timeout)
+        except (asyncio.TimeoutError, OSError):
+            return None
+        finally:
+            self._pending.pop(key, None)
+
+    async def ping(self, address: str, count: int, timeout: float, interval: float) -> List[Optional[float]]:
+        """
+        Envoie `count` requêtes espacées de `interval` secondes et retourne les RTT par paquet.
+        """
+        probes = []
+        for index in range(count):
+            if index:
+                await asyncio.sleep(interval)
+            probes.append(asyncio.ensure_future(self.echo(address, timeout)))
+        return list(await asyncio.gather(*probes))
+
+
+_engines: Dict[asyncio.AbstractEventLoop, ICMPEngine] = {}
+
+
+def get_engine() -> ICMPEngine:
+    """
+    Retourne le moteur partagé de la boucle d'événements courante.
+    """
+    loop = asyncio.get_running_loop()
+    engine = _engines.get(loop)
+    if engine is None:
+        for stale_loop in [l for l in _engines if l.is_closed()]:
+            _engines.pop(stale_loop).sock.close()
+        engine = ICMPEngine(loop)
+        _engines[loop] = engine
+    return engine
+
+
+async def resolve_ipv4(host: str) -> str:
+    infos = await asyncio.get_running_loop().getaddrinfo(host, None, family=socket.AF_INET, type=socket.SOCK_RAW)
+    if not infos:
+        raise ICMPUnavailable(f"Aucune adresse IPv4 pour {host}")
+    return infos[0][4][0]
+
+
+def format_raw_output(host: str, address: str, rtts: List[Optional[float]]) -> str:
+    """
+    Produit un texte au format de la commande ping (compatibilité de raw_output).
+    """
+    lines = [f"PING {host} ({address}) {PAYLOAD_SIZE}({PAYLOAD_SIZE + 28}) bytes of data."]
+    for sequence, rtt in enumerate(rtts, start=1):
+        if rtt is not None:
+            lines.append(f"{PAYLOAD_SIZE + 8} bytes from {address}: icmp_seq={sequence} time={rtt:.3f} ms")
+    received = [rtt for rtt in rtts if rtt is not None]
+    loss = round(100 * (len(rtts) - len(received)) / len(rtts)) if rtts else 0
+    lines += ["", f"--- {host} ping statistics ---",
+              f"{len(rtts)} packets transmitted, {len(received)} received, {loss}% packet loss"]
+    if received:
+        average = sum(received) / len(received)
+        mdev = (sum((rtt - average) ** 2 for rtt in received) / len(received)) ** 0.5
+        lines.append(f"rtt min/avg/max/mdev = {min(received):.3f}/{average:.3f}/{max(received):.3f}/{mdev:.3f} ms")
+    return "\n".join(lines)
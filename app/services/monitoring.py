@@ -0,0 +1,351 @@
+import asyncio
+import heapq
+import math
+import os
+import random
+import time
+import uuid
+import logging
+from array import array
+from typing import Dict, List, Optional
+from app.core import metrics
+from app.services.dns_resolver import RECORD_TYPES, DNSResolverError, resolve, validate_server
+from app.services.ping_service import measure_ping
+from app.utils.validators import is_valid_host
+
+logger = logging.getLogger("monitoring")
+
+# ⚙️ Planificateur de vérifications périodiques
+MONITOR_MAX_CHECKS = int(os.getenv("MONITOR_MAX_CHECKS", 10000))
+MONITOR_WORKERS = int(os.getenv("MONITOR_WORKERS", 100))
+MONITOR_MIN_INTERVAL = int(os.getenv("MONITOR_MIN_INTERVAL", 10))
+MONITOR_TIMEOUT = int(os.getenv("MONITOR_TIMEOUT", 2))
+# Écart aléatoire appliqué à chaque intervalle (fraction) : les vérifications ne s'alignent pas
+MONITOR_JITTER = float(os.getenv("MONITOR_JITTER", 0.1))
+
+# 📉 Historique : points bruts puis agrégats par minute et par heure (mémoire fixe par vérification)
+MONITOR_RAW_POINTS = int(os.getenv("MONITOR_RAW_POINTS", 120))
+MONITOR_MINUTE_POINTS = int(os.getenv("MONITOR_MINUTE_POINTS", 360))
+MONITOR_HOUR_POINTS = int(os.getenv("MONITOR_HOUR_POINTS", 168))
+
+TOOLS = ("ping", "dig")
+RAW_COLUMNS = (("time", "I"), ("latency_ms", "f"))
+AGGREGATE_COLUMNS = (("time", "I"), ("count", "H"), ("failures", "H"), ("min", "f"), ("avg", "f"), ("max", "f"))
+
+
+class MonitorLimitReached(Exception):
+    """Nombre maximal de vérifications atteint."""
+
+
+class CheckFailed(Exception):
+    """La cible n'a pas répondu correctement."""
+
+
+class Ring:
+    """
+    Tampon circulaire de taille fixe : une colonne array par champ, allouée à la création.
+    """
+    __slots__ = ("capacity", "names", "columns", "start", "size")
+
+    def __init__(self, capacity: int, columns):
+        self.capacity = capacity
+        self.names = [name for name, _ in columns]
+        self.columns = [array(code, [0]) * capacity for _, code in columns]
+        self.start = 0
+        self.size = 0
+
+    def append(self, *values) -> None:
+        index = (self.start + self.size) % self.capacity
+        if self.size == self.capacity:
+            self.start = (self.start + 1) % self.capacity
+        else:
+            self.size += 1
+        for column, value in zip(self.columns, values):
+            column[index] = value
+
+    def rows(self, since: float = 0) -> List[Dict]:
+        rows = []
+        for offset in range(self.size):
+            index = (self.start + offset) % self.capacity
+            if self.columns[0][index] >= since:
+                rows.append({name: column[index] for name, column in zip(self.names, self.columns)})
+        return rows
+
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in self.columns)
+
+
+class Bucket:
+    """
+    Agrégat en cours de construction (minute ou heure courante).
+    """
+    __slots__ = ("start", "count", "failures", "total", "min", "max")
+
+    def __init__(self):
+        self.reset(0)
+
+    def reset(self, start: int) -> None:
+        self.start, self.count, self.failures, self.total = start, 0, 0, 0.0
+        self.min, self.max = math.inf, -math.inf
+
+    def add(self, value: Optional[float]) -> None:
+        self.count += 1
+        if value is None:
+            self.failures += 1
+            return
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def row(self) -> tuple:
+        answered = self.count - self.failures
+        if not answered:
+            return self.start, self.count, self.failures, math.nan, math.nan, math.nan
+        return self.start, self.count, self.failures, self.min, self.total / answered, self.max
+
+
+class Series:
+    """
+    Historique d'une vérification : brut → 1 min → 1 h.
+    """
+    __slots__ = ("raw", "levels")
+
+    def __init__(self):
+        self.raw = Ring(MONITOR_RAW_POINTS, RAW_COLUMNS)
+        self.levels = {
+            "1m": (60, Ring(MONITOR_MINUTE_POINTS, AGGREGATE_COLUMNS), Bucket()),
+            "1h": (3600, Ring(MONITOR_HOUR_POINTS, AGGREGATE_COLUMNS), Bucket()),
+        }
+
+    def add(self, timestamp: float, value: Optional[float]) -> None:
+        """
+        Enregistre une mesure (None = échec) ; un agrégat est archivé quand sa période est écoulée.
+        """
+        timestamp = int(timestamp)
+        self.raw.append(timestamp, math.nan if value is None else value)
+        for period, ring, bucket in self.levels.values():
+            start = timestamp - timestamp % period
+            if bucket.start != start:
+                if bucket.count:
+                    ring.append(*bucket.row())
+                bucket.reset(start)
+            bucket.add(value)
+
+    def history(self, resolution: str = "raw", since: float = 0) -> List[Dict]:
+        if resolution == "raw":
+            return [{"time": row["time"], "success": not math.isnan(row["latency_ms"]),
+                     "latency_ms": _number(row["latency_ms"])} for row in self.raw.rows(since)]
+        if resolution not in self.levels:
+            raise ValueError(f"Résolution invalide : '{resolution}' (raw, 1m ou 1h)")
+        _, ring, bucket = self.levels[resolution]
+        rows = ring.rows(since)
+        # L'agrégat en cours est renvoyé en dernier (période incomplète)
+        if bucket.count and bucket.start >= since:
+            rows.append(dict(zip(ring.names, bucket.row())))
+        return [dict(row, min=_number(row["min"]), avg=_number(row["avg"]), max=_number(row["max"])) for row in rows]
+
+    def nbytes(self) -> int:
+        return self.raw.nbytes() + sum(ring.nbytes() for _, ring, _ in self.levels.values())
+
+
+def _number(value: float) -> Optional[float]:
+    return None if math.isnan(value) else round(value, 3)
+
+
+class Check:
+    __slots__ = ("id", "tool", "target", "interval", "options", "series", "due", "running", "last")
+
+    def __init__(self, tool: str, target: str, interval: int, options: Dict):
+        self.id = uuid.uuid4().hex
+        self.tool = tool
+        self.target = target
+        self.interval = interval
+        self.options = options
+        self.series = Series()
+        self.due = 0.0
+        self.running = False
+        self.last: Optional[Dict] = None
+
+    def to_dict(self) -> Dict:
+        return {"id": self.id, "tool": self.tool, "target": self.target, "interval": self.interval,
+                "options": self.options, "last": self.last}
+
+
+# 🩺 Exécution d'une vérification : latence en ms, ou CheckFailed
+async def run_ping(check: Check) -> float:
+    response = await measure_ping(check.target, 1, MONITOR_TIMEOUT)
+    if not response.success:
+        raise CheckFailed(response.error)
+    return response.output["rtt_avg"]
+
+
+async def run_dig(check: Check) -> float:
+    start = time.perf_counter()
+    # Le cache DNS fausserait la mesure : le serveur est interrogé à chaque fois
+    result = await resolve(check.target, check.options["record_type"], check.options.get("dns_server"),
+                           timeout=MONITOR_TIMEOUT, use_cache=False)
+    if result["status"] != "NOERROR" or not result["answers"]:
+        raise CheckFailed(f"Réponse {result['status']} sans enregistrement")
+    return (time.perf_counter() - start) * 1000
+
+
+RUNNERS = {"ping": run_ping, "dig": run_dig}
+
+
+class MonitorScheduler:
+    """
+    Vérifications périodiques réparties dans le temps et exécutées par un nombre borné de workers.
+
+    Une vérification encore en cours (ou en attente d'un worker) à sa prochaine échéance
+    est sautée plutôt que dupliquée. Les vérifications sont conservées en mémoire du
+    processus : l'API doit tourner avec un seul worker uvicorn pour les utiliser.
+    """
+
+    def __init__(self, workers: int = MONITOR_WORKERS, max_checks: int = MONITOR_MAX_CHECKS):
+        self.workers = workers
+        self.max_checks = max_checks
+        self.checks: Dict[str, Check] = {}
+        self.skipped = 0
+        self._active = 0
+        self._heap: List = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop = None
+        self._tasks = []
+
+    def start(self) -> None:
+        """
+        Démarre le planificateur et ses workers dans la boucle courante (lifespan de
+        l'application ; à défaut, au premier ajout de vérification).
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_checks)
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.ensure_future(self._schedule()))
+        # Échéances exprimées dans l'horloge de la nouvelle boucle
+        self._heap = []
+        for check in self.checks.values():
+            self._plan(check, loop.time() + random.uniform(0, check.interval))
+
+    async def stop(self) -> None:
+        """
+        Arrête le planificateur et les vérifications en cours (arrêt de l'application).
+        """
+        tasks, self._tasks, self._loop = self._tasks, [], None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for check in self.checks.values():
+            check.running = False
+
+    def _plan(self, check: Check, due: float) -> None:
+        check.due = due
+        heapq.heappush(self._heap, (due, check.id))
+
+    def add(self, tool: str, target: str, interval: int, options: Dict = None) -> Check:
+        """
+        Raises:
+            ValueError: Outil, cible ou intervalle invalide
+            MonitorLimitReached: Si le nombre maximal de vérifications est atteint
+        """
+        options = dict(options or {})
+        if tool not in RUNNERS:
+            raise ValueError(f"Outil non supporté : '{tool}' ({', '.join(TOOLS)})")
+        if not is_valid_host(target):
+            raise ValueError(f"Hôte invalide: '{target}'")
+        if interval < MONITOR_MIN_INTERVAL:
+            raise ValueError(f"Intervalle minimal : {MONITOR_MIN_INTERVAL} secondes")
+        if tool == "dig":
+            options["record_type"] = options.get("record_type", "A").upper()
+            if options["record_type"] not in RECORD_TYPES:
+                raise ValueError(f"Type d'enregistrement non supporté : '{options['record_type']}'")
+            if options.get("dns_server"):
+                try:
+                    validate_server(options["dns_server"])
+                except DNSResolverError as e:
+                    raise ValueError(str(e))
+        if len(self.checks) >= self.max_checks:
+            raise MonitorLimitReached(f"Nombre maximal de vérifications atteint ({self.max_checks})")
+
+        self.start()
+        check = Check(tool, target, interval, options)
+        self.checks[check.id] = check
+        # Première exécution à un instant aléatoire de l'intervalle : les créations en masse sont étalées
+        self._plan(check, self._loop.time() + random.uniform(0, interval))
+        self._wakeup.set()
+        return check
+
+    def get(self, check_id: str) -> Optional[Check]:
+        return self.checks.get(check_id)
+
+    def remove(self, check_id: str) -> Optional[Check]:
+        # L'échéance restée dans le tas est ignorée à son tour
+        return self.checks.pop(check_id, None)
+
+    async def _schedule(self) -> None:
+        while True:
+            now = self._loop.time()
+            while self._heap and self._heap[0][0] <= now:
+                due, check_id = heapq.heappop(self._heap)
+                check = self.checks.get(check_id)
+                if check is None or check.due != due:
+                    continue
+                jitter = 1 + random.uniform(-MONITOR_JITTER, MONITOR_JITTER)
+                self._plan(check, max(due + check.interval * jitter, now))
+                if check.running:
+                    self.skipped += 1
+                    continue
+                check.running = True
+                self._queue.put_nowait(check)
+
+            self._wakeup.clear()
+            delay = self._heap[0][0] - now if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _worker(self) -> None:
+        while True:
+            check = await self._queue.get()
+            self._active += 1
+            try:
+                await self._execute(check)
+            except Exception as e:
+                logger.error(f"Erreur inattendue pour la vérification {check.id}: {e}")
+            finally:
+                self._active -= 1
+                check.running = False
+                self._queue.task_done()
+
+    async def _execute(self, check: Check) -> None:
+        if check.id not in self.checks:
+            return  # supprimée entre-temps
+        timestamp = time.time()
+        try:
+            latency, error = await RUNNERS[check.tool](check), None
+        except Exception as e:
+            latency, error = None, str(e) or e.__class__.__name__
+        check.series.add(timestamp, latency)
+        check.last = {"time": int(timestamp), "success": error is None,
+                      "latency_ms": _number(latency) if latency is not None else None, "error": error}
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "checks": len(self.checks),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": self._active,
+            "skipped": self.skipped,
+            "history_bytes": sum(check.series.nbytes() for check in self.checks.values()),
+        }
+
+
+scheduler = MonitorScheduler()
+metrics.registry.register(metrics.CallbackGauge(
+    "network_api_monitoring", "Vérifications planifiées (nombre, en attente, en cours, sautées, mémoire)", ("stat",),
+    lambda: {(stat,): value for stat, value in scheduler.stats().items()}
+))
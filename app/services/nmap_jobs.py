@@ -0,0 +1,324 @@
+import asyncio
+import itertools
+import json
+import os
+import re
+import time
+import uuid
+import logging
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional
+from fastapi.encoders import jsonable_encoder
+from app.core import metrics
+from app.models.response_model import CommandResponse
+from app.services.nmap_service import NmapService
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou de fichier POSIX
+    fcntl = None
+
+logger = logging.getLogger("nmap-jobs")
+
+# ⚙️ Configuration des tâches nmap asynchrones
+NMAP_JOB_WORKERS = int(os.getenv("NMAP_JOB_WORKERS", 2))
+NMAP_JOB_QUEUE_SIZE = int(os.getenv("NMAP_JOB_QUEUE_SIZE", 100))
+NMAP_JOB_RETENTION = int(os.getenv("NMAP_JOB_RETENTION", 86400))
+NMAP_JOB_STORE = os.getenv("NMAP_JOB_STORE", "memory").lower()
+NMAP_JOB_DIR = os.getenv("NMAP_JOB_DIR", os.path.join("data", "nmap_jobs"))
+NMAP_JOB_MAX_MEMORY = int(os.getenv("NMAP_JOB_MAX_MEMORY", 1000))
+# Intervalle de relecture du statut d'un scan en cours (annulation depuis un autre worker, stockage disk)
+NMAP_JOB_CANCEL_POLL = float(os.getenv("NMAP_JOB_CANCEL_POLL", 1.0))
+
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+FINAL_STATUSES = {"done", "failed", "cancelled"}
+INTERRUPTED_ERROR = "Scan interrompu par un redémarrage du service, relancez-le"
+
+
+class JobQueueFull(Exception):
+    """La file d'attente des scans est pleine."""
+
+
+# 🗄️ Stockage des tâches
+class JobStore(ABC):
+    """Interface de stockage des tâches (une tâche = un dictionnaire sérialisable en JSON)."""
+
+    @abstractmethod
+    def save(self, job: Dict) -> None:
+        ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def prune(self, max_age: float) -> None:
+        ...
+
+
+class MemoryJobStore(JobStore):
+    def __init__(self, max_jobs: int = NMAP_JOB_MAX_MEMORY):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, Dict]" = OrderedDict()
+
+    def save(self, job: Dict) -> None:
+        self._jobs[job["id"]] = dict(job)
+        while len(self._jobs) > self.max_jobs:
+            # On évince en priorité la plus ancienne tâche terminée
+            oldest = next((job_id for job_id, item in self._jobs.items() if item["status"] in FINAL_STATUSES), None)
+            if oldest is None:
+                break
+            del self._jobs[oldest]
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        job = self._jobs.get(job_id)
+        return dict(job) if job else None
+
+    def prune(self, max_age: float) -> None:
+        limit = time.time() - max_age
+        for job_id in [j for j, item in self._jobs.items()
+                       if item["status"] in FINAL_STATUSES and (item["finished_at"] or 0) < limit]:
+            del self._jobs[job_id]
+
+
+class DiskJobStore(JobStore):
+    """
+    Un fichier JSON par tâche : lisible par tous les workers et conservé après redémarrage.
+
+    Chaque store tient un verrou fcntl sur son fichier `<worker>.lock` tant que le processus
+    vit ; au chargement, les tâches en attente ou en cours dont le worker n'existe plus
+    (verrou libre) sont marquées en échec au lieu de rester bloquées.
+    """
+
+    def __init__(self, directory: str = NMAP_JOB_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.worker = uuid.uuid4().hex
+        self._lock_fd = None
+        if fcntl is not None:
+            # Verrou pris avant que le fichier soit visible : un fichier .lock libre est celui d'un worker arrêté
+            temporary = f"{self._lock_path(self.worker)}.{os.getpid()}.tmp"
+            self._lock_fd = os.open(temporary, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            os.replace(temporary, self._lock_path(self.worker))
+        self.recover()
+
+    def _lock_path(self, worker: str) -> str:
+        return os.path.join(self.directory, f"{worker}.lock")
+
+    def _worker_alive(self, worker: Optional[str]) -> bool:
+        if worker == self.worker:
+            return True
+        if fcntl is None or not worker or not JOB_ID_PATTERN.match(worker):
+            return False
+        try:
+            fd = os.open(self._lock_path(worker), os.O_RDWR)
+        except OSError:
+            return False
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return True  # verrou tenu par un worker en vie
+        finally:
+            os.close(fd)
+        return False
+
+    def recover(self) -> None:
+        """
+        Marque en échec les tâches abandonnées par un worker arrêté : leur file d'attente
+        et le scan en cours ont disparu avec lui.
+        """
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            job = self.get(name[:-5])
+            if not job or job["status"] in FINAL_STATUSES or self._worker_alive(job.get("worker")):
+                continue
+            job.update(
+                status="failed",
+                finished_at=time.time(),
+                result=jsonable_encoder(CommandResponse(success=False, output="", error=INTERRUPTED_ERROR))
+            )
+            self.save(job)
+            logger.warning(f"Tâche {job['id']} interrompue par l'arrêt de son worker")
+        for name in os.listdir(self.directory):
+            if name.endswith(".lock") and not self._worker_alive(name[:-5]):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+
+    def _path(self, job_id: str) -> str:
+        if not JOB_ID_PATTERN.match(job_id):
+            raise ValueError("Identifiant de tâche invalide")
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def save(self, job: Dict) -> None:
+        path = self._path(job["id"])
+        if job["status"] not in FINAL_STATUSES and "worker" not in job:
+            job = dict(job, worker=self.worker)  # worker qui détient la file d'attente et le scan
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump(job, handle, ensure_ascii=False)
+        os.replace(temporary, path)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        try:
+            with open(self._path(job_id), encoding="utf-8") as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+    def prune(self, max_age: float) -> None:
+        limit = time.time() - max_age
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if name.endswith(".json") and os.path.getmtime(path) < limit:
+                    job = self.get(name[:-5])
+                    if job and job["status"] in FINAL_STATUSES:
+                        os.remove(path)
+            except OSError:
+                continue
+
+
+def create_store() -> JobStore:
+    return DiskJobStore() if NMAP_JOB_STORE == "disk" else MemoryJobStore()
+
+
+# 🏃 Exécution des tâches
+class NmapJobManager:
+    """
+    File de scans nmap avec priorités, exécutée par un nombre borné de workers.
+    """
+
+    def __init__(self, store: JobStore, workers: int = NMAP_JOB_WORKERS, queue_size: int = NMAP_JOB_QUEUE_SIZE):
+        self.store = store
+        self.workers = workers
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._loop = None
+        self._worker_tasks = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._counter = itertools.count()
+
+    def _ensure_workers(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.PriorityQueue(maxsize=self.queue_size)
+        self._worker_tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, host: str, scan_mode: str, ports: Optional[str], only_open: bool, priority: int = 5) -> Dict:
+        """
+        Enregistre un scan et le place en file d'attente (0 = priorité la plus haute).
+
+        Raises:
+            JobQueueFull: Si la file d'attente est pleine
+        """
+        self._ensure_workers()
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": "queued",
+            "priority": priority,
+            "params": {"host": host, "scan_mode": scan_mode, "ports": ports, "only_open": only_open},
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+        }
+        try:
+            self._queue.put_nowait((priority, next(self._counter), job["id"]))
+        except asyncio.QueueFull:
+            raise JobQueueFull("File d'attente des scans pleine, réessayez plus tard")
+        self.store.save(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        try:
+            return self.store.get(job_id)
+        except ValueError:
+            return None
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """
+        Annule la tâche ; si elle s'exécute dans un autre worker (stockage disk), celui-ci
+        arrête le scan à la prochaine relecture du statut (NMAP_JOB_CANCEL_POLL).
+        """
+        job = self.get(job_id)
+        if job is None or job["status"] in FINAL_STATUSES:
+            return job
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        job.update(status="cancelled", finished_at=time.time())
+        self.store.save(job)
+        return job
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, job_id = await self._queue.get()
+            try:
+                await self._execute(job_id)
+            except Exception as e:
+                logger.error(f"Erreur inattendue pour la tâche {job_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _cancelled(self, job_id: str) -> bool:
+        job = self.store.get(job_id)
+        return job is None or job["status"] == "cancelled"
+
+    async def _execute(self, job_id: str) -> None:
+        job = self.store.get(job_id)
+        if job is None or job["status"] != "queued":
+            return  # annulée entre-temps
+
+        job.update(status="running", started_at=time.time())
+        self.store.save(job)
+
+        params = job["params"]
+        task = asyncio.ensure_future(NmapService().run(
+            params["host"], params["scan_mode"], params["ports"], params["only_open"]
+        ))
+        self._running[job_id] = task
+        try:
+            while not task.done():
+                await asyncio.wait({task}, timeout=NMAP_JOB_CANCEL_POLL)
+                if not task.done() and self._cancelled(job_id):
+                    task.cancel()
+            result = await task
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                task.cancel()
+                raise  # c'est le worker lui-même qui est arrêté
+            return  # statut "cancelled" déjà enregistré par cancel()
+        finally:
+            self._running.pop(job_id, None)
+
+        if self._cancelled(job_id):
+            return  # annulée pendant la fin du scan : le résultat n'écrase pas le statut
+
+        job.update(
+            status="done" if result.success else "failed",
+            finished_at=time.time(),
+            result=jsonable_encoder(result)
+        )
+        self.store.save(job)
+        self.store.prune(NMAP_JOB_RETENTION)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": len(self._running),
+            "workers": self.workers,
+        }
+
+
+job_manager = NmapJobManager(create_store())
+metrics.registry.register(metrics.CallbackGauge(
+    "network_api_nmap_jobs", "File des scans nmap asynchrones (en attente, en cours, workers)", ("state",),
+    lambda: {(state,): value for state, value in job_manager.stats().items()}
+))
@@ -1,77 +1,205 @@
+import ipaddress
+import math
+import os
 import subprocess
+import xml.etree.ElementTree as ET
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from app.core import metrics
 from app.models.response_model import CommandResponse
+from app.services.command_runner import stream_command
+from app.services.result_store import result_store
+from app.services.tool_registry import registry
+from app.utils.validators import is_valid_host, is_valid_network
+
+# 🎯 Limites des scans multi-cibles
+NMAP_MAX_ADDRESSES = int(os.getenv("NMAP_MAX_ADDRESSES", 1024))
+NMAP_HOSTS_PER_TIMEOUT = int(os.getenv("NMAP_HOSTS_PER_TIMEOUT", 16))
+NMAP_MAX_TIMEOUT = int(os.getenv("NMAP_MAX_TIMEOUT", 3600))
+
+# 💾 Durée de conservation des scans réussis (réutilisables via max_age)
+NMAP_RESULT_TTL = int(os.getenv("NMAP_RESULT_TTL", 86400))
+# Durée de validité des réponses côté clients et caches HTTP (Cache-Control: max-age)
+NMAP_HTTP_MAX_AGE = int(os.getenv("NMAP_HTTP_MAX_AGE", 300))
 
 class NmapService:
-    def run(self, host: str, scan_mode: str = "top100", ports: str = None, only_open: bool = False) -> CommandResponse:
-        try:
-            command = ["nmap", "-sV", "-Pn"]
-
-            # Mode de scan
-            if scan_mode == "all":
-                command += ["-p-"]
-                timeout = 300
-            elif scan_mode == "custom" and ports:
-                command += ["-p", ports]
-                timeout = 60
+    def parse_targets(self, host: str) -> Tuple[List[str], int]:
+        """
+        Découpe la cible (hôtes et/ou blocs CIDR séparés par des virgules).
+
+        Returns:
+            Tuple: liste des cibles et nombre total d'adresses
+
+        Raises:
+            ValueError: Cible invalide ou trop d'adresses
+        """
+        targets = []
+        addresses = 0
+        for item in host.split(","):
+            item = item.strip()
+            if is_valid_network(item):
+                addresses += ipaddress.ip_network(item, strict=False).num_addresses
+            elif is_valid_host(item):
+                addresses += 1
             else:
-                command += ["--top-ports", "100"]
-                timeout = 30
+                raise ValueError(f"Cible invalide : '{item}'")
+            targets.append(item)
+        if addresses > NMAP_MAX_ADDRESSES:
+            raise ValueError(f"Trop d'adresses à scanner ({addresses}, maximum {NMAP_MAX_ADDRESSES})")
+        return targets, addresses
+
+    def build_command(self, host: str, scan_mode: str = "top100", ports: str = None) -> Tuple[List[str], int]:
+        targets, addresses = self.parse_targets(host)
+        # Sortie XML sur stdout, analysée au fil de l'eau
+        command = [registry.path("nmap"), "-sV", "-Pn", "-oX", "-"]
 
-            command.append(host)
+        # Mode de scan
+        if scan_mode == "all":
+            command += ["-p-"]
+            timeout = 300
+        elif scan_mode == "custom" and ports:
+            command += ["-p", ports]
+            timeout = 60
+        else:
+            command += ["--top-ports", "100"]
+            timeout = 30
 
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                timeout=timeout
-            )
+        # nmap scanne les hôtes par groupes : le délai croît avec le nombre de groupes
+        timeout = min(timeout * math.ceil(addresses / NMAP_HOSTS_PER_TIMEOUT), NMAP_MAX_TIMEOUT)
 
-            if result.returncode != 0:
-                return CommandResponse(
-                    success=False,
-                    output="",
-                    error=(result.stderr or "").strip()
-                )
+        command += targets
+        return command, timeout
 
-            parsed = self.parse_nmap(result.stdout, host, only_open)
-            return CommandResponse(success=True, output=parsed, error=None)
+    async def iter_hosts(self, host: str, scan_mode: str, ports: Optional[str], only_open: bool) -> AsyncIterator[Dict]:
+        """
+        Lance nmap et produit chaque hôte dès que son bloc XML est complet.
+        """
+        command, timeout = self.build_command(host, scan_mode, ports)
+        parser = NmapXMLParser(only_open)
+        async for line in stream_command("nmap", command, timeout=timeout):
+            for scanned_host in parser.feed(line + "\n"):
+                yield scanned_host
 
+    def store_params(self, host: str, scan_mode: str, ports: Optional[str], only_open: bool) -> Dict:
+        targets = ",".join(item.strip().lower() for item in host.split(","))
+        return {"host": targets, "scan_mode": scan_mode, "ports": ports if scan_mode == "custom" else None,
+                "only_open": only_open}
+
+    async def run(self, host: str, scan_mode: str = "top100", ports: str = None, only_open: bool = False,
+                  max_age: int = None) -> CommandResponse:
+        """
+        Lance le scan, ou retourne un scan identique stocké il y a moins de max_age secondes.
+        """
+        params = self.store_params(host, scan_mode, ports, only_open)
+        if max_age is not None:
+            stored = await result_store.get("nmap", params, max_age)
+            if stored is not None:
+                output, age = stored
+                return CommandResponse(success=True, output=dict(output, cache_age=int(age)), error=None)
+
+        try:
+            hosts = [scanned async for scanned in self.iter_hosts(host, scan_mode, ports, only_open)]
+            output = self.summarize(host, hosts)
+            result_store.save("nmap", params, output, NMAP_RESULT_TTL)
+            return CommandResponse(success=True, output=output, error=None)
+
+        except subprocess.CalledProcessError as e:
+            metrics.tool_errors.inc("nmap")
+            return CommandResponse(success=False, output="", error=(e.stderr or "").strip())
+        except subprocess.TimeoutExpired:
+            metrics.tool_timeouts.inc("nmap")
+            return CommandResponse(success=False, output="", error="Le scan nmap a pris trop de temps (timeout dépassé).")
         except Exception as e:
+            metrics.tool_errors.inc("nmap")
             return CommandResponse(success=False, output="", error=str(e))
 
+    async def stream(self, host: str, scan_mode: str = "top100", ports: str = None, only_open: bool = False) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Produit les ports ("port") puis le résumé ("host") de chaque hôte terminé, et un événement final ("done").
+        """
+        error = None
+        try:
+            async for scanned_host in self.iter_hosts(host, scan_mode, ports, only_open):
+                for port in scanned_host["ports"]:
+                    yield "port", dict(port, address=scanned_host["address"])
+                yield "host", scanned_host
+        except subprocess.TimeoutExpired:
+            metrics.tool_timeouts.inc("nmap")
+            error = "Le scan nmap a pris trop de temps (timeout dépassé)."
+        except subprocess.CalledProcessError as e:
+            metrics.tool_errors.inc("nmap")
+            error = (e.stderr or "").strip() or f"Code retour {e.returncode}"
+        except Exception as e:
+            metrics.tool_errors.inc("nmap")
+            error = str(e)
+        yield "done", {"host": host, "success": error is None, "error": error}
+
+    def summarize(self, host: str, hosts: List[Dict]) -> dict:
+        return {
+            "host": host,
+            "hosts": hosts,
+            # Vue à plat de tous les ports, chacun rattaché à son adresse
+            "ports": [dict(port, address=scanned["address"]) for scanned in hosts for port in scanned["ports"]]
+        }
+
     def parse_nmap(self, output: str, host: str, only_open: bool) -> dict:
-        ports = []
-        capture = False
+        parser = NmapXMLParser(only_open)
+        return self.summarize(host, list(parser.feed(output)))
 
-        for line in output.splitlines():
-            if line.startswith("PORT"):
-                capture = True
+
+class NmapXMLParser:
+    """
+    Analyse incrémentale de la sortie XML de nmap (-oX -) : chaque élément <host>
+    est converti puis libéré, la mémoire reste bornée quel que soit le nombre d'hôtes.
+    """
+
+    def __init__(self, only_open: bool = False):
+        self.only_open = only_open
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._root = None
+
+    def feed(self, data: str) -> List[Dict]:
+        self._parser.feed(data)
+        hosts = []
+        for event, element in self._parser.read_events():
+            if event == "start":
+                if self._root is None:
+                    self._root = element
                 continue
+            if element.tag == "host":
+                hosts.append(self.parse_host(element))
+                if self._root is not None:
+                    self._root.remove(element)
+        return hosts
 
-            if capture:
-                if not line.strip() or line.startswith("Nmap done"):
-                    break
-                parts = line.split()
-                if len(parts) >= 3 and "/" in parts[0]:
-                    try:
-                        port_proto = parts[0]
-                        port = int(port_proto.split("/")[0])
-                        state = parts[1]
-                        service = parts[2]
-
-                        if only_open and state.lower() != "open":
-                            continue  # On ne garde que les ports ouverts si demandé
-
-                        ports.append({
-                            "port": port,
-                            "state": state,
-                            "service": service
-                        })
-                    except ValueError:
-                        continue  # Ignore ligne non conforme
+    def parse_host(self, element: ET.Element) -> Dict:
+        address = None
+        for addr in element.findall("address"):
+            if addr.get("addrtype") in ("ipv4", "ipv6") or address is None:
+                address = addr.get("addr")
+        status = element.find("status")
+
+        ports = []
+        for port in element.iterfind("ports/port"):
+            state = port.find("state")
+            state_name = state.get("state") if state is not None else "unknown"
+            if self.only_open and state_name.lower() != "open":
+                continue  # On ne garde que les ports ouverts si demandé
+            service = port.find("service")
+            record = {
+                "port": int(port.get("portid")),
+                "protocol": port.get("protocol"),
+                "state": state_name,
+                "service": service.get("name") if service is not None else None,
+            }
+            if service is not None:
+                for field in ("product", "version", "extrainfo"):
+                    if service.get(field):
+                        record[field] = service.get(field)
+            ports.append(record)
 
         return {
-            "host": host,
+            "address": address,
+            "hostnames": [name.get("name") for name in element.iterfind("hostnames/hostname")],
+            "status": status.get("state") if status is not None else None,
             "ports": ports
         }
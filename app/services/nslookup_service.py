@@ -1,33 +1,32 @@
-import subprocess
+from app.core import metrics
 from app.models.response_model import CommandResponse
-import re
+from app.services.dns_resolver import resolve, reverse_name, is_ip_address, collect
 
 class NslookupService:
-    def run(self, host: str) -> CommandResponse:
+    async def run(self, host: str, dns_server: str = None) -> CommandResponse:
         try:
-            result = subprocess.run(
-                ["nslookup", host],
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                timeout=10
-            )
+            if is_ip_address(host):
+                # Résolution inverse (PTR), comme nslookup avec une adresse IP
+                result = await resolve(reverse_name(host), "PTR", dns_server)
+                names = collect(result["answers"], "PTR")
+                domain_name = names[0] if names else None
+                resolved_ip = host
+            else:
+                result = await resolve(host, "A", dns_server)
+                addresses = collect(result["answers"], "A")
+                canonical = [a["name"] for a in result["answers"] if a["type"] == "A"]
+                domain_name = canonical[0].rstrip(".") if canonical else None
+                resolved_ip = addresses[0] if addresses else None
 
-            if result.returncode != 0:
+            if result["status"] != "NOERROR":
                 return CommandResponse(
                     success=False,
                     output="",
-                    error=(result.stderr or "").strip()
+                    error=f"** server can't find {host}: {result['status']}"
                 )
 
-            # Analyse de la sortie brute
-            output = result.stdout.strip()
-            dns_server = self.extract_field(output, r"Server:\s*(.*)")
-            domain_name = self.extract_field(output, r"Name:\s*(.*)")
-            resolved_ip = self.extract_field(output, r"Address:\s*(\d+\.\d+\.\d+\.\d+)$")
-
             data = {
-                "dns_server": dns_server,
+                "dns_server": result["server"],
                 "domain": domain_name,
                 "ip": resolved_ip
             }
@@ -39,12 +38,9 @@ class NslookupService:
             )
 
         except Exception as e:
+            metrics.record_failure("nslookup", e)
             return CommandResponse(
                 success=False,
                 output="",
                 error=str(e)
             )
-
-    def extract_field(self, text: str, pattern: str) -> str:
-        match = re.search(pattern, text, re.MULTILINE)
-        return match.group(1).strip() if match else None
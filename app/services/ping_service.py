@@ -1,24 +1,48 @@
+import os
+import socket
 import subprocess
 import re
 import logging
-import platform
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from app.core import metrics
+from app.core.access_log import tool_timer
 from app.models.response_model import CommandResponse
+from app.services.command_runner import run_command
+from app.services.singleflight import singleflight, normalize_host
+from app.services.icmp_engine import ICMPUnavailable, get_engine, resolve_ipv4, format_raw_output
+from app.services.ping_statistics import rtt_statistics
+from app.services.tool_registry import SYSTEM, registry
 
 logger = logging.getLogger("ping-service")
 
-async def execute_ping(host: str, count: int = 4, timeout: int = 2) -> CommandResponse:
+# ⚙️ Moteur de ping : auto (ICMP natif si possible), native ou subprocess
+PING_ENGINE = os.getenv("PING_ENGINE", "auto").lower()
+PING_INTERVAL = float(os.getenv("PING_INTERVAL", 1.0))
+
+# RTT par paquet dans la sortie de la commande ping
+UNIX_REPLY = re.compile(r"icmp_seq=(\d+).*?time[=<]([\d.]+) ?ms")
+WINDOWS_REPLY = re.compile(r"time[=<](\d+)ms")
+
+async def execute_ping(host: str, count: int = 4, timeout: int = 2, raw_output: bool = True) -> CommandResponse:
     """
     Exécute la commande ping vers un hôte spécifié de façon sécurisée.
+    Les appels identiques simultanés partagent une seule exécution.
     
     Args:
         host: Nom d'hôte ou adresse IP à pinger
         count: Nombre de paquets à envoyer
         timeout: Délai d'attente en secondes
+        raw_output: Inclure la sortie brute dans la réponse
     
     Returns:
         CommandResponse: Résultat formaté de la commande ping
     """
+    return add_statistics([await measure_ping(host, count, timeout)], raw_output)[0]
+
+async def measure_ping(host: str, count: int = 4, timeout: int = 2) -> CommandResponse:
+    """
+    Ping sans statistiques de distribution (RTT par paquet, min/avg/max) : voir add_statistics.
+    """
     # Double validation côté service
     if not host or not isinstance(host, str):
         return CommandResponse(success=False, output=None, error="Hôte invalide")
@@ -29,37 +53,98 @@ async def execute_ping(host: str, count: int = 4, timeout: int = 2) -> CommandRe
     if not (1 <= timeout <= 5):
         return CommandResponse(success=False, output=None, error="Le timeout doit être entre 1 et 5 secondes")
 
+    key = ("ping", normalize_host(host), count, timeout)
+    return await singleflight.do(key, lambda: _run_ping(host, count, timeout))
+
+async def _run_ping(host: str, count: int, timeout: int) -> CommandResponse:
+    if PING_ENGINE != "subprocess" and ":" not in host:
+        try:
+            return await _run_native_ping(host, count, timeout)
+        except ICMPUnavailable as e:
+            if PING_ENGINE == "native":
+                return CommandResponse(success=False, output=None, error=str(e))
+            logger.info(f"ICMP natif indisponible, repli sur la commande ping : {e}")
+
     try:
-        # Détection du système
-        system = platform.system().lower()
-        if system == "windows":
-            command = ["ping", "-n", str(count), "-w", str(timeout * 1000), host]
+        # Système et chemin de l'exécutable détectés au démarrage
+        if SYSTEM == "windows":
+            command = [registry.path("ping"), "-n", str(count), "-w", str(timeout * 1000), host]
         else:
-            command = ["ping", "-c", str(count), "-W", str(timeout), host]
+            command = [registry.path("ping"), "-c", str(count), "-W", str(timeout), host]
 
-        process = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            timeout=timeout * count + 5,
-            check=False
-        )
+        process = await run_command("ping", command, timeout=timeout * count + 5)
 
         if process.returncode == 0:
-            parsed = parse_ping_output(process.stdout, system)
+            parsed = parse_ping_output(process.stdout, SYSTEM)
             return CommandResponse(success=True, output=parsed, error=None)
         else:
             error_msg = "Hôte injoignable" if "100% packet loss" in process.stdout else process.stderr
             return CommandResponse(success=False, output=None, error=error_msg.strip())
 
     except subprocess.TimeoutExpired:
+        metrics.tool_timeouts.inc("ping")
         logger.warning(f"Timeout lors du ping vers {host}")
         return CommandResponse(success=False, output=None, error="Timeout lors de l'exécution de la commande")
 
     except Exception as e:
+        metrics.tool_errors.inc("ping")
         logger.error(f"Erreur pendant l'exécution du ping vers {host}: {str(e)}")
         return CommandResponse(success=False, output=None, error=f"Erreur: {str(e)}")
 
+async def _run_native_ping(host: str, count: int, timeout: int) -> CommandResponse:
+    """
+    Ping via le moteur ICMP intégré (sans processus externe).
+
+    Raises:
+        ICMPUnavailable: Si aucun socket ICMP n'est utilisable
+    """
+    engine = get_engine()
+    try:
+        address = await resolve_ipv4(host)
+    except socket.gaierror:
+        return CommandResponse(success=False, output=None, error=f"ping: {host}: Name or service not known")
+
+    with tool_timer(), metrics.track("ping", "native"):
+        rtts = await engine.ping(address, count, timeout, PING_INTERVAL)
+    if all(rtt is None for rtt in rtts):
+        return CommandResponse(success=False, output=None, error="Hôte injoignable")
+    return CommandResponse(success=True, output=build_ping_result(host, rtts, format_raw_output(host, address, rtts)), error=None)
+
+def add_statistics(responses: List[CommandResponse], raw_output: bool = True) -> List[CommandResponse]:
+    """
+    Ajoute gigue, écart type et percentiles aux pings réussis, calculés en une fois pour tout le lot.
+    Les résultats d'origine (partagés par le single-flight) ne sont pas modifiés.
+    """
+    successful = [index for index, response in enumerate(responses)
+                  if response.success and isinstance(response.output, dict)]
+    statistics = rtt_statistics([responses[index].output.get("rtts", []) for index in successful])
+    results = list(responses)
+    for index, stats in zip(successful, statistics):
+        output = dict(responses[index].output, **stats)
+        if not raw_output:
+            output.pop("raw_output", None)
+        results[index] = CommandResponse(success=True, output=output, error=None)
+    return results
+
+def build_ping_result(host: str, rtts: List[Optional[float]], raw_output: str) -> Dict[str, Any]:
+    """
+    Construit le résumé du ping à partir des RTT par paquet (None = paquet perdu).
+    """
+    received = [rtt for rtt in rtts if rtt is not None]
+    result = {
+        "host": host,
+        "packets_sent": len(rtts),
+        "packets_received": len(received),
+        "packet_loss_percent": round(100 * (len(rtts) - len(received)) / len(rtts), 1) if rtts else 0,
+        "rtt_min": round(min(received), 3) if received else 0,
+        "rtt_avg": round(sum(received) / len(received), 3) if received else 0,
+        "rtt_max": round(max(received), 3) if received else 0,
+        "rtts": [round(rtt, 3) if rtt is not None else None for rtt in rtts],
+        "raw_output": raw_output
+    }
+    result["status"] = get_ping_status(result["rtt_avg"], result["packet_loss_percent"])
+    return result
+
 def parse_ping_output(output: str, system: str) -> Dict[str, Any]:
     """
     Parse la sortie de la commande ping selon le système d'exploitation.
@@ -79,6 +164,7 @@ def parse_ping_output(output: str, system: str) -> Dict[str, Any]:
         "rtt_min": 0,
         "rtt_avg": 0,
         "rtt_max": 0,
+        "rtts": [],
         "raw_output": output.strip()
     }
 
@@ -98,6 +184,10 @@ def parse_ping_output(output: str, system: str) -> Dict[str, Any]:
             result["rtt_min"] = float(rtt.group(1))
             result["rtt_max"] = float(rtt.group(2))
             result["rtt_avg"] = float(rtt.group(3))
+
+        # Pas de numéro de séquence : les réponses reçues d'abord, puis les paquets perdus
+        rtts = [float(value) for value in WINDOWS_REPLY.findall(output)]
+        result["rtts"] = rtts + [None] * max(result["packets_sent"] - len(rtts), 0)
     else:
         packets = re.search(r"(\d+) packets transmitted, (\d+) received.*?(\d+(?:\.\d+)?)% packet loss", output)
         if packets:
@@ -111,6 +201,11 @@ def parse_ping_output(output: str, system: str) -> Dict[str, Any]:
             result["rtt_avg"] = float(rtt.group(2))
             result["rtt_max"] = float(rtt.group(3))
 
+        # Paquet perdu : numéro de séquence absent de la sortie
+        replies = {int(sequence): float(value) for sequence, value in UNIX_REPLY.findall(output)}
+        first = 0 if 0 in replies else 1
+        result["rtts"] = [replies.get(sequence) for sequence in range(first, first + result["packets_sent"])]
+
     result["status"] = get_ping_status(result["rtt_avg"], result["packet_loss_percent"])
     return result
 
@@ -0,0 +1,90 @@
+import math
+import warnings
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+# NumPy est facultatif : calcul vectorisé sur tous les hôtes d'un lot s'il est installé
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+PERCENTILES = (50, 95, 99)
+
+
+def to_array(rtts: Sequence[Optional[float]]) -> array:
+    """
+    RTT par paquet en tableau compact de doubles (NaN = paquet perdu).
+    """
+    return array("d", (math.nan if rtt is None else rtt for rtt in rtts))
+
+
+def rtt_statistics(series: List[Sequence[Optional[float]]]) -> List[Dict[str, float]]:
+    """
+    Statistiques de latence pour plusieurs hôtes en un seul calcul.
+
+    La gigue est l'écart moyen, en valeur absolue, entre deux paquets consécutifs
+    reçus tous les deux ; l'écart type est celui de la population des RTT reçus.
+
+    Returns:
+        List[Dict]: rtt_stddev, jitter, rtt_p50, rtt_p95 et rtt_p99 par hôte (0 sans réponse)
+    """
+    if not series:
+        return []
+    rows = [rtts if isinstance(rtts, array) else to_array(rtts) for rtts in series]
+    compute = _numpy_statistics if np is not None else _python_statistics
+    return [{name: round(value, 3) if not math.isnan(value) else 0 for name, value in stats.items()}
+            for stats in compute(rows)]
+
+
+def _numpy_statistics(rows: List[array]) -> List[Dict[str, float]]:
+    width = max(len(row) for row in rows) or 1
+    # Une ligne par hôte, complétée par des NaN (nombres de paquets différents)
+    matrix = np.full((len(rows), width), np.nan)
+    for index, row in enumerate(rows):
+        matrix[index, :len(row)] = np.frombuffer(row, dtype=np.float64)
+
+    with warnings.catch_warnings():
+        # Hôte sans aucune réponse : NaN, converti en 0 ensuite
+        warnings.simplefilter("ignore", RuntimeWarning)
+        percentiles = np.nanpercentile(matrix, PERCENTILES, axis=1)
+        stddev = np.nanstd(matrix, axis=1)
+        jitter = np.nanmean(np.abs(np.diff(matrix, axis=1)), axis=1) if width > 1 else np.full(len(rows), np.nan)
+
+    return [
+        dict({"rtt_stddev": float(stddev[index]), "jitter": float(jitter[index])},
+             **{f"rtt_p{rank}": float(percentiles[position, index]) for position, rank in enumerate(PERCENTILES)})
+        for index in range(len(rows))
+    ]
+
+
+def _python_statistics(rows: List[array]) -> List[Dict[str, float]]:
+    results = []
+    for row in rows:
+        received = sorted(rtt for rtt in row if not math.isnan(rtt))
+        gaps = [abs(b - a) for a, b in zip(row, row[1:]) if not math.isnan(a) and not math.isnan(b)]
+        stats = {
+            "rtt_stddev": _stddev(received),
+            "jitter": sum(gaps) / len(gaps) if gaps else math.nan,
+        }
+        for rank in PERCENTILES:
+            stats[f"rtt_p{rank}"] = _percentile(received, rank)
+        results.append(stats)
+    return results
+
+
+def _stddev(values: List[float]) -> float:
+    if not values:
+        return math.nan
+    mean = sum(values) / len(values)
+    return math.sqrt(sum((value - mean) ** 2 for value in values) / len(values))
+
+
+def _percentile(ordered: List[float], rank: float) -> float:
+    # Interpolation linéaire entre les deux valeurs encadrantes (comme numpy.percentile)
+    if not ordered:
+        return math.nan
+    position = (len(ordered) - 1) * rank / 100
+    low = math.floor(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+from typing import Any, Dict, Optional, Tuple
+from app.core import metrics
+
+logger = logging.getLogger("result-store")
+
+# 💾 Stockage persistant des résultats (partagé entre workers, conservé après redémarrage)
+RESULT_STORE_ENABLED = os.getenv("RESULT_STORE_ENABLED", "true").lower() in ("1", "true", "yes")
+RESULT_STORE_PATH = os.getenv("RESULT_STORE_PATH", os.path.join("data", "results.sqlite3"))
+RESULT_STORE_PRUNE_EVERY = int(os.getenv("RESULT_STORE_PRUNE_EVERY", 1000))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    tool TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (tool, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_expiry ON results (expires_at);
+"""
+
+
+def make_key(params: Dict[str, Any]) -> str:
+    # Paramètres normalisés : même requête → même clé, quel que soit l'ordre des paramètres
+    return json.dumps(params, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+class ResultStore:
+    """
+    Résultats indexés par outil et paramètres, avec expiration, dans une base SQLite locale.
+
+    Le mode WAL autorise des lectures concurrentes pendant une écriture : plusieurs workers
+    uvicorn peuvent partager le même fichier.
+    """
+
+    def __init__(self, path: str = RESULT_STORE_PATH, enabled: bool = RESULT_STORE_ENABLED):
+        self.path = path
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pending = set()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def get_sync(self, tool: str, params: Dict[str, Any], max_age: float = None) -> Optional[Tuple[Any, float]]:
+        """
+        Retourne (valeur, âge en secondes) si un résultat valide existe, sinon None.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value, stored_at FROM results WHERE tool = ? AND key = ? AND expires_at > ?",
+                (tool, make_key(params), now)
+            ).fetchone()
+        if row is None or (max_age is not None and now - row[1] > max_age):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0]), max(now - row[1], 0)
+
+    def set_sync(self, tool: str, params: Dict[str, Any], value: Any, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO results (tool, key, value, stored_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (tool, make_key(params), json.dumps(value, ensure_ascii=False), now, now + ttl)
+            )
+            self._writes += 1
+            if self._writes % RESULT_STORE_PRUNE_EVERY == 0:
+                connection.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+
+    async def get(self, tool: str, params: Dict[str, Any], max_age: float = None) -> Optional[Tuple[Any, float]]:
+        if not self.enabled:
+            return None
+        try:
+            # Accès disque hors de la boucle d'événements
+            return await asyncio.to_thread(self.get_sync, tool, params, max_age)
+        except (sqlite3.Error, OSError, ValueError) as e:
+            logger.warning(f"Lecture du stockage des résultats impossible : {e}")
+            return None
+
+    async def set(self, tool: str, params: Dict[str, Any], value: Any, ttl: float) -> None:
+        if not self.enabled:
+            return
+        try:
+            await asyncio.to_thread(self.set_sync, tool, params, value, ttl)
+        except (sqlite3.Error, OSError, TypeError, ValueError) as e:
+            logger.warning(f"Écriture dans le stockage des résultats impossible : {e}")
+
+    def save(self, tool: str, params: Dict[str, Any], value: Any, ttl: float) -> None:
+        """
+        Écriture en arrière-plan : la réponse au client n'attend pas le disque.
+        """
+        if not self.enabled or ttl <= 0:
+            return
+        task = asyncio.ensure_future(self.set(tool, params, value, ttl))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "writes": self._writes}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+# Instance partagée par tous les services
+result_store = ResultStore()
+metrics.registry.register(metrics.CallbackGauge(
+    "network_api_result_store", "Stockage persistant des résultats (hits, misses, écritures)", ("stat",),
+    lambda: {(stat,): value for stat, value in result_store.stats().items()}
+))
@@ -0,0 +1,42 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+from app.core import metrics
+
+
+class SingleFlight:
+    """
+    Regroupe les exécutions identiques en cours : un seul appel réel par clé,
+    dont le résultat est partagé par tous les demandeurs.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # shield : l'annulation d'un demandeur (client déconnecté) n'interrompt pas les autres
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        return {"inflight": len(self._inflight), "executions": self.executions, "coalesced": self.coalesced}
+
+
+def normalize_host(host: str) -> str:
+    return host.strip().rstrip(".").lower()
+
+
+# Instance partagée par tous les services
+singleflight = SingleFlight()
+metrics.registry.register(metrics.CallbackGauge(
+    "network_api_singleflight", "Exécutions mutualisées (en cours, réelles, regroupées)", ("stat",),
+    lambda: {(stat,): value for stat, value in singleflight.stats().items()}
+))
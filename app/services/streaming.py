@@ -0,0 +1,22 @@
+from typing import AsyncIterator, Dict, Tuple
+from app.core.responses import dumps
+
+# 📡 Formats de streaming disponibles
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def format_event(event: str, data: Dict, mode: str) -> str:
+    """
+    Encode un événement en NDJSON ({"event": ..., "data": ...}) ou en Server-Sent Event.
+    """
+    if mode == "sse":
+        return f"event: {event}\ndata: {dumps(data).decode()}\n\n"
+    return dumps({"event": event, "data": data}).decode() + "\n"
+
+
+async def encode_stream(events: AsyncIterator[Tuple[str, Dict]], mode: str) -> AsyncIterator[str]:
+    async for event, data in events:
+        yield format_event(event, data, mode)
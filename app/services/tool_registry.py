@@ -0,0 +1,183 @@
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from app.core import metrics
+
+logger = logging.getLogger("tool-registry")
+
+# 🧰 Registre des outils : chemins, versions et capacités détectés une seule fois au démarrage
+TOOL_REGISTRY_PROBE = os.getenv("TOOL_REGISTRY_PROBE", "true").lower() == "true"
+TOOL_PROBE_TIMEOUT = float(os.getenv("TOOL_PROBE_TIMEOUT", 5))
+# available : seules les routes utilisables sont chargées ; all : toutes (outil absent = erreur à l'appel)
+TOOL_ROUTES = os.getenv("TOOL_ROUTES", "available").lower()
+# Outils dont l'absence rend l'instance non prête (/ready en 503), séparés par des virgules
+TOOLS_REQUIRED = [tool.strip() for tool in os.getenv("TOOLS_REQUIRED", "").split(",") if tool.strip()]
+# Nombre de workers (uvicorn / gunicorn) : le monitoring, en mémoire d'un processus, exige un seul worker
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 1))
+
+SYSTEM = platform.system().lower()
+
+# Outil → (exécutable, arguments affichant la version)
+BINARIES = {
+    "ping": ("ping", ["-V"]),
+    "traceroute": ("tracert" if SYSTEM == "windows" else "traceroute", ["--version"]),
+    "nmap": ("nmap", ["--version"]),
+    "whois": ("whois", ["--version"]),
+}
+
+
+def _first_line(*outputs: str) -> Optional[str]:
+    for output in outputs:
+        for line in (output or "").splitlines():
+            if line.strip():
+                return line.strip()[:200]
+    return None
+
+
+def _probe_version(path: str, arguments: List[str]) -> Optional[str]:
+    try:
+        result = subprocess.run([path] + arguments, capture_output=True, text=True,
+                                timeout=TOOL_PROBE_TIMEOUT, stdin=subprocess.DEVNULL)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return _first_line(result.stdout, result.stderr)
+
+
+def _probe_icmp() -> Optional[str]:
+    # Même ordre que le moteur ICMP : datagramme non privilégié, puis socket brut
+    for kind, mode in ((socket.SOCK_DGRAM, "dgram"), (socket.SOCK_RAW, "raw")):
+        try:
+            socket.socket(socket.AF_INET, kind, socket.IPPROTO_ICMP).close()
+            return mode
+        except OSError:
+            continue
+    return None
+
+
+def _probe_native_traceroute() -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    from app.services.traceroute_engine import IP_RECVERR, SO_TIMESTAMPNS
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.setsockopt(socket.IPPROTO_IP, IP_RECVERR, 1)
+            sock.setsockopt(socket.SOL_SOCKET, SO_TIMESTAMPNS, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _probe_nmap_xml(path: str) -> bool:
+    # Liste de cibles sans aucun paquet envoyé (-sL -n) : seul le format de sortie est vérifié
+    try:
+        result = subprocess.run([path, "-oX", "-", "-sL", "-n", "127.0.0.1"], capture_output=True, text=True,
+                                timeout=TOOL_PROBE_TIMEOUT, stdin=subprocess.DEVNULL)
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return "<nmaprun" in (result.stdout or "")
+
+
+def _probe_dns_server() -> str:
+    from app.services.dns_resolver import get_default_server
+    return get_default_server()
+
+
+class ToolRegistry:
+    """
+    Chemins absolus et versions des exécutables, capacités du système et endpoints utilisables.
+
+    Sans détection (TOOL_REGISTRY_PROBE=false ou avant probe()), les exécutables sont
+    recherchés dans le PATH à chaque appel et tous les outils sont considérés disponibles.
+    """
+
+    def __init__(self):
+        self.probed = False
+        self.paths: Dict[str, str] = {}
+        self.versions: Dict[str, Optional[str]] = {}
+        self.capabilities: Dict[str, object] = {}
+        self.probe_seconds = 0.0
+
+    def path(self, tool: str) -> str:
+        """
+        Chemin absolu détecté au démarrage, sinon le nom de l'exécutable (recherché dans le PATH).
+        """
+        return self.paths.get(tool) or BINARIES[tool][0]
+
+    def has(self, tool: str) -> bool:
+        return not self.probed or tool in self.paths
+
+    def probe(self) -> "ToolRegistry":
+        """
+        Détecte exécutables, versions et capacités ; les sondes s'exécutent en parallèle.
+        """
+        start = time.perf_counter()
+        paths = {tool: shutil.which(binary) for tool, (binary, _) in BINARIES.items()}
+        paths = {tool: path for tool, path in paths.items() if path}
+
+        with ThreadPoolExecutor(max_workers=len(BINARIES) + 4) as pool:
+            versions = {tool: pool.submit(_probe_version, path, BINARIES[tool][1]) for tool, path in paths.items()}
+            probes = {
+                "icmp": pool.submit(_probe_icmp),
+                "traceroute_native": pool.submit(_probe_native_traceroute),
+                "nmap_xml": pool.submit(_probe_nmap_xml, paths["nmap"]) if "nmap" in paths else None,
+                "dns_server": pool.submit(_probe_dns_server),
+            }
+            self.versions = {tool: future.result() for tool, future in versions.items()}
+            self.capabilities = {name: future.result() if future else False for name, future in probes.items()}
+
+        self.paths = paths
+        self.probed = True
+        self.probe_seconds = time.perf_counter() - start
+        missing = sorted(set(BINARIES) - set(paths))
+        logger.info(f"Outils détectés en {self.probe_seconds:.2f}s : {sorted(paths)} (absents : {missing})")
+        return self
+
+    def usable(self, requirement: Callable[["ToolRegistry"], bool]) -> bool:
+        return not self.probed or TOOL_ROUTES == "all" or requirement(self)
+
+    def endpoints(self) -> Dict[str, bool]:
+        return {name: not self.probed or requirement(self) for name, _, requirement in ENDPOINTS}
+
+    def report(self) -> Dict:
+        """
+        État exposé par /ready : prêt si tous les outils de TOOLS_REQUIRED sont utilisables.
+        """
+        endpoints = self.endpoints()
+        missing = [tool for tool in TOOLS_REQUIRED if not endpoints.get(tool, False)]
+        return {
+            "ready": not missing,
+            "missing": missing,
+            "system": SYSTEM,
+            "probed": self.probed,
+            "probe_seconds": round(self.probe_seconds, 3),
+            "tools": {tool: {"path": path, "version": self.versions.get(tool)} for tool, path in self.paths.items()},
+            "capabilities": self.capabilities,
+            "endpoints": endpoints,
+        }
+
+
+# Endpoint (module de app.api.v1.endpoints) → (tag OpenAPI, condition d'utilisation)
+ENDPOINTS: List[Tuple[str, str, Callable[[ToolRegistry], bool]]] = [
+    ("ping", "Ping", lambda r: bool(r.capabilities.get("icmp")) or r.has("ping")),
+    ("dig", "DNS", lambda r: True),
+    ("nslookup", "DNS", lambda r: True),
+    ("dns_full", "DNS", lambda r: True),
+    ("whois", "Whois", lambda r: os.getenv("WHOIS_ENGINE", "native").lower() != "subprocess" or r.has("whois")),
+    ("traceroute", "Network", lambda r: bool(r.capabilities.get("traceroute_native")) or r.has("traceroute")),
+    ("nmap", "Scanner", lambda r: bool(r.capabilities.get("nmap_xml"))),
+    ("monitoring", "Monitoring", lambda r: WEB_CONCURRENCY <= 1),
+]
+
+
+registry = ToolRegistry()
+metrics.registry.register(metrics.CallbackGauge(
+    "network_api_tool_available", "Exécutable détecté au démarrage (1) ou absent (0)", ("tool",),
+    lambda: {(tool,): int(tool in registry.paths) for tool in BINARIES} if registry.probed else {}
+))
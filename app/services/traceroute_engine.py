@@ -0,0 +1,211 @@
+import asyncio
+import errno
+import os
+import socket
+import struct
+import sys
+import time
+import logging
+from typing import AsyncIterator, Dict, List, Optional
+
+logger = logging.getLogger("traceroute-engine")
+
+# 🛰️ Traceroute natif : sondes UDP de tous les TTL envoyées en même temps
+TRACEROUTE_MAX_HOPS = int(os.getenv("TRACEROUTE_MAX_HOPS", 30))
+TRACEROUTE_PROBES = int(os.getenv("TRACEROUTE_PROBES", 3))
+TRACEROUTE_TIMEOUT = float(os.getenv("TRACEROUTE_TIMEOUT", 3.0))
+BASE_PORT = 33434
+
+# Erreurs ICMP reçues via la file d'erreurs du socket (Linux, IP_RECVERR)
+IP_RECVERR = getattr(socket, "IP_RECVERR", 11)
+MSG_ERRQUEUE = getattr(socket, "MSG_ERRQUEUE", 0x2000)
+SO_EE_ORIGIN_ICMP = 2
+ICMP_DEST_UNREACH = 3
+ICMP_TIME_EXCEEDED = 11
+# struct sock_extended_err, suivie de l'adresse de l'émetteur (sockaddr_in)
+EXTENDED_ERR = struct.Struct("=IBBBBII")
+# Horodatage noyau de la réception (le RTT n'inclut pas l'attente de la boucle d'événements)
+SO_TIMESTAMPNS = getattr(socket, "SO_TIMESTAMPNS", 35)
+TIMESPEC = struct.Struct("=qq")
+PROBE = struct.Struct("!HH")
+
+# Erreur ICMP d'une sonde précédente, remontée par le noyau lors de l'envoi ou de la lecture suivante
+DEFERRED_ERRORS = (errno.ECONNREFUSED, errno.EHOSTUNREACH, errno.ENETUNREACH, errno.EPROTO)
+
+
+class TracerouteUnavailable(Exception):
+    """Traceroute natif impossible sur ce système (file d'erreurs des sockets absente)."""
+
+
+def kernel_timestamp(ancdata: list) -> Optional[float]:
+    for level, kind, cdata in ancdata:
+        if level == socket.SOL_SOCKET and kind == SO_TIMESTAMPNS and len(cdata) >= TIMESPEC.size:
+            seconds, nanoseconds = TIMESPEC.unpack_from(cdata)
+            return seconds + nanoseconds / 1e9
+    return None
+
+
+class Hop:
+    """
+    Sondes d'un TTL : un socket UDP, un horodatage et un RTT par sonde.
+    """
+
+    def __init__(self, ttl: int, probes: int):
+        self.ttl = ttl
+        self.ip: Optional[str] = None
+        self.sent: List[Optional[float]] = [None] * probes
+        self.rtts: List[Optional[float]] = [None] * probes
+        self.reached = False
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            self.sock.setblocking(False)
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_TTL, ttl)
+            self.sock.setsockopt(socket.IPPROTO_IP, IP_RECVERR, 1)
+            self.sock.setsockopt(socket.SOL_SOCKET, SO_TIMESTAMPNS, 1)
+        except OSError as e:
+            self.sock.close()
+            raise TracerouteUnavailable(f"Options de socket indisponibles : {e}")
+
+    def complete(self) -> bool:
+        return all(rtt is not None for rtt in self.rtts)
+
+    def send(self, address: str, probe: int) -> None:
+        packet = PROBE.pack(self.ttl, probe)
+        port = BASE_PORT + (self.ttl - 1) * len(self.rtts) + probe
+        for attempt in range(2):
+            try:
+                self.sent[probe] = time.time()
+                self.sock.sendto(packet, (address, port))
+                return
+            except OSError as e:
+                # L'erreur est déjà dans la file d'erreurs : un nouvel essai suffit
+                if e.errno not in DEFERRED_ERRORS or attempt:
+                    raise
+
+    def record(self, probe: int, ip: str, reached: bool, received: float = None) -> None:
+        if not 0 <= probe < len(self.rtts) or self.sent[probe] is None or self.rtts[probe] is not None:
+            return
+        self.rtts[probe] = max((received or time.time()) - self.sent[probe], 0)
+        self.ip = self.ip or ip
+        self.reached = self.reached or reached
+
+    def to_dict(self) -> Dict:
+        return {
+            "hop": self.ttl,
+            "ip": self.ip or "*",
+            "latency_ms": [round(rtt * 1000, 3) if rtt is not None else "*" for rtt in self.rtts]
+        }
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+class Trace:
+    def __init__(self, address: str, max_hops: int, probes: int):
+        if not sys.platform.startswith("linux"):
+            raise TracerouteUnavailable("Traceroute natif disponible uniquement sous Linux")
+        self.address = address
+        self.loop = asyncio.get_running_loop()
+        self.changed = asyncio.Event()
+        self.hops: List[Hop] = []
+        try:
+            for ttl in range(1, max_hops + 1):
+                hop = Hop(ttl, probes)
+                self.hops.append(hop)
+                self.loop.add_reader(hop.sock.fileno(), self._on_readable, hop)
+        except BaseException:
+            self.close()
+            raise
+
+    def reached_ttl(self) -> Optional[int]:
+        return next((hop.ttl for hop in self.hops if hop.reached), None)
+
+    def _on_readable(self, hop: Hop) -> None:
+        while True:
+            try:
+                data, ancdata, _, _ = hop.sock.recvmsg(64, 512, MSG_ERRQUEUE)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError as e:
+                # Erreur inattendue de la file d'erreurs : la relire en boucle ne la viderait pas
+                logger.warning(f"Lecture de la file d'erreurs impossible (saut {hop.ttl}) : {e}")
+                break
+            received = kernel_timestamp(ancdata)
+            for level, kind, cdata in ancdata:
+                if level != socket.IPPROTO_IP or kind != IP_RECVERR or len(cdata) < EXTENDED_ERR.size + 8:
+                    continue
+                _, origin, icmp_type, _, _, _, _ = EXTENDED_ERR.unpack_from(cdata)
+                if origin != SO_EE_ORIGIN_ICMP or icmp_type not in (ICMP_TIME_EXCEEDED, ICMP_DEST_UNREACH):
+                    continue
+                # Émetteur de l'erreur : sockaddr_in placée après sock_extended_err
+                offender = socket.inet_ntoa(cdata[EXTENDED_ERR.size + 4:EXTENDED_ERR.size + 8])
+                probe = PROBE.unpack_from(data)[1] if len(data) >= PROBE.size else -1
+                hop.record(probe, offender, icmp_type == ICMP_DEST_UNREACH, received)
+
+        # Réponse UDP directe (service à l'écoute sur le port sondé) : destination atteinte
+        while True:
+            try:
+                hop.sock.recvfrom(64)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError as e:
+                # Erreur ICMP en attente sur la socket : signalée une seule fois, puis effacée
+                if e.errno in DEFERRED_ERRORS:
+                    continue
+                logger.warning(f"Lecture impossible (saut {hop.ttl}) : {e}")
+                break
+            pending = next((probe for probe, rtt in enumerate(hop.rtts) if rtt is None), None)
+            if pending is not None:
+                hop.record(pending, self.address, True)
+        self.changed.set()
+
+    async def hops_in_order(self, probes: int, timeout: float) -> AsyncIterator[Dict]:
+        """
+        Envoie toutes les sondes puis produit chaque saut, dans l'ordre, dès qu'il est définitif.
+        """
+        for probe in range(probes):
+            for hop in self.hops:
+                hop.send(self.address, probe)
+        deadline = self.loop.time() + timeout
+
+        for hop in self.hops:
+            while not hop.complete() and self.loop.time() < deadline:
+                self.changed.clear()
+                try:
+                    await asyncio.wait_for(self.changed.wait(), deadline - self.loop.time())
+                except asyncio.TimeoutError:
+                    break
+            yield hop.to_dict()
+            # Les TTL supérieurs atteignent aussi la destination : inutile de les attendre
+            if hop.ttl == self.reached_ttl():
+                break
+
+    def close(self) -> None:
+        for hop in self.hops:
+            self.loop.remove_reader(hop.sock.fileno())
+            hop.close()
+
+
+async def trace(
+    address: str,
+    max_hops: int = None,
+    probes: int = None,
+    timeout: float = None
+) -> AsyncIterator[Dict]:
+    """
+    Traceroute IPv4 par sondes UDP parallèles : la durée totale est d'environ
+    un RTT maximal plus le délai d'attente, au lieu d'une attente par saut silencieux.
+
+    Yields:
+        Dict: hop, ip et latency_ms ("*" pour une sonde sans réponse), dans l'ordre des TTL
+
+    Raises:
+        TracerouteUnavailable: Système sans file d'erreurs ICMP sur les sockets UDP
+    """
+    probes = probes or TRACEROUTE_PROBES
+    tracer = Trace(address, max_hops or TRACEROUTE_MAX_HOPS, probes)
+    try:
+        async for hop in tracer.hops_in_order(probes, timeout or TRACEROUTE_TIMEOUT):
+            yield hop
+    finally:
+        tracer.close()
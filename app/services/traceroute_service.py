@@ -1,29 +1,80 @@
+import os
+import socket
 import subprocess
-import platform
 import re
+import logging
+from typing import AsyncIterator, Dict, Optional, Tuple
+from app.core import metrics
+from app.core.access_log import tool_timer
 from app.models.response_model import CommandResponse
+from app.services.command_runner import run_command, stream_command
+from app.services.singleflight import singleflight, normalize_host
+from app.services.icmp_engine import resolve_ipv4
+from app.services.traceroute_engine import TracerouteUnavailable, trace
+from app.services.tool_registry import SYSTEM, registry
+
+logger = logging.getLogger("traceroute-service")
+
+# ⚙️ Moteur : auto (sondes UDP parallèles si possible), native ou subprocess
+TRACEROUTE_ENGINE = os.getenv("TRACEROUTE_ENGINE", "auto").lower()
+
+TIMEOUT_MESSAGE = "La commande traceroute a pris trop de temps (timeout dépassé)."
 
 class TracerouteService:
-    def run(self, host: str) -> CommandResponse:
+    async def run(self, host: str) -> CommandResponse:
+        # Les traceroutes identiques en cours sont mutualisés
+        return await singleflight.do(("traceroute", normalize_host(host)), lambda: self.execute(host))
+
+    def build_command(self, host: str) -> list:
+        return [registry.path("traceroute"), host]
+
+    def use_native(self, host: str) -> bool:
+        return TRACEROUTE_ENGINE != "subprocess" and ":" not in host
+
+    async def native_hops(self, host: str) -> AsyncIterator[Dict]:
+        """
+        Sauts du moteur natif, dans l'ordre des TTL.
+
+        Raises:
+            TracerouteUnavailable: Avant le premier saut, si le moteur natif est inutilisable
+        """
+        try:
+            address = await resolve_ipv4(host)
+        except (socket.gaierror, OSError):
+            raise ValueError(f"traceroute: {host}: Name or service not known")
+        with tool_timer(), metrics.track("traceroute", "native"):
+            async for hop in trace(address):
+                yield hop
+
+    async def execute(self, host: str) -> CommandResponse:
+        if self.use_native(host):
+            try:
+                hops = [hop async for hop in self.native_hops(host)]
+                return CommandResponse(success=True, output=hops, error=None)
+            except TracerouteUnavailable as e:
+                if TRACEROUTE_ENGINE == "native":
+                    return CommandResponse(success=False, output="", error=str(e))
+                logger.info(f"Traceroute natif indisponible, repli sur la commande traceroute : {e}")
+            except Exception as e:
+                metrics.record_failure("traceroute", e)
+                return CommandResponse(success=False, output="", error=str(e))
+
         try:
-            system = platform.system().lower()
-            command = ["tracert", host] if system == "windows" else ["traceroute", host]
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
+            result = await run_command(
+                "traceroute",
+                self.build_command(host),
                 timeout=30
             )
 
             if result.returncode != 0:
+                metrics.tool_errors.inc("traceroute")
                 return CommandResponse(
                     success=False,
                     output="",
                     error=(result.stderr or "").strip()
                 )
 
-            hops = self.parse_traceroute(result.stdout, system)
+            hops = self.parse_traceroute(result.stdout, SYSTEM)
             return CommandResponse(
                 success=True,
                 output=hops,
@@ -31,41 +82,86 @@ class TracerouteService:
             )
 
         except subprocess.TimeoutExpired:
+            metrics.tool_timeouts.inc("traceroute")
             return CommandResponse(
                 success=False,
                 output="",
-                error="La commande traceroute a pris trop de temps (timeout dépassé)."
+                error=TIMEOUT_MESSAGE
             )
         except Exception as e:
+            metrics.tool_errors.inc("traceroute")
             return CommandResponse(success=False, output="", error=str(e))
 
+    async def stream(self, host: str) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Produit chaque saut ("hop") dès qu'il est affiché, puis un événement final ("done").
+        """
+        error = None
+        if self.use_native(host):
+            try:
+                async for hop in self.native_hops(host):
+                    yield "hop", hop
+                yield "done", {"success": True, "error": None}
+                return
+            except TracerouteUnavailable as e:
+                if TRACEROUTE_ENGINE == "native":
+                    yield "done", {"success": False, "error": str(e)}
+                    return
+                logger.info(f"Traceroute natif indisponible, repli sur la commande traceroute : {e}")
+            except Exception as e:
+                metrics.record_failure("traceroute", e)
+                yield "done", {"success": False, "error": str(e)}
+                return
+
+        try:
+            async for line in stream_command("traceroute", self.build_command(host), timeout=30):
+                hop = self.parse_traceroute_line(line, SYSTEM)
+                if hop:
+                    yield "hop", hop
+        except subprocess.TimeoutExpired:
+            metrics.tool_timeouts.inc("traceroute")
+            error = TIMEOUT_MESSAGE
+        except subprocess.CalledProcessError as e:
+            metrics.tool_errors.inc("traceroute")
+            error = (e.stderr or "").strip() or f"Code retour {e.returncode}"
+        except Exception as e:
+            metrics.tool_errors.inc("traceroute")
+            error = str(e)
+        yield "done", {"success": error is None, "error": error}
+
     def parse_traceroute(self, output: str, system: str):
         lines = output.strip().splitlines()
         hops = []
 
         for line in lines:
-            if system == "windows":
-                match = re.match(r"\s*(\d+)\s+([^\s]+)\s+(.*)", line)
-                if match:
-                    hop, ip, _ = match.groups()
-                    hops.append({"hop": int(hop), "ip": ip})
-            else:
-                match = re.match(r"\s*(\d+)\s+([^\s]+)\s+([\d.]+)\s+ms\s+([\d.]+)\s+ms\s+([\d.]+)\s+ms", line)
-                if match:
-                    hop, ip, t1, t2, t3 = match.groups()
-                    hops.append({
-                        "hop": int(hop),
-                        "ip": ip,
-                        "latency_ms": [float(t1), float(t2), float(t3)]
-                    })
-                else:
-                    match_star = re.match(r"\s*(\d+)\s+\*\s+\*\s+\*", line)
-                    if match_star:
-                        hop = int(match_star.group(1))
-                        hops.append({
-                            "hop": hop,
-                            "ip": "*",
-                            "latency_ms": ["*", "*", "*"]
-                        })
+            hop = self.parse_traceroute_line(line, system)
+            if hop:
+                hops.append(hop)
 
         return hops
+
+    def parse_traceroute_line(self, line: str, system: str) -> Optional[Dict]:
+        if system == "windows":
+            match = re.match(r"\s*(\d+)\s+([^\s]+)\s+(.*)", line)
+            if match:
+                hop, ip, _ = match.groups()
+                return {"hop": int(hop), "ip": ip}
+            return None
+
+        match = re.match(r"\s*(\d+)\s+([^\s]+)\s+([\d.]+)\s+ms\s+([\d.]+)\s+ms\s+([\d.]+)\s+ms", line)
+        if match:
+            hop, ip, t1, t2, t3 = match.groups()
+            return {
+                "hop": int(hop),
+                "ip": ip,
+                "latency_ms": [float(t1), float(t2), float(t3)]
+            }
+
+        match_star = re.match(r"\s*(\d+)\s+\*\s+\*\s+\*", line)
+        if match_star:
+            return {
+                "hop": int(match_star.group(1)),
+                "ip": "*",
+                "latency_ms": ["*", "*", "*"]
+            }
+        return None
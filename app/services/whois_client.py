@@ -0,0 +1,290 @@
+import asyncio
+import ipaddress
+import os
+import re
+import socket
+import logging
+from typing import Dict, List, Optional, Tuple
+from app.core import metrics
+from app.core.access_log import tool_timer
+from app.services.cache import TTLCache
+from app.services.result_store import result_store
+
+logger = logging.getLogger("whois-client")
+
+# 🌍 Client WHOIS natif (protocole TCP port 43, RFC 3912)
+WHOIS_ROOT_SERVER = os.getenv("WHOIS_ROOT_SERVER", "whois.iana.org")
+WHOIS_PORT = 43
+WHOIS_TIMEOUT = float(os.getenv("WHOIS_TIMEOUT", 10))
+WHOIS_MAX_REFERRALS = int(os.getenv("WHOIS_MAX_REFERRALS", 1))
+WHOIS_MAX_RESPONSE = 512 * 1024
+
+# 🔒 Références suivies uniquement vers des adresses publiques, sur le port WHOIS (43) ou RWHOIS (4321)
+RWHOIS_PORT = 4321
+REFERRAL_PORTS = {"whois": WHOIS_PORT, "rwhois": RWHOIS_PORT}
+# Serveurs "hôte:port" acceptés sans ces contrôles (tests et bancs d'essai uniquement)
+WHOIS_REFERRAL_ALLOWLIST = {
+    server.strip().lower() for server in os.getenv("WHOIS_REFERRAL_ALLOWLIST", "").split(",") if server.strip()
+}
+
+# 🗃️ Caches : serveur par TLD (quasi statique) et réponses (les données WHOIS changent rarement)
+WHOIS_CACHE_TTL = int(os.getenv("WHOIS_CACHE_TTL", 6 * 3600))
+WHOIS_CACHE_MAX_BYTES = int(os.getenv("WHOIS_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+WHOIS_SERVER_CACHE_TTL = int(os.getenv("WHOIS_SERVER_CACHE_TTL", 7 * 86400))
+
+whois_cache = TTLCache(WHOIS_CACHE_MAX_BYTES, name="whois")
+server_cache = TTLCache(1024 * 1024, name="whois-servers")
+metrics.registry.register(metrics.CallbackGauge(
+    "network_api_whois_cache", "État du cache WHOIS (entrées, octets, hits, misses, évictions)", ("stat",),
+    lambda: {(stat,): value for stat, value in whois_cache.stats().items()}
+))
+
+# Certains registres attendent une syntaxe de requête particulière
+QUERY_FORMATS = {
+    "whois.denic.de": "-T dn,ace {}",
+    "whois.verisign-grs.com": "domain {}",
+}
+
+# Lignes désignant le serveur suivant (IANA, registre → registrar, RIR)
+REFERRAL_PATTERN = re.compile(
+    r"^\s*(?:refer|whois|registrar whois server|whois server|referralserver)\s*:\s*(\S+)",
+    re.IGNORECASE | re.MULTILINE
+)
+SERVER_PATTERN = re.compile(r"^[a-z0-9.-]+(:\d{1,5})?$", re.IGNORECASE)
+
+# Champs extraits (premier alias trouvé, dans l'ordre des réponses)
+FIELD_ALIASES = {
+    "registrar": ("registrar", "sponsoring registrar", "registrar name"),
+    "creation_date": ("creation date", "created", "registered", "registration time", "created on"),
+    "updated_date": ("updated date", "last updated", "changed", "last-update", "last modified"),
+    "expiration_date": ("registry expiry date", "registrar registration expiration date", "expiry date",
+                        "expiration date", "expires", "paid-till", "expire"),
+}
+NAME_SERVER_KEYS = ("name server", "nserver", "nameserver", "name servers")
+STATUS_KEYS = ("domain status", "status", "state")
+
+
+class WhoisError(Exception):
+    """Erreur WHOIS (serveur injoignable, aucun serveur pour le TLD...)."""
+
+
+class WhoisTimeoutError(WhoisError, TimeoutError):
+    """Aucune réponse du serveur WHOIS dans le délai imparti."""
+
+
+def split_server(server: str) -> Tuple[str, int]:
+    """
+    Sépare "hôte[:port]" (port 43 par défaut).
+    """
+    host, _, port = server.partition(":")
+    return host.lower().rstrip("."), int(port) if port else WHOIS_PORT
+
+
+def clean_referral(value: str) -> Optional[str]:
+    # "whois://whois.arin.net", "rwhois://rwhois.example.net:4321", "http://..." (inutilisable)
+    value = value.strip().rstrip("/").lower()
+    scheme = "whois"
+    if "://" in value:
+        scheme, _, value = value.partition("://")
+        if scheme not in REFERRAL_PORTS:
+            return None
+    if not SERVER_PATTERN.match(value):
+        return None
+    if value in WHOIS_REFERRAL_ALLOWLIST:
+        return value
+    host, port = split_server(value) if ":" in value else (value.rstrip("."), REFERRAL_PORTS[scheme])
+    # Un autre port (6379, 22...) ferait de l'API un relais vers des services qui ne sont pas WHOIS
+    if port != REFERRAL_PORTS[scheme]:
+        return None
+    return host if port == WHOIS_PORT else f"{host}:{port}"
+
+
+async def referral_address(server: str) -> Tuple[str, int]:
+    """
+    Adresse à laquelle se connecter pour un serveur désigné par une réponse WHOIS.
+
+    Raises:
+        WhoisError: Port non WHOIS, ou nom résolu vers une adresse non publique
+                    (boucle locale, réseau privé, lien local...)
+    """
+    host, port = split_server(server)
+    if f"{host}:{port}" in WHOIS_REFERRAL_ALLOWLIST:
+        return host, port
+    if port not in REFERRAL_PORTS.values():
+        raise WhoisError(f"Référence WHOIS refusée : port {port} non autorisé")
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except OSError as e:
+        raise WhoisError(f"Serveur WHOIS {host} introuvable : {e}")
+    addresses = {info[4][0].split("%")[0] for info in infos}
+    if not addresses or not all(ipaddress.ip_address(address).is_global for address in addresses):
+        raise WhoisError(f"Référence WHOIS refusée : {host} ne désigne pas une adresse publique")
+    # Connexion à l'adresse vérifiée (pas de seconde résolution qui pourrait pointer ailleurs)
+    return sorted(addresses)[0], port
+
+
+def find_referral(text: str, current: str) -> Optional[str]:
+    for match in REFERRAL_PATTERN.finditer(text):
+        server = clean_referral(match.group(1))
+        if server and split_server(server) != split_server(current):
+            return server
+    return None
+
+
+async def query(server: str, request: str, timeout: float = None, referral: bool = True) -> str:
+    """
+    Envoie une requête WHOIS et retourne la réponse complète (le serveur ferme la connexion).
+
+    Un serveur issu d'une réponse (referral=True) est vérifié avant la connexion ; seul le
+    serveur racine configuré (WHOIS_ROOT_SERVER) est contacté sans contrôle.
+    """
+    host, port = split_server(server)
+    timeout = timeout or WHOIS_TIMEOUT
+    request = QUERY_FORMATS.get(host, "{}").format(request)
+    address = (await referral_address(server))[0] if referral else host
+
+    chunks, size = [], 0
+    with tool_timer(), metrics.track("whois", "native"):
+        writer = None
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(address, port), timeout)
+            writer.write(request.encode("ascii", errors="replace") + b"\r\n")
+            await writer.drain()
+            while size < WHOIS_MAX_RESPONSE:
+                data = await asyncio.wait_for(reader.read(65536), timeout)
+                if not data:
+                    break
+                chunks.append(data)
+                size += len(data)
+        except asyncio.TimeoutError:
+            raise WhoisTimeoutError(f"Aucune réponse du serveur WHOIS {host} (timeout)")
+        except OSError as e:
+            raise WhoisError(f"Serveur WHOIS {host} injoignable : {e}")
+        finally:
+            if writer is not None:
+                writer.close()
+
+    raw = b"".join(chunks)
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return raw.decode("latin-1")
+
+
+def is_ip_address(target: str) -> bool:
+    try:
+        ipaddress.ip_address(target)
+        return True
+    except ValueError:
+        return False
+
+
+async def find_server(target: str) -> str:
+    """
+    Retourne le serveur WHOIS faisant autorité pour le TLD (ou le RIR pour une IP), via l'IANA.
+    """
+    # Les TLD sont mis en cache ; une IP est toujours demandée à l'IANA (RIR selon le bloc)
+    is_tld = not is_ip_address(target)
+    key = target.rsplit(".", 1)[-1] if is_tld else target
+    if is_tld:
+        cached = server_cache.get(key)
+        if cached is not None:
+            return cached[0]
+        stored = await result_store.get("whois-server", {"tld": key})
+        if stored is not None:
+            server_cache.set(key, stored[0], WHOIS_SERVER_CACHE_TTL - stored[1], 64 + len(key) + len(stored[0]))
+            return stored[0]
+
+    answer = await query(WHOIS_ROOT_SERVER, key, referral=False)
+    server = find_referral(answer, WHOIS_ROOT_SERVER)
+    if server is None:
+        raise WhoisError(f"Aucun serveur WHOIS connu pour '{key}'")
+    if is_tld:
+        server_cache.set(key, server, WHOIS_SERVER_CACHE_TTL, 64 + len(key) + len(server))
+        result_store.save("whois-server", {"tld": key}, server, WHOIS_SERVER_CACHE_TTL)
+    return server
+
+
+async def lookup(target: str, max_referrals: int = None) -> Dict:
+    """
+    Interroge le registre puis, si indiqué, le serveur du registrar (comme la commande whois).
+
+    Returns:
+        Dict: servers (serveurs interrogés, dans l'ordre) et raw (réponses concaténées)
+    """
+    try:
+        # Domaines internationalisés : forme punycode (xn--...)
+        target = target.strip().lower().rstrip(".").encode("idna").decode("ascii")
+    except UnicodeError:
+        raise WhoisError(f"Nom de domaine invalide : '{target}'")
+    max_referrals = WHOIS_MAX_REFERRALS if max_referrals is None else max_referrals
+
+    cached = whois_cache.get(target)
+    if cached is not None:
+        servers, raw = cached[0]
+        return {"servers": list(servers), "raw": raw}
+
+    # Second niveau : stockage persistant partagé entre workers
+    stored = await result_store.get("whois", {"target": target})
+    if stored is not None:
+        result, age = stored
+        _cache(target, result["servers"], result["raw"], WHOIS_CACHE_TTL - age)
+        return result
+
+    server = await find_server(target)
+    servers: List[str] = []
+    responses: List[str] = []
+    while server and len(servers) <= max_referrals:
+        try:
+            responses.append(await query(server, target))
+        except WhoisError as e:
+            if not responses:
+                raise
+            # Le registrar est injoignable : la réponse du registre reste exploitable
+            logger.warning(f"Référence WHOIS {server} ignorée pour {target}: {e}")
+            break
+        servers.append(server)
+        server = find_referral(responses[-1], server)
+
+    raw = "\n".join(response.strip() for response in responses)
+    _cache(target, servers, raw, WHOIS_CACHE_TTL)
+    result_store.save("whois", {"target": target}, {"servers": servers, "raw": raw}, WHOIS_CACHE_TTL)
+    return {"servers": servers, "raw": raw}
+
+
+def _cache(target: str, servers: List[str], raw: str, ttl: float) -> None:
+    whois_cache.set(target, (tuple(servers), raw), ttl, 200 + len(raw) + sum(map(len, servers)))
+
+
+def parse_whois(raw: str) -> Dict:
+    """
+    Extrait les champs principaux (registrar, dates, serveurs de noms, statuts) d'une réponse brute.
+    """
+    fields: Dict[str, List[str]] = {}
+    for line in raw.splitlines():
+        key, separator, value = line.strip().partition(":")
+        value = value.strip()
+        if not separator or not value or line.lstrip().startswith(("%", "#", ">>>")):
+            continue
+        fields.setdefault(key.strip().lower(), []).append(value)
+
+    parsed = {}
+    for field, aliases in FIELD_ALIASES.items():
+        parsed[field] = next((fields[alias][0] for alias in aliases if alias in fields), None)
+
+    name_servers = []
+    for key in NAME_SERVER_KEYS:
+        for value in fields.get(key, []):
+            name = value.split()[0].lower().rstrip(".")
+            if name not in name_servers:
+                name_servers.append(name)
+    parsed["name_servers"] = name_servers
+
+    statuses = []
+    for key in STATUS_KEYS:
+        for value in fields.get(key, []):
+            status = value.split()[0]
+            if status not in statuses:
+                statuses.append(status)
+    parsed["status"] = statuses
+    return parsed
@@ -1,22 +1,55 @@
-import subprocess
+import os
+from app.core import metrics
 from app.models.response_model import CommandResponse
+from app.services.command_runner import run_command
+from app.services.singleflight import singleflight, normalize_host
+from app.services.tool_registry import registry
+from app.services.whois_client import lookup, parse_whois
+
+# ⚙️ Moteur WHOIS : native (client port 43 intégré, avec cache) ou subprocess (commande whois)
+WHOIS_ENGINE = os.getenv("WHOIS_ENGINE", "native").lower()
+# Durée de validité des réponses côté clients et caches HTTP (Cache-Control: max-age)
+WHOIS_HTTP_MAX_AGE = int(os.getenv("WHOIS_HTTP_MAX_AGE", 3600))
 
 class WhoisService:
-    def run(self, domain: str) -> CommandResponse:
+    async def run(self, domain: str, parsed: bool = False) -> CommandResponse:
+        if WHOIS_ENGINE == "subprocess":
+            return await self.run_subprocess(domain)
+        try:
+            # Les requêtes identiques en cours sont mutualisées (les registres limitent le débit)
+            result = await singleflight.do(("whois", normalize_host(domain)), lambda: lookup(domain))
+            if not parsed:
+                return CommandResponse(success=True, output=result["raw"], error=None)
+            return CommandResponse(
+                success=True,
+                output={
+                    "domain": normalize_host(domain),
+                    "servers": result["servers"],
+                    "parsed": parse_whois(result["raw"]),
+                    "raw": result["raw"]
+                },
+                error=None
+            )
+        except Exception as e:
+            metrics.record_failure("whois", e)
+            return CommandResponse(success=False, output="", error=str(e))
+
+    async def run_subprocess(self, domain: str) -> CommandResponse:
         try:
-            result = subprocess.run(
-                ["whois", domain],
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
+            result = await run_command(
+                "whois",
+                [registry.path("whois"), domain],
                 timeout=10
             )
+            if result.returncode != 0:
+                metrics.tool_errors.inc("whois")
             return CommandResponse(
                 success=result.returncode == 0,
                 output=(result.stdout or "").strip(),
                 error=(result.stderr or "").strip() if result.returncode != 0 else None
             )
         except Exception as e:
+            metrics.record_failure("whois", e)
             return CommandResponse(
                 success=False,
                 output="",
@@ -1,4 +1,5 @@
 import re
+import ipaddress
 
 # Regex autorisant les noms de domaine, IP, FQDN
 ALLOWED_HOST_REGEX = re.compile(r"^[a-zA-Z0-9.\-]+$")
@@ -6,12 +7,48 @@ ALLOWED_HOST_REGEX = re.compile(r"^[a-zA-Z0-9.\-]+$")
 # Caractères dangereux à éviter dans les inputs shell
 BLACKLISTED_CHARS = r"[;&|$`><()\[\]{}]"
 
+# Motifs refusés dans tout paramètre, et format d'un nom de domaine valide
+DANGEROUS_PATTERN = re.compile(r"[;&|$`><()\[\]{}]|\.\.\/|\/etc\/|\/var\/|\/bin\/")
+VALID_DOMAIN = re.compile(r"^([a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}$")
+
 def is_safe_host(value: str) -> bool:
     """
     Vérifie si une entrée 'host' est valide (pas de caractères dangereux, format correct)
     """
     return bool(ALLOWED_HOST_REGEX.match(value))
 
+def is_valid_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+def is_valid_host(value: str) -> bool:
+    """
+    Vérifie qu'une cible est une adresse IP ou un nom de domaine valide
+    """
+    return bool(value) and not DANGEROUS_PATTERN.search(value) and (is_valid_ip(value) or bool(VALID_DOMAIN.match(value)))
+
+def is_valid_network(value: str) -> bool:
+    """
+    Vérifie qu'une valeur est un bloc CIDR (ex: 192.168.1.0/24)
+    """
+    if "/" not in value:
+        return False
+    try:
+        ipaddress.ip_network(value, strict=False)
+        return True
+    except ValueError:
+        return False
+
+def is_valid_scan_target(value: str) -> bool:
+    """
+    Vérifie une cible de scan : liste d'hôtes et/ou de blocs CIDR séparés par des virgules
+    """
+    items = value.split(",")
+    return all(is_valid_host(item) or is_valid_network(item) for item in items)
+
 def sanitize_input(value: str) -> str:
     """
     Supprime les caractères dangereux d'une chaîne
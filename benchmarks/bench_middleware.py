@@ -0,0 +1,150 @@
+"""
+Micro-benchmark du SecurityMiddleware : coût par requête par rapport à une
+application ASGI nue (sans réseau ni serveur, appels ASGI directs).
+
+Avec --baseline, les mêmes contrôles sont aussi mesurés dans l'ancienne forme
+(BaseHTTPMiddleware, historique de rate limit en liste, journal fichier synchrone)
+pour comparer les deux implémentations.
+
+Usage : python benchmarks/bench_middleware.py [nombre_de_requêtes] [--baseline]
+"""
+import asyncio
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("API_KEY_ADMIN", "bench_key")
+os.environ.setdefault("API_RATE_LIMIT_ADMIN", str(10 ** 9))
+os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="bench-logs-"))
+
+from fastapi import HTTPException, Request  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+from app.core.security_middleware import API_KEYS, ADMIN_ROUTES, SecurityMiddleware  # noqa: E402
+from app.utils.validators import DANGEROUS_PATTERN, VALID_DOMAIN, is_valid_ip  # noqa: E402
+
+API_KEY = os.environ["API_KEY_ADMIN"].encode()
+
+# Ancienne implémentation : journal écrit dans la boucle d'événements à chaque requête
+legacy_logger = logging.getLogger("bench-legacy-security")
+legacy_logger.setLevel(logging.INFO)
+legacy_logger.propagate = False
+legacy_handler = logging.FileHandler(os.path.join(os.environ["LOG_DIR"], "legacy-api.log"), encoding="utf-8")
+legacy_handler.setFormatter(logging.Formatter("[%(asctime)s] %(levelname)s: %(message)s"))
+legacy_logger.addHandler(legacy_handler)
+
+
+class LegacySecurityMiddleware(BaseHTTPMiddleware):
+    """
+    Contrôles du SecurityMiddleware sous leur forme d'origine (BaseHTTPMiddleware).
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.request_history: Dict[str, List[tuple]] = {}
+
+    async def dispatch(self, request: Request, call_next):
+        endpoint = request.url.path
+        query_params = dict(request.query_params)
+        api_key = request.headers.get("X-API-Key", "").strip()[:128]
+
+        if endpoint.startswith("/v1/"):
+            if not api_key or api_key not in API_KEYS:
+                legacy_logger.warning(f"🔑 Auth échouée: {request.client.host} - {endpoint}")
+                return JSONResponse(status_code=403, content={"success": False, "error": "Clé API invalide ou manquante"})
+
+            if endpoint in ADMIN_ROUTES and API_KEYS[api_key]["role"] != "admin":
+                return JSONResponse(status_code=403, content={"success": False, "error": "Privilèges insuffisants"})
+
+            now = time.time()
+            history = [(ts, ep) for ts, ep in self.request_history.get(api_key, []) if now - ts < 60]
+            if len(history) >= API_KEYS[api_key]["rate_limit"]:
+                return JSONResponse(status_code=429, content={"success": False, "error": "Trop de requêtes"})
+            history.append((now, endpoint))
+            self.request_history[api_key] = history
+
+        legacy_logger.info(f"🔍 [DEBUG] Query params reçus : {query_params}")
+        for key, value in query_params.items():
+            if DANGEROUS_PATTERN.search(value):
+                return JSONResponse(status_code=400, content={"success": False, "error": f"Paramètre invalide : '{key}'"})
+            if key in ["host", "domain", "target", "hostname"] and value:
+                if not (is_valid_ip(value) or VALID_DOMAIN.match(value)):
+                    return JSONResponse(status_code=400, content={"success": False, "error": f"Hôte invalide: '{value}'"})
+            if key == "ports" and value:
+                if not re.match(r"^(\d+,)*\d+$", value) or any(int(p) > 65535 for p in value.split(",") if p.isdigit()):
+                    return JSONResponse(status_code=400, content={"success": False, "error": "Format de ports invalide"})
+
+        try:
+            start = time.time()
+            response = await call_next(request)
+            duration = round((time.time() - start) * 1000)
+            legacy_logger.info(f"✅ {request.method} {endpoint} → {response.status_code} ({duration}ms)")
+            return response
+        except HTTPException as e:
+            return JSONResponse(status_code=e.status_code, content={"success": False, "error": e.detail})
+
+
+async def bare_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def make_scope(path: str, query: bytes) -> dict:
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": query, "headers": [(b"host", b"bench"), (b"x-api-key", API_KEY)],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def measure(app, scope: dict, requests: int) -> tuple:
+    """
+    Retourne le coût moyen et le p99 d'une requête, en microsecondes.
+    """
+    for _ in range(min(requests, 1000)):  # préchauffage
+        await app(dict(scope), receive, send)
+    durations = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await app(dict(scope), receive, send)
+        durations.append(time.perf_counter() - start)
+    durations.sort()
+    return sum(durations) / requests * 1e6, durations[int(requests * 0.99)] * 1e6
+
+
+async def main(requests: int, compare: bool = False) -> None:
+    implementations = [("ASGI", SecurityMiddleware(bare_app))]
+    if compare:
+        implementations.append(("BaseHTTPMiddleware", LegacySecurityMiddleware(bare_app)))
+    scenarios = [
+        ("/v1/ping", b"host=example.com&count=4"),
+        ("/v1/nmap", b"host=10.0.0.1&scan_mode=custom&ports=22,80,443"),
+        ("/", b""),
+    ]
+    baseline, _ = await measure(bare_app, make_scope("/v1/ping", b""), requests)
+    print(f"Application nue : {baseline:.1f} µs/requête")
+    for name, middleware in implementations:
+        for path, query in scenarios:
+            cost, p99 = await measure(middleware, make_scope(path, query), requests)
+            print(f"{name:18} {path:10} {query.decode() or '-':45} {cost:7.1f} µs/requête "
+                  f"(surcoût {cost - baseline:.1f} µs, p99 {p99:.1f} µs)")
+
+
+if __name__ == "__main__":
+    arguments = [argument for argument in sys.argv[1:] if argument != "--baseline"]
+    asyncio.run(main(int(arguments[0]) if arguments else 20000, compare="--baseline" in sys.argv))
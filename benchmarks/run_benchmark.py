@@ -0,0 +1,280 @@
+"""
+Banc de charge de bout en bout : l'application tourne dans le processus (httpx + ASGI),
+les outils réseau sont remplacés par les faux exécutables de benchmarks/stubs et le
+DNS par un faux serveur local. Aucun accès réseau, résultats reproductibles.
+
+Usage :
+    python benchmarks/run_benchmark.py [--concurrency 1,8,32,128] [--requests 200]
+                                       [--endpoints ping,dig] [--output results.json]
+                                       [--compare previous.json]
+
+Variables : STUB_DELAY (durée simulée de chaque outil et du faux serveur WHOIS, défaut 0.05 s).
+"""
+import argparse
+import asyncio
+import ipaddress
+import json
+import os
+import platform
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUBS = os.path.join(ROOT, "benchmarks", "stubs")
+sys.path.insert(0, ROOT)
+
+API_KEY = "bench_admin_key"
+
+# Chaque scénario : méthode, chemin, paramètres (ou corps JSON) pour la i-ème requête.
+# Les cibles varient d'une requête à l'autre : ni le cache DNS ni le single-flight ne masquent le coût réel.
+SCENARIOS = {
+    "ping": ("GET", "/v1/ping", lambda i: {"params": {"host": f"10.1.{i // 250 % 250}.{i % 250 + 1}"}}),
+    "dig": ("GET", "/v1/dig", lambda i: {"params": {"host": f"host{i}.bench.test", "record_type": "A"}}),
+    "nslookup": ("GET", "/v1/nslookup", lambda i: {"params": {"host": f"host{i}.bench.test"}}),
+    "dns-full": ("GET", "/v1/dns-full", lambda i: {"params": {"host": f"host{i}.bench.test"}}),
+    "whois": ("GET", "/v1/whois", lambda i: {"params": {"domain": f"bench{i}.test"}}),
+    "traceroute": ("GET", "/v1/traceroute", lambda i: {"params": {"host": f"host{i}.bench.test"}}),
+    "nmap": ("GET", "/v1/nmap", lambda i: {"params": {"host": f"10.2.{i // 250 % 250}.{i % 250 + 1}"}}),
+    "ping-batch": ("POST", "/v1/ping/batch", lambda i: {"json": {"cidr": f"10.3.{i % 250}.0/28", "count": 1, "timeout": 1}}),
+}
+
+
+# 🧪 Faux serveur DNS : une réponse A (192.0.2.1) pour tout nom, NOERROR vide pour les autres types
+def dns_answer(query: bytes) -> bytes:
+    query_id = struct.unpack_from("!H", query)[0]
+    offset = 12
+    while query[offset]:
+        offset += 1 + query[offset]
+    question = query[12:offset + 5]
+    qtype = struct.unpack_from("!H", query, offset + 1)[0]
+    answers = b""
+    if qtype == 1:
+        answers = b"\xc0\x0c" + struct.pack("!HHIH", 1, 1, 300, 4) + ipaddress.IPv4Address("192.0.2.1").packed
+    return struct.pack("!HHHHHH", query_id, 0x8180, 1, 1 if answers else 0, 0, 0) + question + answers
+
+
+class StubDNSProtocol(asyncio.DatagramProtocol):
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.transport.sendto(dns_answer(data), addr)
+
+
+# 🧪 Faux serveur WHOIS : se désigne lui-même pour les TLD, puis répond après STUB_DELAY
+async def handle_whois(reader, writer):
+    request = (await reader.readline()).decode().strip()
+    await asyncio.sleep(float(os.environ["STUB_DELAY"]))
+    if "." not in request:
+        # Le registre du TLD est ce même serveur, désigné sous un autre nom
+        answer = "refer:        localhost:%d\n" % writer.get_extra_info("sockname")[1]
+    else:
+        answer = (f"Domain Name: {request.upper()}\nRegistrar: Example Registrar, Inc.\n"
+                  "Creation Date: 1997-09-15T04:00:00Z\nName Server: NS1.EXAMPLE.TEST\n")
+    writer.write(answer.encode())
+    await writer.drain()
+    writer.close()
+
+
+def prepare_environment(dns_sock: socket.socket, whois_sock: socket.socket) -> None:
+    """
+    Configure l'application avant son import (les modules lisent l'environnement au chargement).
+    """
+    os.environ["PATH"] = STUBS + os.pathsep + os.environ["PATH"]
+    os.environ.update({
+        "API_KEY_ADMIN": API_KEY,
+        "API_RATE_LIMIT_ADMIN": str(10 ** 9),
+        "RATE_LIMIT_BACKEND": "memory",
+        "PING_ENGINE": "subprocess",
+        "TRACEROUTE_ENGINE": "subprocess",
+        "DNS_SERVER": "127.0.0.1",
+        "DNS_PORT": str(dns_sock.getsockname()[1]),
+        "WHOIS_ROOT_SERVER": "127.0.0.1:%d" % whois_sock.getsockname()[1],
+        # Le faux registre se désigne sous le nom localhost : référence locale autorisée pour le banc uniquement
+        "WHOIS_REFERRAL_ALLOWLIST": "localhost:%d" % whois_sock.getsockname()[1],
+        "LOG_DIR": tempfile.mkdtemp(prefix="bench-logs-"),
+        "NMAP_JOB_STORE": "memory",
+        "RESULT_STORE_ENABLED": "false",
+    })
+    os.environ.setdefault("STUB_DELAY", "0.05")
+
+
+# 📈 Mesures
+def percentile(values: List[float], rank: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * rank), len(ordered) - 1)]
+
+
+class Saturation:
+    """
+    Échantillonne le retard de la boucle d'événements et l'occupation du pool de threads.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags: List[float] = []
+        self.threads_busy = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _sample(self) -> None:
+        import anyio.to_thread
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        self.threads_total = limiter.total_tokens
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(time.perf_counter() - start - self.interval, 0))
+            self.threads_busy = max(self.threads_busy, limiter.borrowed_tokens)
+
+    def __enter__(self):
+        self._task = asyncio.ensure_future(self._sample())
+        return self
+
+    def __exit__(self, *exc):
+        self._task.cancel()
+
+    def report(self) -> Dict:
+        return {
+            "loop_lag_ms": {
+                "p99": round(percentile(self.lags, 0.99) * 1000, 2),
+                "max": round(max(self.lags, default=0) * 1000, 2),
+            },
+            "threadpool": {"max_busy": self.threads_busy, "total": getattr(self, "threads_total", None)},
+        }
+
+
+async def run_level(client, scenario: str, concurrency: int, requests: int, offset: int) -> Dict:
+    method, path, build = SCENARIOS[scenario]
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(offset, offset + requests))
+
+    async def worker():
+        nonlocal errors
+        for index in counter:
+            start = time.perf_counter()
+            response = await client.request(method, path, headers={"X-API-Key": API_KEY}, **build(index))
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400 or (method == "GET" and not response.json().get("success")):
+                errors += 1
+
+    with Saturation() as saturation:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return dict({
+        "endpoint": scenario,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 2),
+        "latency_ms": {name: round(percentile(latencies, rank) * 1000, 2)
+                       for name, rank in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))},
+    }, **saturation.report())
+
+
+async def run(scenarios: List[str], levels: List[int], requests: int) -> List[Dict]:
+    import httpx
+    from app.main import app
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+        offset = 0
+        for scenario in scenarios:
+            for concurrency in levels:
+                result = await run_level(client, scenario, concurrency, max(requests, concurrency), offset)
+                offset += result["requests"]
+                results.append(result)
+                print(f"{scenario:11} c={concurrency:<4} {result['throughput_rps']:9.1f} req/s  "
+                      f"p50={result['latency_ms']['p50']:8.1f} ms  p99={result['latency_ms']['p99']:8.1f} ms  "
+                      f"lag max={result['loop_lag_ms']['max']:6.1f} ms  erreurs={result['errors']}",
+                      file=sys.stderr)
+    return results
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "-C", ROOT, "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous: Dict, current: Dict) -> None:
+    """
+    Affiche l'écart de débit et de p99 avec un résultat précédent (mêmes endpoint et concurrence).
+    """
+    before = {(r["endpoint"], r["concurrency"]): r for r in previous["results"]}
+    print(f"\nComparaison avec {previous.get('revision')} :", file=sys.stderr)
+    for result in current["results"]:
+        old = before.get((result["endpoint"], result["concurrency"]))
+        if not old:
+            continue
+        rps = (result["throughput_rps"] / old["throughput_rps"] - 1) * 100 if old["throughput_rps"] else 0
+        p99 = result["latency_ms"]["p99"] - old["latency_ms"]["p99"]
+        print(f"{result['endpoint']:11} c={result['concurrency']:<4} débit {rps:+6.1f} %  p99 {p99:+8.1f} ms",
+              file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Banc de charge de l'API réseau (outils simulés)")
+    parser.add_argument("--concurrency", default="1,8,32,128", help="Niveaux de concurrence, séparés par des virgules")
+    parser.add_argument("--requests", type=int, default=200, help="Requêtes par niveau")
+    parser.add_argument("--endpoints", default=",".join(SCENARIOS), help="Scénarios à exécuter")
+    parser.add_argument("--output", help="Fichier de résultats JSON (sinon sortie standard)")
+    parser.add_argument("--compare", help="Résultats JSON précédents à comparer")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Scénarios inconnus : {', '.join(sorted(unknown))}")
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    dns_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    dns_sock.bind(("127.0.0.1", 0))
+    whois_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    whois_sock.bind(("127.0.0.1", 0))
+    prepare_environment(dns_sock, whois_sock)
+
+    async def session():
+        loop = asyncio.get_running_loop()
+        transport, _ = await loop.create_datagram_endpoint(StubDNSProtocol, sock=dns_sock)
+        whois_server = await asyncio.start_server(handle_whois, sock=whois_sock)
+        try:
+            return await run(scenarios, levels, args.requests)
+        finally:
+            transport.close()
+            whois_server.close()
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "stub_delay": float(os.environ["STUB_DELAY"]),
+        "requests_per_level": args.requests,
+        "results": asyncio.run(session()),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            compare(json.load(handle), report)
+
+
+if __name__ == "__main__":
+    main()
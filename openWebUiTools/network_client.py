@@ -0,0 +1,33 @@
+# 🌐 Client de l'API réseau, utilisable hors d'OpenWebUI
+# Le code est dans network_tools.py : OpenWebUI installe un outil sous la forme d'un seul
+# fichier collé dans son interface, le client y est donc intégré et simplement réexporté ici
+from openWebUiTools.network_tools import (  # noqa: F401
+    CONNECT_ERRORS,
+    DEFAULT_BASE_URL,
+    NMAP_HOSTS_PER_TIMEOUT,
+    NMAP_MAX_TIMEOUT,
+    NMAP_TIMEOUTS,
+    RETRY_STATUSES,
+    SERVER_MARGIN,
+    TRACEROUTE_TIMEOUT,
+    AsyncNetworkAPIClient,
+    DigResult,
+    DnsAnswer,
+    NetworkAPIClient,
+    NetworkAPIError,
+    NmapPort,
+    NmapResult,
+    NslookupResult,
+    PingResult,
+    ToolResult,
+    TracerouteHop,
+    WhoisResult,
+    nmap_timeout,
+    parse_dig,
+    parse_dns_full,
+    parse_nmap,
+    parse_nslookup,
+    parse_ping,
+    parse_traceroute,
+    parse_whois,
+)
@@ -1,4 +1,632 @@
-import requests
+"""
+title: Network API
+author: gamersalpha
+git_url: https://github.com/gamersalpha/network-api
+description: ping, dig, nslookup, whois, traceroute et nmap via l'API réseau (Network-API)
+requirements: httpx
+"""
+# Fichier unique : OpenWebUI installe un outil en collant un seul fichier, le client de l'API
+# est donc intégré ici (openWebUiTools.network_client le réexporte pour un usage hors OpenWebUI)
+import asyncio
+import ipaddress
+import json
+import math
+import random
+import time
+from dataclasses import asdict, dataclass, field, fields, is_dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Generic, Iterator, List, Optional, TypeVar, Union
+
+import httpx
+
+# 🌐 Client de l'API réseau : connexions persistantes (keep-alive), sync et async,
+# nouvel essai automatique sur 429 / 503 en respectant Retry-After
+DEFAULT_BASE_URL = "http://host.docker.internal:8088"
+RETRY_STATUSES = (429, 503)
+# Erreurs survenues avant l'envoi de la requête : un nouvel essai ne peut rien exécuter deux fois
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# ⏱️ Durée maximale d'exécution côté serveur (nmap_service, traceroute_service), plus l'attente
+# d'admission (ADMISSION_MAX_WAIT) : le client n'abandonne pas un scan encore en cours
+NMAP_TIMEOUTS = {"top100": 30, "custom": 60, "all": 300}
+NMAP_HOSTS_PER_TIMEOUT = 16
+NMAP_MAX_TIMEOUT = 3600
+TRACEROUTE_TIMEOUT = 30
+SERVER_MARGIN = 35
+
+T = TypeVar("T")
+
+
+class NetworkAPIError(Exception):
+    """Requête refusée par l'API (clé invalide, paramètre incorrect, serveur saturé...)."""
+
+    def __init__(self, message: str, status_code: int = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# 📦 Résultats typés
+
+
+def _build(cls, data: Dict):
+    # Les champs ajoutés côté serveur dans une version plus récente sont ignorés
+    names = {item.name for item in fields(cls)}
+    return cls(**{key: value for key, value in data.items() if key in names})
+
+
+@dataclass
+class ToolResult(Generic[T]):
+    success: bool
+    output: Optional[T] = None
+    error: Optional[str] = None
+    # Cible de la ligne, pour les traitements par lot
+    host: Optional[str] = None
+
+
+@dataclass
+class PingResult:
+    host: str
+    packets_sent: int
+    packets_received: int
+    packet_loss_percent: float
+    rtt_min: float
+    rtt_avg: float
+    rtt_max: float
+    rtts: List[Optional[float]] = field(default_factory=list)
+    rtt_stddev: float = 0
+    jitter: float = 0
+    rtt_p50: float = 0
+    rtt_p95: float = 0
+    rtt_p99: float = 0
+    raw_output: Optional[str] = None
+
+
+@dataclass
+class DnsAnswer:
+    name: str
+    ttl: int
+    type: str
+    data: str
+
+
+@dataclass
+class DigResult:
+    name: str
+    type: str
+    status: str
+    server: str
+    answers: List[DnsAnswer]
+
+
+@dataclass
+class NslookupResult:
+    dns_server: str
+    domain: Optional[str] = None
+    ip: Optional[str] = None
+
+
+@dataclass
+class WhoisResult:
+    domain: str
+    raw: str
+    servers: List[str] = field(default_factory=list)
+    registrar: Optional[str] = None
+    creation_date: Optional[str] = None
+    updated_date: Optional[str] = None
+    expiration_date: Optional[str] = None
+    name_servers: List[str] = field(default_factory=list)
+    status: List[str] = field(default_factory=list)
+
+
+@dataclass
+class TracerouteHop:
+    hop: int
+    ip: str
+    latency_ms: List[Union[float, str]] = field(default_factory=list)
+
+
+@dataclass
+class NmapPort:
+    port: int
+    state: str
+    protocol: Optional[str] = None
+    service: Optional[str] = None
+    product: Optional[str] = None
+    version: Optional[str] = None
+    extrainfo: Optional[str] = None
+    address: Optional[str] = None
+
+
+@dataclass
+class NmapResult:
+    host: str
+    ports: List[NmapPort]
+    hosts: List[Dict] = field(default_factory=list)
+    cache_age: Optional[int] = None
+
+
+def parse_ping(output: Dict) -> PingResult:
+    return _build(PingResult, output)
+
+
+def parse_dig(output: Dict) -> DigResult:
+    return DigResult(name=output["question"]["name"], type=output["question"]["type"], status=output["status"],
+                     server=output["server"], answers=[_build(DnsAnswer, answer) for answer in output["answers"]])
+
+
+def parse_nslookup(output: Dict) -> NslookupResult:
+    return _build(NslookupResult, output)
+
+
+def parse_dns_full(output: Dict) -> Dict[str, Union[List[DnsAnswer], str]]:
+    # Par type d'enregistrement : enregistrements, ou message d'erreur de ce type
+    return {record_type: answers if isinstance(answers, str) else [_build(DnsAnswer, answer) for answer in answers]
+            for record_type, answers in output.items()}
+
+
+def parse_whois(output: Union[Dict, str]) -> WhoisResult:
+    if isinstance(output, str):
+        # Moteur subprocess côté serveur : texte brut uniquement
+        return WhoisResult(domain="", raw=output)
+    return _build(WhoisResult, dict(output.get("parsed") or {}, domain=output["domain"], raw=output["raw"],
+                                    servers=output.get("servers", [])))
+
+
+def parse_traceroute(output: List[Dict]) -> List[TracerouteHop]:
+    return [_build(TracerouteHop, hop) for hop in output]
+
+
+def parse_nmap(output: Dict) -> NmapResult:
+    return NmapResult(host=output["host"], ports=[_build(NmapPort, port) for port in output["ports"]],
+                      hosts=output.get("hosts", []), cache_age=output.get("cache_age"))
+
+
+def _identity(output: Any) -> Any:
+    return output
+
+
+@dataclass
+class _Call:
+    """
+    Requête à envoyer et conversion de son champ output.
+    """
+    method: str
+    path: str
+    parse: Callable[[Any], Any] = _identity
+    params: Dict = field(default_factory=dict)
+    body: Optional[Dict] = None
+    # Délai propre à l'appel (outils longs), sinon celui du client
+    timeout: Optional[float] = None
+
+    def query(self) -> Dict:
+        return {key: value for key, value in self.params.items() if value is not None}
+
+
+def nmap_timeout(host: str, scan_mode: str = "top100") -> float:
+    """
+    Délai d'un appel nmap : même calcul que le serveur (par groupe de NMAP_HOSTS_PER_TIMEOUT adresses).
+    """
+    addresses = 0
+    for item in host.split(","):
+        try:
+            addresses += ipaddress.ip_network(item.strip(), strict=False).num_addresses
+        except ValueError:
+            addresses += 1
+    base = NMAP_TIMEOUTS.get(scan_mode, NMAP_TIMEOUTS["top100"])
+    return min(base * math.ceil(max(addresses, 1) / NMAP_HOSTS_PER_TIMEOUT), NMAP_MAX_TIMEOUT) + SERVER_MARGIN
+
+
+def _error_message(response: httpx.Response) -> str:
+    try:
+        content = response.json()
+    except ValueError:
+        return response.text or f"HTTP {response.status_code}"
+    if isinstance(content, dict):
+        detail = content.get("error") or content.get("detail")
+        return detail if isinstance(detail, str) else json.dumps(detail, ensure_ascii=False)
+    return str(content)
+
+
+def _result(content: Dict, parse: Callable[[Any], Any]) -> ToolResult:
+    output = content.get("output")
+    if content.get("success") and output not in (None, ""):
+        output = parse(output)
+    return ToolResult(success=bool(content.get("success")), output=output,
+                      error=content.get("error"), host=content.get("host"))
+
+
+class _BaseClient:
+    """
+    Paramètres communs et construction des requêtes des clients sync et async.
+
+    Args:
+        base_url: URL de l'API (ex: http://localhost:8088)
+        api_key: Clé API (en-tête X-API-Key)
+        timeout: Délai maximal d'une requête, en secondes
+        max_retries: Nouveaux essais sur 429 / 503, erreurs de connexion et (GET) délai de lecture dépassé
+        backoff: Premier délai entre deux essais (doublé à chaque essai) si Retry-After est absent
+        max_backoff: Délai maximal entre deux essais, Retry-After compris
+    """
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, api_key: str = "dev_key_123456", timeout: float = 60.0,
+                 max_retries: int = 3, backoff: float = 0.5, max_backoff: float = 30.0, max_connections: int = 20):
+        self.base_url = base_url.rstrip("/")
+        self.headers = {"X-API-Key": api_key, "Accept": "application/json"}
+        self.timeout = httpx.Timeout(timeout, connect=min(timeout, 10.0))
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def _delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.max_backoff)
+        # Gigue : des clients nombreux ne réessaient pas tous au même instant
+        return min(self.backoff * 2 ** attempt, self.max_backoff) * random.uniform(0.5, 1.0)
+
+    def _should_retry(self, attempt: int, response: Optional[httpx.Response]) -> bool:
+        # 429 / 503 : requête refusée avant exécution (limite de débit, admission)
+        return attempt < self.max_retries and (response is None or response.status_code in RETRY_STATUSES)
+
+    def _should_retry_error(self, attempt: int, call: _Call, error: httpx.TransportError) -> bool:
+        """
+        Erreurs de connexion : toujours. Délai de lecture dépassé : GET uniquement, car la requête
+        a pu être exécutée (un POST créerait une seconde tâche ou vérification).
+        """
+        if attempt >= self.max_retries:
+            return False
+        return isinstance(error, CONNECT_ERRORS) or (call.method == "GET" and isinstance(error, httpx.ReadTimeout))
+
+    def _request(self, call: _Call) -> httpx.Request:
+        timeout = httpx.Timeout(call.timeout, connect=self.timeout.connect) if call.timeout else self.timeout
+        return self.http.build_request(call.method, call.path, params=call.query(), json=call.body, timeout=timeout)
+
+    @staticmethod
+    def _check(response: httpx.Response) -> None:
+        # 200 avec success=false : échec de l'outil, retourné dans ToolResult ; le reste est une erreur d'appel
+        if response.status_code >= 400:
+            raise NetworkAPIError(_error_message(response), response.status_code)
+
+    # 🧰 Requêtes par endpoint
+
+    @staticmethod
+    def _ping(host: str, count: int = 4, timeout: int = 2, raw_output: bool = False) -> _Call:
+        return _Call("GET", "/v1/ping", parse_ping, {"host": host, "count": count, "timeout": timeout,
+                                                     "raw_output": str(raw_output).lower()})
+
+    @staticmethod
+    def _dig(host: str, record_type: str = "A", dns_server: str = None) -> _Call:
+        return _Call("GET", "/v1/dig", parse_dig, {"host": host, "record_type": record_type, "dns_server": dns_server})
+
+    @staticmethod
+    def _nslookup(host: str, dns_server: str = None) -> _Call:
+        return _Call("GET", "/v1/nslookup", parse_nslookup, {"host": host, "dns_server": dns_server})
+
+    @staticmethod
+    def _dns_full(host: str, dns_server: str = None) -> _Call:
+        return _Call("GET", "/v1/dns-full", parse_dns_full, {"host": host, "dns_server": dns_server})
+
+    @staticmethod
+    def _whois(domain: str) -> _Call:
+        return _Call("GET", "/v1/whois", parse_whois, {"domain": domain, "parsed": "true"})
+
+    @staticmethod
+    def _traceroute(host: str, stream: str = None) -> _Call:
+        return _Call("GET", "/v1/traceroute", parse_traceroute, {"host": host, "stream": stream},
+                     timeout=TRACEROUTE_TIMEOUT + SERVER_MARGIN)
+
+    @staticmethod
+    def _nmap(host: str, scan_mode: str = "top100", ports: str = None, only_open: bool = False,
+              max_age: int = None, stream: str = None) -> _Call:
+        return _Call("GET", "/v1/nmap", parse_nmap, {"host": host, "scan_mode": scan_mode, "ports": ports,
+                                                     "only_open": str(only_open).lower(), "max_age": max_age,
+                                                     "stream": stream}, timeout=nmap_timeout(host, scan_mode))
+
+    @staticmethod
+    def _nmap_job(method: str, job_id: str = None, **params) -> _Call:
+        return _Call(method, "/v1/nmap/jobs" + (f"/{job_id}" if job_id else ""), params=params)
+
+    @staticmethod
+    def _batch(tool: str, hosts: List[str], cidr: str = None, **options) -> _Call:
+        parse = {"ping": parse_ping, "dig": parse_dig, "nslookup": parse_nslookup}[tool]
+        return _Call("POST", f"/v1/{tool}/batch", parse,
+                     body=dict({"hosts": list(hosts), "cidr": cidr}, **{k: v for k, v in options.items() if v is not None}))
+
+    @staticmethod
+    def _check_call(method: str, check_id: str = None, suffix: str = "", body: Dict = None, **params) -> _Call:
+        return _Call(method, "/v1/monitoring/checks" + (f"/{check_id}" if check_id else "") + suffix,
+                     params=params, body=body)
+
+
+class NetworkAPIClient(_BaseClient):
+    """
+    Client synchrone : une seule connexion HTTP réutilisée d'un appel à l'autre.
+
+    A fermer avec close(), ou à utiliser comme gestionnaire de contexte.
+    """
+
+    def __init__(self, *args, **kwargs):
+        transport = kwargs.pop("transport", None)
+        super().__init__(*args, **kwargs)
+        self.http = httpx.Client(base_url=self.base_url, headers=self.headers, timeout=self.timeout,
+                                 limits=self.limits, transport=transport)
+
+    def __enter__(self) -> "NetworkAPIClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.http.close()
+
+    def _send(self, call: _Call, stream: bool = False) -> httpx.Response:
+        attempt = 0
+        while True:
+            response = None
+            try:
+                request = self._request(call)
+                response = self.http.send(request, stream=stream)
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+            except httpx.TransportError as e:
+                if not self._should_retry_error(attempt, call, e):
+                    raise
+            if response is not None:
+                if not self._should_retry(attempt, response):
+                    return response
+                response.close()
+            time.sleep(self._delay(attempt, response))
+            attempt += 1
+
+    def _call(self, call: _Call) -> ToolResult:
+        response = self._send(call)
+        self._check(response)
+        return _result(response.json(), call.parse)
+
+    def _lines(self, call: _Call) -> Iterator[Dict]:
+        response = self._send(call, stream=True)
+        try:
+            if response.status_code >= 400:
+                response.read()
+                self._check(response)
+            for line in response.iter_lines():
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            response.close()
+
+    def _events(self, call: _Call, event: str, parse: Callable[[Dict], Any]) -> Iterator[Any]:
+        for line in self._lines(call):
+            if line["event"] == event:
+                yield parse(line["data"])
+            elif line["event"] == "done" and not line["data"].get("success"):
+                raise NetworkAPIError(line["data"].get("error") or "Échec de l'outil")
+
+    def ping(self, host: str, count: int = 4, timeout: int = 2, raw_output: bool = False) -> ToolResult[PingResult]:
+        return self._call(self._ping(host, count, timeout, raw_output))
+
+    def dig(self, host: str, record_type: str = "A", dns_server: str = None) -> ToolResult[DigResult]:
+        return self._call(self._dig(host, record_type, dns_server))
+
+    def nslookup(self, host: str, dns_server: str = None) -> ToolResult[NslookupResult]:
+        return self._call(self._nslookup(host, dns_server))
+
+    def dns_full(self, host: str, dns_server: str = None) -> ToolResult[Dict[str, Union[List[DnsAnswer], str]]]:
+        return self._call(self._dns_full(host, dns_server))
+
+    def whois(self, domain: str) -> ToolResult[WhoisResult]:
+        return self._call(self._whois(domain))
+
+    def traceroute(self, host: str) -> ToolResult[List[TracerouteHop]]:
+        return self._call(self._traceroute(host))
+
+    def traceroute_stream(self, host: str) -> Iterator[TracerouteHop]:
+        """
+        Sauts au fil de l'eau (NDJSON). Raises: NetworkAPIError si la trace échoue.
+        """
+        return self._events(self._traceroute(host, "ndjson"), "hop", lambda hop: _build(TracerouteHop, hop))
+
+    def nmap(self, host: str, scan_mode: str = "top100", ports: str = None, only_open: bool = False,
+             max_age: int = None) -> ToolResult[NmapResult]:
+        return self._call(self._nmap(host, scan_mode, ports, only_open, max_age))
+
+    def nmap_stream(self, host: str, scan_mode: str = "top100", ports: str = None,
+                    only_open: bool = False) -> Iterator[NmapPort]:
+        return self._events(self._nmap(host, scan_mode, ports, only_open, stream="ndjson"), "port",
+                            lambda port: _build(NmapPort, port))
+
+    def submit_nmap_job(self, host: str, scan_mode: str = "top100", ports: str = None, only_open: bool = False,
+                        priority: int = 5) -> ToolResult[Dict]:
+        return self._call(self._nmap_job("POST", host=host, scan_mode=scan_mode, ports=ports,
+                                         only_open=str(only_open).lower(), priority=priority))
+
+    def nmap_job(self, job_id: str) -> ToolResult[Dict]:
+        return self._call(self._nmap_job("GET", job_id))
+
+    def cancel_nmap_job(self, job_id: str) -> ToolResult[Dict]:
+        return self._call(self._nmap_job("DELETE", job_id))
+
+    def ping_many(self, hosts: List[str] = (), cidr: str = None, count: int = 4, timeout: int = 2,
+                  raw_output: bool = False) -> Iterator[ToolResult[PingResult]]:
+        """
+        Lot d'hôtes en une seule requête : un résultat par hôte, dans l'ordre d'arrivée.
+        """
+        call = self._batch("ping", hosts, cidr, count=count, timeout=timeout, raw_output=raw_output)
+        return (_result(line, call.parse) for line in self._lines(call))
+
+    def dig_many(self, hosts: List[str] = (), cidr: str = None, record_type: str = "A",
+                 dns_server: str = None) -> Iterator[ToolResult[DigResult]]:
+        call = self._batch("dig", hosts, cidr, record_type=record_type, dns_server=dns_server)
+        return (_result(line, call.parse) for line in self._lines(call))
+
+    def nslookup_many(self, hosts: List[str] = (), cidr: str = None,
+                      dns_server: str = None) -> Iterator[ToolResult[NslookupResult]]:
+        call = self._batch("nslookup", hosts, cidr, dns_server=dns_server)
+        return (_result(line, call.parse) for line in self._lines(call))
+
+    def create_check(self, tool: str, target: str, interval: int = 60, **options) -> ToolResult[Dict]:
+        return self._call(self._check_call("POST", body=dict(options, tool=tool, target=target, interval=interval)))
+
+    def list_checks(self, offset: int = 0, limit: int = 100) -> ToolResult[Dict]:
+        return self._call(self._check_call("GET", offset=offset, limit=limit))
+
+    def get_check(self, check_id: str) -> ToolResult[Dict]:
+        return self._call(self._check_call("GET", check_id))
+
+    def delete_check(self, check_id: str) -> ToolResult[Dict]:
+        return self._call(self._check_call("DELETE", check_id))
+
+    def check_history(self, check_id: str, resolution: str = "raw", since: int = 0) -> ToolResult[Dict]:
+        return self._call(self._check_call("GET", check_id, "/history", resolution=resolution, since=since))
+
+
+class AsyncNetworkAPIClient(_BaseClient):
+    """
+    Client asynchrone (asyncio) : mêmes méthodes que NetworkAPIClient, à attendre avec await.
+    """
+
+    def __init__(self, *args, **kwargs):
+        transport = kwargs.pop("transport", None)
+        super().__init__(*args, **kwargs)
+        self.http = httpx.AsyncClient(base_url=self.base_url, headers=self.headers, timeout=self.timeout,
+                                      limits=self.limits, transport=transport)
+
+    async def __aenter__(self) -> "AsyncNetworkAPIClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await self.http.aclose()
+
+    async def _send(self, call: _Call, stream: bool = False) -> httpx.Response:
+        attempt = 0
+        while True:
+            response = None
+            try:
+                request = self._request(call)
+                response = await self.http.send(request, stream=stream)
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+            except httpx.TransportError as e:
+                if not self._should_retry_error(attempt, call, e):
+                    raise
+            if response is not None:
+                if not self._should_retry(attempt, response):
+                    return response
+                await response.aclose()
+            await asyncio.sleep(self._delay(attempt, response))
+            attempt += 1
+
+    async def _call(self, call: _Call) -> ToolResult:
+        response = await self._send(call)
+        self._check(response)
+        return _result(response.json(), call.parse)
+
+    async def _lines(self, call: _Call) -> AsyncIterator[Dict]:
+        response = await self._send(call, stream=True)
+        try:
+            if response.status_code >= 400:
+                await response.aread()
+                self._check(response)
+            async for line in response.aiter_lines():
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            await response.aclose()
+
+    async def _events(self, call: _Call, event: str, parse: Callable[[Dict], Any]) -> AsyncIterator[Any]:
+        async for line in self._lines(call):
+            if line["event"] == event:
+                yield parse(line["data"])
+            elif line["event"] == "done" and not line["data"].get("success"):
+                raise NetworkAPIError(line["data"].get("error") or "Échec de l'outil")
+
+    async def _results(self, call: _Call) -> AsyncIterator[ToolResult]:
+        async for line in self._lines(call):
+            yield _result(line, call.parse)
+
+    async def ping(self, host: str, count: int = 4, timeout: int = 2, raw_output: bool = False) -> ToolResult[PingResult]:
+        return await self._call(self._ping(host, count, timeout, raw_output))
+
+    async def dig(self, host: str, record_type: str = "A", dns_server: str = None) -> ToolResult[DigResult]:
+        return await self._call(self._dig(host, record_type, dns_server))
+
+    async def nslookup(self, host: str, dns_server: str = None) -> ToolResult[NslookupResult]:
+        return await self._call(self._nslookup(host, dns_server))
+
+    async def dns_full(self, host: str, dns_server: str = None) -> ToolResult[Dict[str, Union[List[DnsAnswer], str]]]:
+        return await self._call(self._dns_full(host, dns_server))
+
+    async def whois(self, domain: str) -> ToolResult[WhoisResult]:
+        return await self._call(self._whois(domain))
+
+    async def traceroute(self, host: str) -> ToolResult[List[TracerouteHop]]:
+        return await self._call(self._traceroute(host))
+
+    def traceroute_stream(self, host: str) -> AsyncIterator[TracerouteHop]:
+        return self._events(self._traceroute(host, "ndjson"), "hop", lambda hop: _build(TracerouteHop, hop))
+
+    async def nmap(self, host: str, scan_mode: str = "top100", ports: str = None, only_open: bool = False,
+                   max_age: int = None) -> ToolResult[NmapResult]:
+        return await self._call(self._nmap(host, scan_mode, ports, only_open, max_age))
+
+    def nmap_stream(self, host: str, scan_mode: str = "top100", ports: str = None,
+                    only_open: bool = False) -> AsyncIterator[NmapPort]:
+        return self._events(self._nmap(host, scan_mode, ports, only_open, stream="ndjson"), "port",
+                            lambda port: _build(NmapPort, port))
+
+    async def submit_nmap_job(self, host: str, scan_mode: str = "top100", ports: str = None, only_open: bool = False,
+                              priority: int = 5) -> ToolResult[Dict]:
+        return await self._call(self._nmap_job("POST", host=host, scan_mode=scan_mode, ports=ports,
+                                               only_open=str(only_open).lower(), priority=priority))
+
+    async def nmap_job(self, job_id: str) -> ToolResult[Dict]:
+        return await self._call(self._nmap_job("GET", job_id))
+
+    async def cancel_nmap_job(self, job_id: str) -> ToolResult[Dict]:
+        return await self._call(self._nmap_job("DELETE", job_id))
+
+    def ping_many(self, hosts: List[str] = (), cidr: str = None, count: int = 4, timeout: int = 2,
+                  raw_output: bool = False) -> AsyncIterator[ToolResult[PingResult]]:
+        return self._results(self._batch("ping", hosts, cidr, count=count, timeout=timeout, raw_output=raw_output))
+
+    def dig_many(self, hosts: List[str] = (), cidr: str = None, record_type: str = "A",
+                 dns_server: str = None) -> AsyncIterator[ToolResult[DigResult]]:
+        return self._results(self._batch("dig", hosts, cidr, record_type=record_type, dns_server=dns_server))
+
+    def nslookup_many(self, hosts: List[str] = (), cidr: str = None,
+                      dns_server: str = None) -> AsyncIterator[ToolResult[NslookupResult]]:
+        return self._results(self._batch("nslookup", hosts, cidr, dns_server=dns_server))
+
+    async def create_check(self, tool: str, target: str, interval: int = 60, **options) -> ToolResult[Dict]:
+        return await self._call(self._check_call("POST", body=dict(options, tool=tool, target=target, interval=interval)))
+
+    async def list_checks(self, offset: int = 0, limit: int = 100) -> ToolResult[Dict]:
+        return await self._call(self._check_call("GET", offset=offset, limit=limit))
+
+    async def get_check(self, check_id: str) -> ToolResult[Dict]:
+        return await self._call(self._check_call("GET", check_id))
+
+    async def delete_check(self, check_id: str) -> ToolResult[Dict]:
+        return await self._call(self._check_call("DELETE", check_id))
+
+    async def check_history(self, check_id: str, resolution: str = "raw", since: int = 0) -> ToolResult[Dict]:
+        return await self._call(self._check_call("GET", check_id, "/history", resolution=resolution, since=since))
+
+
+# 🔧 Outils OpenWebUI
+def _to_text(value) -> str:
+    if is_dataclass(value):
+        value = asdict(value)
+    elif isinstance(value, list):
+        value = [asdict(item) if is_dataclass(item) else item for item in value]
+    elif isinstance(value, dict):
+        value = {key: [asdict(item) if is_dataclass(item) else item for item in items] if isinstance(items, list) else items
+                 for key, items in value.items()}
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
 
 
 class Tools:
@@ -7,15 +635,76 @@ class Tools:
     ):
         self.api_base_url = api_base_url.rstrip("/")
         self.api_key = api_key
+        self._client = None
 
-    def ping(self, host: str) -> str:
+    @property
+    def client(self) -> NetworkAPIClient:
+        # Un seul client (connexions keep-alive) pour tous les appels d'outils
+        if self._client is None:
+            self._client = NetworkAPIClient(self.api_base_url, self.api_key)
+        return self._client
+
+    def _run(self, call) -> str:
         try:
-            r = requests.get(
-                f"{self.api_base_url}/v1/ping",
-                params={"host": host},
-                headers={"X-API-Key": self.api_key},
-                timeout=5,
-            )
-            return r.text
+            result = call()
         except Exception as e:
             return f"Erreur : {e}"
+        if hasattr(result, "success"):
+            return _to_text(result.output) if result.success else f"Erreur : {result.error}"
+        return _to_text(result)
+
+    def ping(self, host: str) -> str:
+        """
+        Envoie un ping via l'API à une IP ou un domaine.
+        host : IP ou domaine (ex: 8.8.8.8, openai.com)
+        """
+        return self._run(lambda: self.client.ping(host))
+
+    def ping_many(self, hosts: str) -> str:
+        """
+        Ping plusieurs hôtes en une seule requête.
+        hosts : IP ou domaines séparés par des virgules (ex: 8.8.8.8,1.1.1.1)
+        """
+        targets = [host.strip() for host in hosts.split(",") if host.strip()]
+        return self._run(lambda: {
+            result.host: asdict(result.output) if result.success else f"Erreur : {result.error}"
+            for result in self.client.ping_many(targets)
+        })
+
+    def dig(self, host: str, record_type: str = "A") -> str:
+        """
+        Résolution DNS d'un enregistrement.
+        host : nom de domaine ; record_type : A, AAAA, MX, TXT, NS, SOA ou PTR
+        """
+        return self._run(lambda: self.client.dig(host, record_type))
+
+    def nslookup(self, host: str) -> str:
+        """
+        Adresse IP d'un nom de domaine.
+        """
+        return self._run(lambda: self.client.nslookup(host))
+
+    def dns_full(self, host: str) -> str:
+        """
+        Tous les enregistrements DNS (A, AAAA, MX, TXT, NS, SOA) d'un domaine.
+        """
+        return self._run(lambda: self.client.dns_full(host))
+
+    def whois(self, domain: str) -> str:
+        """
+        Informations WHOIS d'un domaine (registrar, dates, serveurs de noms).
+        """
+        return self._run(lambda: self.client.whois(domain))
+
+    def traceroute(self, host: str) -> str:
+        """
+        Chemin réseau jusqu'à une IP ou un domaine.
+        """
+        return self._run(lambda: list(self.client.traceroute_stream(host)))
+
+    def nmap(self, host: str, scan_mode: str = "top100", ports: str = "") -> str:
+        """
+        Scan de ports (clé admin requise).
+        scan_mode : top100, all ou custom (avec ports, ex: 22,80,443)
+        """
+        return self._run(lambda: self.client.nmap(host, scan_mode, ports or None, only_open=True, max_age=3600))
@@ -0,0 +1,34 @@
+import os
+import stat
+import tempfile
+
+import pytest
+
+# Clés utilisées par les tests (identiques à .envTemplate) pour importer l'application en local
+os.environ.setdefault("API_KEY_DEV", "dev_key_123456")
+os.environ.setdefault("API_KEY_ADMIN", "admin_key_654321")
+# Pas de stockage persistant partagé entre tests (les tests du stockage utilisent leur propre base)
+os.environ.setdefault("RESULT_STORE_ENABLED", "false")
+# Toutes les routes sont chargées : les outils sont remplacés par de faux exécutables (fake_tool)
+os.environ.setdefault("TOOL_ROUTES", "all")
+# Journaux des tests hors du dépôt (écrits quand un test démarre le lifespan de l'application)
+os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="network-api-test-logs-"))
+
+
+@pytest.fixture
+def fake_tool(tmp_path, monkeypatch):
+    """
+    Installe un faux exécutable (script shell) en tête du PATH.
+    """
+    from app.services.tool_registry import registry
+
+    def install(name: str, script: str):
+        path = tmp_path / name
+        path.write_text(script)
+        path.chmod(path.stat().st_mode | stat.S_IEXEC)
+        monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+        # Prioritaire sur le chemin détecté au démarrage par le registre des outils
+        monkeypatch.setitem(registry.paths, name, str(path))
+        return path
+
+    return install
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import logging
+import os
+
+from app.core import access_log
+from app.core.security_middleware import SecurityMiddleware
+
+
+class CaptureHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def call_middleware(inner, path="/v1/ping", query=b"host=example.com", key=b"dev_key_123456"):
+    scope = {
+        "type": "http", "method": "GET", "path": path, "query_string": query,
+        "headers": [(b"x-api-key", key)], "client": ("127.0.0.1", 1234),
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(SecurityMiddleware(inner)(scope, receive, send))
+    return sent
+
+
+def capture_access_log(monkeypatch):
+    handler = CaptureHandler()
+    monkeypatch.setattr(access_log.access_logger, "handlers", [handler])
+    return handler
+
+
+def test_sampling_always_keeps_errors():
+    assert access_log.should_log(500, sample_rate=0)
+    assert access_log.should_log(429, sample_rate=0)
+    assert not access_log.should_log(200, sample_rate=0)
+    assert access_log.should_log(200, sample_rate=1)
+
+
+def test_json_formatter_emits_one_line_per_request():
+    record = logging.LogRecord("api-access", logging.INFO, __file__, 1, {"endpoint": "/v1/ping", "status": 200}, None, None)
+    line = access_log.JSONFormatter().format(record)
+    assert "\n" not in line
+    entry = json.loads(line)
+    assert entry["endpoint"] == "/v1/ping" and entry["status"] == 200 and "time" in entry
+
+
+def test_request_is_logged_with_role_and_tool_runtime(monkeypatch):
+    handler = capture_access_log(monkeypatch)
+
+    async def inner(scope, receive, send):
+        # Le temps outil est propagé aux tâches filles (ex : single-flight)
+        await asyncio.ensure_future(asyncio.sleep(0))
+        access_log.add_tool_runtime(0.25)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    call_middleware(inner)
+    entry = handler.records[-1].msg
+    assert entry["role"] == "developer"
+    assert entry["endpoint"] == "/v1/ping"
+    assert entry["status"] == 200
+    assert entry["tool_runtime_ms"] == 250.0
+    assert entry["duration_ms"] >= 0
+
+
+def test_rejected_request_is_logged_even_when_sampled_out(monkeypatch):
+    handler = capture_access_log(monkeypatch)
+    monkeypatch.setattr(access_log, "ACCESS_LOG_SAMPLE_RATE", 0.0)
+
+    async def inner(scope, receive, send):
+        raise AssertionError("ne doit pas être appelé")
+
+    sent = call_middleware(inner, key=b"wrong")
+    assert sent[0]["status"] == 403
+    assert [record.msg["status"] for record in handler.records] == [403]
+
+
+def test_log_files_are_only_written_during_the_lifespan():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    # Importer l'application n'ouvre aucun fichier de journal
+    assert access_log.listener is None
+    with TestClient(app) as client:
+        assert access_log.listener is not None
+        client.get("/v1/ping", params={"host": "example.com"})
+    assert access_log.listener is None
+    with open(os.path.join(access_log.LOG_DIR, "access.log"), encoding="utf-8") as handle:
+        assert json.loads(handle.readlines()[-1])["status"] == 403
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import admission, security_middleware
+from app.core.admission import AdmissionController, AdmissionRejected, request_cost
+from app.main import app
+
+DEV_KEY = "dev_key_123456"
+client = TestClient(app)
+
+
+def test_request_cost_depends_on_tool_and_scan_mode():
+    assert request_cost("/v1/ping", b"host=example.com") == ("ping", 1)
+    assert request_cost("/v1/dns-full", b"") == ("dns-full", 6)
+    assert request_cost("/v1/nmap", b"host=10.0.0.1&scan_mode=all") == ("nmap", 100)
+    assert request_cost("/v1/nmap/jobs", b"") is None
+    assert request_cost("/v1/ping/batch", b"", targets=20) == ("batch", 20)
+
+
+def test_queue_is_ordered_by_role_then_arrival(monkeypatch):
+    monkeypatch.setitem(admission.DEFAULT_SLOTS, "nmap", 1)
+
+    async def scenario():
+        controller = AdmissionController(capacity=100, queue_size=10, max_wait=5)
+        order = []
+        await controller.acquire("nmap", 20, "developer")
+
+        async def request(name, role):
+            await controller.acquire("nmap", 20, role)
+            order.append(name)
+            controller.release("nmap", 20)
+
+        tasks = [asyncio.ensure_future(request("dev", "developer")),
+                 asyncio.ensure_future(request("admin", "admin"))]
+        await asyncio.sleep(0)
+        # Les autres outils ne sont pas bloqués par la limite de nmap
+        await asyncio.wait_for(controller.acquire("ping", 1, "developer"), 0.1)
+        controller.release("ping", 1)
+        controller.release("nmap", 20)
+        await asyncio.gather(*tasks)
+        return order, controller.used
+
+    order, used = asyncio.run(scenario())
+    assert order == ["admin", "dev"]
+    assert used == 0
+
+
+def test_expensive_request_is_not_starved_by_cheap_ones():
+    async def scenario():
+        controller = AdmissionController(capacity=10, queue_size=10, max_wait=5)
+        await controller.acquire("ping", 5)
+        expensive = asyncio.ensure_future(controller.acquire("nmap", 8))
+        await asyncio.sleep(0)
+        cheap = asyncio.ensure_future(controller.acquire("ping", 1))
+        await asyncio.sleep(0)
+        # La place libre (5) suffirait au ping, mais il ne double pas le scan en attente
+        assert not cheap.done()
+        controller.release("ping", 5)
+        await expensive
+        await cheap
+        return controller.used
+
+    assert asyncio.run(scenario()) == 9
+
+
+def test_full_queue_and_timeout_are_rejected_with_retry_after():
+    async def scenario():
+        controller = AdmissionController(capacity=1, queue_size=1, max_wait=0.05)
+        await controller.acquire("whois", 1)
+        waiting = asyncio.ensure_future(controller.acquire("whois", 1))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as full:
+            await controller.acquire("whois", 1)
+        with pytest.raises(AdmissionRejected):
+            await waiting
+        return full.value.retry_after, controller.stats()
+
+    retry_after, stats = asyncio.run(scenario())
+    assert retry_after >= 1
+    assert stats == {"used": 1, "capacity": 1, "waiting": 0}
+
+
+def test_middleware_answers_503_when_saturated(monkeypatch):
+    saturated = AdmissionController(capacity=1, queue_size=0, max_wait=1)
+    saturated.used = 1
+    monkeypatch.setattr(security_middleware, "admission_controller", saturated)
+    response = client.get("/v1/whois", params={"domain": "example.com"}, headers={"X-API-Key": DEV_KEY})
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.json()["success"] is False
@@ -0,0 +1,91 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import security_middleware
+from app.core.rate_limiter import MemoryBackend, RateLimiter
+from app.main import app
+from app.core import batch
+from app.core.batch import count_targets, expand_targets
+from app.services import dig_service
+
+DEV_KEY = "dev_key_123456"
+client = TestClient(app)
+
+
+def test_expand_targets_hosts_and_cidr():
+    targets = expand_targets(["example.com", "10.0.0.1"], "10.0.0.0/30")
+    assert targets == ["example.com", "10.0.0.1", "10.0.0.2"]
+
+
+@pytest.mark.parametrize("hosts,cidr", [
+    (["8.8.8.8;rm -rf /"], None),
+    (["$(whoami)"], None),
+    ([], "10.0.0.0/8"),
+    ([], "not-a-cidr"),
+    ([], None),
+])
+def test_expand_targets_rejects_invalid_batches(hosts, cidr):
+    with pytest.raises(ValueError):
+        expand_targets(hosts, cidr)
+
+
+def test_dig_batch_streams_one_line_per_target(monkeypatch):
+    async def fake_resolve(host, record_type, dns_server=None):
+        return {"status": "NOERROR", "server": "127.0.0.1",
+                "answers": [{"name": host + ".", "ttl": 60, "type": "A", "data": "192.0.2.1"}]}
+
+    monkeypatch.setattr(dig_service, "resolve", fake_resolve)
+    response = client.post(
+        "/v1/dig/batch",
+        json={"hosts": ["a.example.com", "b.example.com", "c.example.com"]},
+        headers={"X-API-Key": DEV_KEY}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["host"] for line in lines) == ["a.example.com", "b.example.com", "c.example.com"]
+    assert all(line["success"] for line in lines)
+
+
+def test_batch_validation_happens_before_any_lookup():
+    response = client.post(
+        "/v1/dig/batch",
+        json={"hosts": ["example.com", "| echo hacked"]},
+        headers={"X-API-Key": DEV_KEY}
+    )
+    assert response.status_code == 400
+    assert response.json()["success"] is False
+
+
+def test_batch_requires_api_key():
+    response = client.post("/v1/ping/batch", json={"hosts": ["127.0.0.1"]})
+    assert response.status_code == 403
+
+
+def test_batch_size_is_bounded(monkeypatch):
+    monkeypatch.setattr(batch, "BATCH_MAX_TARGETS", 2)
+    with pytest.raises(ValueError):
+        expand_targets(["a.example.com", "b.example.com", "c.example.com"])
+
+
+def test_count_targets_from_request_body():
+    assert count_targets(b'{"hosts": ["example.com"], "cidr": "10.0.0.0/29"}') == 7
+    assert count_targets(b'{"hosts": ["| echo"]}') == 1
+    assert count_targets(b"not json") == 1
+
+
+def test_each_batch_target_counts_against_the_rate_limit(monkeypatch):
+    async def fake_resolve(host, record_type, dns_server=None):
+        return {"status": "NOERROR", "server": "127.0.0.1", "answers": []}
+
+    monkeypatch.setattr(dig_service, "resolve", fake_resolve)
+    monkeypatch.setattr(security_middleware, "rate_limiter", RateLimiter(MemoryBackend()))
+    headers = {"X-API-Key": DEV_KEY}
+    # Clé de développement : 30 requêtes par fenêtre
+    assert client.post("/v1/dig/batch", json={"cidr": "10.0.0.0/26"}, headers=headers).status_code == 413
+    assert client.post("/v1/dig/batch", json={"cidr": "10.0.0.0/27"}, headers=headers).status_code == 200
+    response = client.post("/v1/dig/batch", json={"hosts": ["example.com"]}, headers=headers)
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
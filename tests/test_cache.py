@@ -0,0 +1,43 @@
+import time
+
+from app.services.cache import TTLCache
+
+
+def test_get_returns_value_and_counts_hits_and_misses():
+    cache = TTLCache(max_bytes=1000)
+    assert cache.get("a") is None
+    cache.set("a", "valeur", ttl=60, size=10)
+    value, age = cache.get("a")
+    assert value == "valeur"
+    assert age >= 0
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = TTLCache(max_bytes=1000)
+    cache.set("a", 1, ttl=0.05, size=10)
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.stats()["bytes"] == 0
+
+
+def test_lru_eviction_respects_memory_cap():
+    cache = TTLCache(max_bytes=30)
+    cache.set("a", 1, ttl=60, size=10)
+    cache.set("b", 2, ttl=60, size=10)
+    cache.set("c", 3, ttl=60, size=10)
+    cache.get("a")  # "a" redevient le plus récent
+    cache.set("d", 4, ttl=60, size=10)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= 30
+
+
+def test_oversized_or_zero_ttl_entries_are_not_stored():
+    cache = TTLCache(max_bytes=10)
+    cache.set("big", 1, ttl=60, size=11)
+    cache.set("zero", 1, ttl=0, size=1)
+    assert len(cache) == 0
@@ -0,0 +1,82 @@
+import asyncio
+import subprocess
+import sys
+import time
+
+import pytest
+
+from app.services import command_runner
+from app.services.command_runner import run_command, stream_command
+
+PYTHON = sys.executable
+
+
+def test_run_command_captures_output():
+    result = asyncio.run(run_command(
+        "test", [PYTHON, "-c", "import sys; print('ok'); print('err', file=sys.stderr); sys.exit(3)"], timeout=10
+    ))
+    assert result.returncode == 3
+    assert result.stdout.strip() == "ok"
+    assert result.stderr.strip() == "err"
+
+
+def test_run_command_timeout_kills_process():
+    start = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        asyncio.run(run_command("test", [PYTHON, "-c", "import time; time.sleep(30)"], timeout=0.5))
+    assert time.monotonic() - start < 5
+
+
+def test_run_command_respects_concurrency_limit(monkeypatch):
+    monkeypatch.setenv("TOOL_CONCURRENCY_LIMITED", "2")
+    monkeypatch.setattr(command_runner, "_semaphores", {})
+
+    async def scenario():
+        command = [PYTHON, "-c", "import time; time.sleep(0.3)"]
+        start = time.monotonic()
+        await asyncio.gather(*(run_command("limited", command, timeout=10) for _ in range(4)))
+        return time.monotonic() - start
+
+    # 4 processus de 0.3s avec 2 emplacements → au moins 2 vagues
+    assert asyncio.run(scenario()) >= 0.6
+
+
+def test_stream_command_yields_lines_as_they_are_printed():
+    script = "import time\nfor i in range(3):\n    print(i, flush=True)\n    time.sleep(0.2)\n"
+
+    async def scenario():
+        start = time.monotonic()
+        arrivals = []
+        async for line in stream_command("test", [PYTHON, "-c", script], timeout=10):
+            arrivals.append((line, time.monotonic() - start))
+        return arrivals
+
+    arrivals = asyncio.run(scenario())
+    assert [line for line, _ in arrivals] == ["0", "1", "2"]
+    assert arrivals[0][1] < arrivals[-1][1] - 0.3
+
+
+def test_stream_command_reports_failures_and_timeouts():
+    async def consume(command, timeout):
+        return [line async for line in stream_command("test", command, timeout=timeout)]
+
+    with pytest.raises(subprocess.CalledProcessError) as failure:
+        asyncio.run(consume([PYTHON, "-c", "import sys; print('x'); sys.exit('boom')"], 10))
+    assert "boom" in failure.value.stderr
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        asyncio.run(consume([PYTHON, "-c", "import time; print('x', flush=True); time.sleep(30)"], 0.5))
+
+
+def test_stream_command_does_not_signal_a_reaped_process(monkeypatch):
+    killed = []
+    monkeypatch.setattr(command_runner.os, "killpg", lambda pid, sig: killed.append(pid))
+
+    async def consume(command, timeout):
+        return [line async for line in stream_command("test", command, timeout=timeout)]
+
+    assert asyncio.run(consume([PYTHON, "-c", "print('x')"], 10)) == ["x"]
+    assert killed == []
+    with pytest.raises(subprocess.TimeoutExpired):
+        asyncio.run(consume([PYTHON, "-c", "import time; print('x', flush=True); time.sleep(2)"], 0.3))
+    assert len(killed) == 1
@@ -0,0 +1,178 @@
+import asyncio
+import ipaddress
+import struct
+
+import pytest
+
+from app.services.dns_resolver import (
+    DNSResolverError, RECORD_TYPES, build_query, encode_name, parse_response, resolve, reverse_name
+)
+
+# Zone servie par le faux serveur DNS : (nom, type) → [(ttl, rdata brut)]
+ZONE = {
+    ("example.test.", "A"): [(300, ipaddress.IPv4Address("192.0.2.10").packed)],
+    ("example.test.", "AAAA"): [(300, ipaddress.IPv6Address("2001:db8::10").packed)],
+    ("example.test.", "MX"): [(600, struct.pack("!H", 10) + encode_name("mail.example.test"))],
+    ("example.test.", "TXT"): [(60, b"\x0cv=spf1 -all")],
+    ("example.test.", "NS"): [(3600, encode_name("ns1.example.test"))],
+    ("example.test.", "SOA"): [(900, encode_name("ns1.example.test") + encode_name("admin.example.test")
+                                + struct.pack("!IIIII", 2024010101, 7200, 3600, 1209600, 300))],
+    ("10.2.0.192.in-addr.arpa.", "PTR"): [(120, encode_name("example.test"))],
+    ("big.test.", "TXT"): [(30, bytes([200]) + b"x" * 200)] * 5,
+}
+TYPE_NAMES = {code: name for name, code in RECORD_TYPES.items()}
+
+
+def build_answer(query: bytes, truncate: bool = False) -> bytes:
+    query_id, _, _, _, _, _ = struct.unpack_from("!HHHHHH", query)
+    offset = 12
+    labels = []
+    while query[offset]:
+        labels.append(query[offset + 1:offset + 1 + query[offset]].decode())
+        offset += 1 + query[offset]
+    question = query[12:offset + 5]
+    qtype = struct.unpack_from("!H", query, offset + 1)[0]
+    name = ".".join(labels) + "."
+    records = ZONE.get((name, TYPE_NAMES[qtype]))
+    rcode = 0 if records or any(n == name for n, _ in ZONE) else 3
+    if truncate and records and len(records) > 1:
+        return struct.pack("!HHHHHH", query_id, 0x8380, 1, 0, 0, 0) + question
+    answers = b"".join(
+        b"\xc0\x0c" + struct.pack("!HHIH", qtype, 1, ttl, len(rdata)) + rdata for ttl, rdata in records or []
+    )
+    return struct.pack("!HHHHHH", query_id, 0x8180 | rcode, 1, len(records or []), 0, 0) + question + answers
+
+
+class StubDNSProtocol(asyncio.DatagramProtocol):
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.transport.sendto(build_answer(data, truncate=True), addr)
+
+
+async def handle_tcp(reader, writer):
+    length = struct.unpack("!H", await reader.readexactly(2))[0]
+    answer = build_answer(await reader.readexactly(length))
+    writer.write(struct.pack("!H", len(answer)) + answer)
+    await writer.drain()
+    writer.close()
+
+
+def run_with_stub(coro_factory):
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        transport, _ = await loop.create_datagram_endpoint(StubDNSProtocol, local_addr=("127.0.0.1", 0))
+        port = transport.get_extra_info("sockname")[1]
+        server = await asyncio.start_server(handle_tcp, "127.0.0.1", port)
+        try:
+            return await coro_factory(port)
+        finally:
+            transport.close()
+            server.close()
+
+    return asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("record_type,expected", [
+    ("A", "192.0.2.10"),
+    ("AAAA", "2001:db8::10"),
+    ("MX", "10 mail.example.test."),
+    ("TXT", '"v=spf1 -all"'),
+    ("NS", "ns1.example.test."),
+    ("SOA", "ns1.example.test. admin.example.test. 2024010101 7200 3600 1209600 300"),
+])
+def test_resolve_record_types(record_type, expected):
+    result = run_with_stub(lambda port: resolve("example.test", record_type, "127.0.0.1", port=port))
+    assert result["status"] == "NOERROR"
+    assert result["answers"][0]["name"] == "example.test."
+    assert result["answers"][0]["type"] == record_type
+    assert result["answers"][0]["data"] == expected
+    assert result["answers"][0]["ttl"] > 0
+
+
+def test_resolve_ptr():
+    result = run_with_stub(lambda port: resolve(reverse_name("192.0.2.10"), "PTR", "127.0.0.1", port=port))
+    assert result["answers"][0]["data"] == "example.test."
+
+
+def test_resolve_nxdomain():
+    result = run_with_stub(lambda port: resolve("missing.test", "A", "127.0.0.1", port=port))
+    assert result["status"] == "NXDOMAIN"
+    assert result["answers"] == []
+
+
+def test_truncated_answer_falls_back_to_tcp():
+    result = run_with_stub(lambda port: resolve("big.test", "TXT", "127.0.0.1", port=port))
+    assert len(result["answers"]) == 5
+
+
+def test_resolve_rejects_invalid_server_and_type():
+    with pytest.raises(DNSResolverError):
+        asyncio.run(resolve("example.test", "A", "not-an-ip"))
+    with pytest.raises(DNSResolverError):
+        asyncio.run(resolve("example.test", "HINFO", "127.0.0.1"))
+
+
+def test_parse_response_roundtrip_query_header():
+    query = build_query("example.test", "A", 0x1234)
+    parsed = parse_response(build_answer(query))
+    assert parsed["id"] == 0x1234
+    assert parsed["answers"][0]["data"] == "192.0.2.10"
+
+
+def test_dns_full_queries_all_types_concurrently(monkeypatch):
+    from app.services import dns_resolver
+    from app.services.dns_full_service import DNSFullService
+
+    async def scenario(port):
+        monkeypatch.setattr(dns_resolver, "DNS_PORT", port)
+        return await DNSFullService().run("example.test", "127.0.0.1")
+
+    response = run_with_stub(scenario)
+    assert response.success
+    assert list(response.output) == ["A", "AAAA", "MX", "TXT", "NS", "SOA"]
+    assert response.output["MX"][0]["data"] == "10 mail.example.test."
+
+
+def test_dns_full_reports_partial_results_on_deadline(monkeypatch):
+    from app.services import dns_full_service
+
+    async def fake_resolve(host, record_type, dns_server=None):
+        if record_type == "TXT":
+            await asyncio.sleep(5)
+        return {"status": "NOERROR", "server": "127.0.0.1",
+                "answers": [{"name": host + ".", "ttl": 60, "type": record_type, "data": "x"}]}
+
+    monkeypatch.setattr(dns_full_service, "resolve", fake_resolve)
+    monkeypatch.setattr(dns_full_service, "DNS_FULL_DEADLINE", 0.2)
+    response = asyncio.run(dns_full_service.DNSFullService().run("example.test"))
+    assert response.success
+    assert response.output["A"][0]["data"] == "x"
+    assert response.output["TXT"].startswith("Error:")
+
+
+def test_answers_are_cached_with_decreasing_ttl(monkeypatch):
+    from app.services import dns_resolver
+
+    async def scenario(port):
+        first = await resolve("example.test", "MX", "127.0.0.1", port=port)
+        calls = []
+        original = dns_resolver._query_udp
+
+        async def counting_query(*args, **kwargs):
+            calls.append(args)
+            return await original(*args, **kwargs)
+
+        monkeypatch.setattr(dns_resolver, "_query_udp", counting_query)
+        second = await resolve("EXAMPLE.test.", "MX", "127.0.0.1", port=port)
+        negative = await resolve("missing.test", "MX", "127.0.0.1", port=port)
+        negative_again = await resolve("missing.test", "MX", "127.0.0.1", port=port)
+        return first, second, negative, negative_again, calls
+
+    first, second, negative, negative_again, calls = run_with_stub(scenario)
+    assert second["answers"][0]["data"] == first["answers"][0]["data"]
+    assert second["answers"][0]["ttl"] <= first["answers"][0]["ttl"]
+    assert negative_again["status"] == "NXDOMAIN"
+    # Seule la première requête NXDOMAIN part sur le réseau
+    assert len(calls) == 1
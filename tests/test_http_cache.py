@@ -0,0 +1,51 @@
+from fastapi.testclient import TestClient
+
+from app.core import responses
+from app.main import app
+from app.services import dig_service
+
+DEV_KEY = "dev_key_123456"
+client = TestClient(app)
+
+
+def test_dig_cache_headers_and_not_modified(monkeypatch):
+    calls = []
+
+    async def fake_resolve(host, record_type, dns_server=None):
+        calls.append(host)
+        return {"status": "NOERROR", "server": "127.0.0.1",
+                "answers": [{"name": host + ".", "ttl": 300, "type": "A", "data": "192.0.2.1"},
+                            {"name": host + ".", "ttl": 120, "type": "A", "data": "192.0.2.2"}]}
+
+    monkeypatch.setattr(dig_service, "resolve", fake_resolve)
+    monkeypatch.setattr(responses, "etag_cache", responses.TTLCache(1 << 20, name="etag"))
+    params = {"host": "cache.example.com"}
+    response = client.get("/v1/dig", params=params, headers={"X-API-Key": DEV_KEY})
+    assert response.headers["cache-control"] == "public, max-age=120"
+    tag = response.headers["etag"]
+
+    revalidated = client.get("/v1/dig", params=params, headers={"X-API-Key": DEV_KEY, "If-None-Match": tag})
+    assert revalidated.status_code == 304 and revalidated.headers["etag"] == tag
+    # Réponse encore fraîche : l'outil n'est pas relancé
+    assert len(calls) == 1
+
+    other = client.get("/v1/dig", params=params, headers={"X-API-Key": DEV_KEY, "If-None-Match": 'W/"other"'})
+    assert other.status_code == 200 and len(calls) == 2
+
+
+def test_failed_lookup_is_not_cacheable(monkeypatch):
+    async def failing_resolve(host, record_type, dns_server=None):
+        raise TimeoutError("délai dépassé")
+
+    monkeypatch.setattr(dig_service, "resolve", failing_resolve)
+    response = client.get("/v1/dig", params={"host": "down.example.com"}, headers={"X-API-Key": DEV_KEY})
+    assert "etag" not in response.headers and "cache-control" not in response.headers
+
+
+def test_dns_full_max_age_is_minimum_ttl():
+    from app.services.dns_full_service import DNSFullService
+
+    answer = lambda ttl: {"name": "example.com.", "ttl": ttl, "type": "A", "data": "192.0.2.1"}
+    service = DNSFullService()
+    assert service.max_age({"A": [answer(300)], "MX": [answer(60)], "TXT": []}) == 30
+    assert service.max_age({"A": [answer(300)], "MX": "Error: délai global de 10s dépassé"}) is None
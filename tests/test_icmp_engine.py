@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from app.services import ping_service
+from app.services.icmp_engine import ICMPUnavailable, build_echo_request, checksum, get_engine
+
+
+def icmp_available() -> bool:
+    async def probe():
+        get_engine()
+    try:
+        asyncio.run(probe())
+        return True
+    except ICMPUnavailable:
+        return False
+
+
+requires_icmp = pytest.mark.skipif(not icmp_available(), reason="Aucun socket ICMP autorisé dans cet environnement")
+
+
+def test_echo_request_checksum_is_valid():
+    packet = build_echo_request(0x1234, 7)
+    assert checksum(packet) == 0
+
+
+@requires_icmp
+def test_ping_loopback_reports_per_packet_rtts():
+    async def scenario():
+        return await get_engine().ping("127.0.0.1", count=3, timeout=1, interval=0.05)
+
+    rtts = asyncio.run(scenario())
+    assert len(rtts) == 3
+    assert all(rtt is not None and rtt >= 0 for rtt in rtts)
+
+
+@requires_icmp
+def test_many_hosts_share_one_socket():
+    async def scenario():
+        engine = get_engine()
+        hosts = [f"127.0.0.{i}" for i in range(1, 21)]
+        results = await asyncio.gather(*(engine.ping(host, 2, 1, 0.01) for host in hosts))
+        return engine, results
+
+    engine, results = asyncio.run(scenario())
+    assert all(rtt is not None for rtts in results for rtt in rtts)
+    assert not engine._pending
+
+
+@requires_icmp
+def test_execute_ping_uses_native_engine(monkeypatch):
+    monkeypatch.setattr(ping_service, "PING_ENGINE", "native")
+    monkeypatch.setattr(ping_service, "PING_INTERVAL", 0.05)
+
+    response = asyncio.run(ping_service.execute_ping("127.0.0.1", count=2, timeout=1))
+    assert response.success
+    assert response.output["packets_received"] == 2
+    assert response.output["packet_loss_percent"] == 0
+    assert len(response.output["rtts"]) == 2
+    assert "2 packets transmitted, 2 received" in response.output["raw_output"]
+    assert response.output["status"] == "excellent"
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import metrics
+from app.main import app
+from app.services.command_runner import run_command
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram("test_duration_seconds", "Test", ("tool",), buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe("ping", value=value)
+    lines = histogram.render()
+    assert 'test_duration_seconds_bucket{tool="ping",le="0.1"} 2' in lines
+    assert 'test_duration_seconds_bucket{tool="ping",le="1"} 3' in lines
+    assert 'test_duration_seconds_bucket{tool="ping",le="+Inf"} 4' in lines
+    assert 'test_duration_seconds_count{tool="ping"} 4' in lines
+
+
+def test_record_failure_separates_timeouts():
+    before = metrics.tool_timeouts.value("unit"), metrics.tool_errors.value("unit")
+    metrics.record_failure("unit", asyncio.TimeoutError())
+    metrics.record_failure("unit", ValueError("boom"))
+    assert metrics.tool_timeouts.value("unit") == before[0] + 1
+    assert metrics.tool_errors.value("unit") == before[1] + 1
+
+
+def test_command_runner_records_spawn_and_run(fake_tool):
+    fake_tool("whois", "#!/bin/sh\necho ok\n")
+    spawned = metrics.tool_spawn_duration.count("whois")
+    asyncio.run(run_command("whois", ["whois", "example.com"], timeout=5))
+    assert metrics.tool_spawn_duration.count("whois") == spawned + 1
+    assert metrics.tool_run_duration.count("whois", "subprocess") >= 1
+    assert metrics.tool_inflight.value("whois") == 0
+
+
+def test_metrics_endpoint_exposes_routes_and_rejections():
+    client = TestClient(app)
+    client.get("/v1/ping", params={"host": "example.com"}, headers={"X-API-Key": "invalide"})
+    client.get("/")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'network_api_rejections_total{reason="auth"}' in body
+    assert 'network_api_http_requests_total{method="GET",endpoint="/",status="200"}' in body
+    assert "# TYPE network_api_http_request_duration_seconds histogram" in body
+    assert 'network_api_dns_cache{stat="hits"}' in body
+
+
+def test_route_label_uses_path_template():
+    client = TestClient(app)
+    client.get("/v1/nmap/jobs/" + "0" * 32, headers={"X-API-Key": "admin_key_654321"})
+    client.get("/inconnu")
+    body = client.get("/metrics").text
+    assert 'endpoint="/v1/nmap/jobs/{job_id}",status="404"' in body
+    assert 'endpoint="unmatched",status="404"' in body
+
+
+def test_metric_requires_render():
+    with pytest.raises(TypeError):
+        metrics.Metric("network_api_test", "Métrique sans rendu")
@@ -0,0 +1,100 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import monitoring
+from app.services.monitoring import MonitorScheduler, Ring, Series
+
+ADMIN_KEY = "admin_key_654321"
+DEV_KEY = "dev_key_123456"
+client = TestClient(app)
+
+
+def test_ring_keeps_only_the_latest_points():
+    ring = Ring(3, (("time", "I"), ("latency_ms", "f")))
+    size = ring.nbytes()
+    for timestamp in range(1, 6):
+        ring.append(timestamp, timestamp * 1.5)
+    assert [row["time"] for row in ring.rows()] == [3, 4, 5]
+    assert [row["time"] for row in ring.rows(since=4)] == [4, 5]
+    # Mémoire allouée à la création, constante ensuite
+    assert ring.nbytes() == size
+
+
+def test_series_downsamples_to_minutes_and_hours():
+    series = Series()
+    start = 1_700_000_040  # début de minute
+    for offset, value in [(0, 10.0), (20, 20.0), (40, None), (60, 30.0), (3600, 5.0)]:
+        series.add(start + offset, value)
+
+    raw = series.history("raw")
+    assert len(raw) == 5
+    assert raw[2] == {"time": start + 40, "success": False, "latency_ms": None}
+
+    minutes = series.history("1m")
+    assert minutes[0] == {"time": start, "count": 3, "failures": 1, "min": 10.0, "avg": 15.0, "max": 20.0}
+    assert minutes[1]["avg"] == 30.0
+    # Dernier point : la minute en cours
+    assert minutes[-1]["time"] == start + 3600 and minutes[-1]["count"] == 1
+
+    hours = series.history("1h")
+    assert hours[0]["count"] == 4 and hours[0]["failures"] == 1 and hours[0]["max"] == 30.0
+
+
+def test_scheduler_spreads_checks_over_bounded_workers(monkeypatch):
+    running, peak, runs = 0, 0, {}
+
+    async def fake_ping(check):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        runs[check.id] = runs.get(check.id, 0) + 1
+        return 1.0
+
+    monkeypatch.setitem(monitoring.RUNNERS, "ping", fake_ping)
+    monkeypatch.setattr(monitoring, "MONITOR_MIN_INTERVAL", 0)
+
+    async def scenario():
+        scheduler = MonitorScheduler(workers=4, max_checks=50)
+        checks = [scheduler.add("ping", f"host{i}.example.com", 0.1) for i in range(20)]
+        await asyncio.sleep(0.35)
+        return scheduler, checks
+
+    scheduler, checks = asyncio.run(scenario())
+    assert peak <= 4
+    assert all(runs.get(check.id, 0) >= 2 for check in checks)
+    assert checks[0].last["success"] is True
+    assert len(checks[0].series.history("raw")) == runs[checks[0].id]
+
+
+def test_scheduler_follows_application_lifespan():
+    with TestClient(app):
+        tasks = list(monitoring.scheduler._tasks)
+        assert tasks and not any(task.done() for task in tasks)
+    # Arrêt de l'application : workers et boucle de planification annulés
+    assert monitoring.scheduler._tasks == []
+    assert all(task.done() for task in tasks)
+
+
+def test_monitoring_api_lifecycle():
+    headers = {"X-API-Key": ADMIN_KEY}
+    response = client.post("/v1/monitoring/checks", json={"tool": "dig", "target": "example.com", "interval": 60},
+                           headers=headers)
+    assert response.status_code == 201
+    check_id = response.json()["output"]["id"]
+
+    history = client.get(f"/v1/monitoring/checks/{check_id}/history", params={"resolution": "1m"}, headers=headers)
+    assert history.json()["output"] == {"id": check_id, "resolution": "1m", "points": []}
+    assert client.delete(f"/v1/monitoring/checks/{check_id}", headers=headers).status_code == 200
+    assert client.get(f"/v1/monitoring/checks/{check_id}", headers=headers).status_code == 404
+
+
+def test_monitoring_api_rejects_invalid_checks_and_dev_keys():
+    invalid = client.post("/v1/monitoring/checks", json={"tool": "nmap", "target": "example.com"},
+                          headers={"X-API-Key": ADMIN_KEY})
+    assert invalid.status_code == 400
+    forbidden = client.get("/v1/monitoring/checks", headers={"X-API-Key": DEV_KEY})
+    assert forbidden.status_code == 403
@@ -0,0 +1,119 @@
+import asyncio
+import importlib.util
+
+import httpx
+import pytest
+
+from app.main import app
+from app.models.output_model import NslookupOutput
+from app.services import dig_service
+from openWebUiTools import network_client, network_tools
+from openWebUiTools.network_client import AsyncNetworkAPIClient, NetworkAPIClient, NetworkAPIError
+
+DEV_KEY = "dev_key_123456"
+
+
+def test_retries_on_503_honouring_retry_after(monkeypatch):
+    delays, statuses = [], [503, 429, 200]
+
+    def handler(request):
+        assert request.headers["X-API-Key"] == DEV_KEY
+        status = statuses.pop(0)
+        if status != 200:
+            return httpx.Response(status, headers={"Retry-After": "2"}, json={"success": False, "error": "saturé"})
+        return httpx.Response(200, json={"success": True, "error": None, "output": {
+            "dns_server": "127.0.0.1", "domain": "example.com", "ip": "192.0.2.1"}})
+
+    monkeypatch.setattr(network_tools.time, "sleep", delays.append)
+    with NetworkAPIClient("http://api", DEV_KEY, transport=httpx.MockTransport(handler)) as client:
+        result = client.nslookup("example.com")
+    assert result.success and result.output.ip == "192.0.2.1"
+    assert delays == [2.0, 2.0]
+
+
+def test_errors_are_raised_after_retries(monkeypatch):
+    monkeypatch.setattr(network_tools.time, "sleep", lambda delay: None)
+    transport = httpx.MockTransport(lambda request: httpx.Response(
+        400 if request.url.path == "/v1/dig" else 503, json={"success": False, "error": "Paramètre invalide : 'host'"}))
+    with NetworkAPIClient("http://api", DEV_KEY, max_retries=2, transport=transport) as client:
+        with pytest.raises(NetworkAPIError) as error:
+            client.dig("bad host")
+        assert error.value.status_code == 400
+        with pytest.raises(NetworkAPIError) as error:
+            client.ping("example.com")
+        assert error.value.status_code == 503
+
+
+def test_async_client_typed_results_and_batch(monkeypatch):
+    async def fake_resolve(host, record_type, dns_server=None):
+        return {"status": "NOERROR", "server": "127.0.0.1",
+                "answers": [{"name": host + ".", "ttl": 60, "type": "A", "data": "192.0.2.1"}]}
+
+    monkeypatch.setattr(dig_service, "resolve", fake_resolve)
+
+    async def scenario():
+        async with AsyncNetworkAPIClient("http://api", DEV_KEY, transport=httpx.ASGITransport(app)) as client:
+            single = await client.dig("example.com")
+            batch = [result async for result in client.dig_many(["a.example.com", "b.example.com"])]
+            return single, batch
+
+    single, batch = asyncio.run(scenario())
+    assert single.output.status == "NOERROR" and single.output.answers[0].data == "192.0.2.1"
+    assert sorted(result.host for result in batch) == ["a.example.com", "b.example.com"]
+    assert all(result.output.answers[0].ttl == 60 for result in batch)
+
+
+def test_read_timeouts_are_only_retried_for_get(monkeypatch):
+    monkeypatch.setattr(network_tools.time, "sleep", lambda delay: None)
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        raise httpx.ReadTimeout("délai dépassé", request=request)
+
+    with NetworkAPIClient("http://api", DEV_KEY, max_retries=2, transport=httpx.MockTransport(handler)) as client:
+        with pytest.raises(httpx.ReadTimeout):
+            client.submit_nmap_job("192.0.2.1")
+        assert calls == ["POST"]
+        with pytest.raises(httpx.ReadTimeout):
+            client.nslookup("example.com")
+        assert calls == ["POST", "GET", "GET", "GET"]
+
+
+def test_connect_errors_are_retried_for_post(monkeypatch):
+    monkeypatch.setattr(network_tools.time, "sleep", lambda delay: None)
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        if len(attempts) == 1:
+            raise httpx.ConnectError("connexion refusée", request=request)
+        return httpx.Response(202, json={"success": True, "error": None, "output": {"job_id": "1", "status": "queued"}})
+
+    with NetworkAPIClient("http://api", DEV_KEY, transport=httpx.MockTransport(handler)) as client:
+        assert client.submit_nmap_job("192.0.2.1").output["job_id"] == "1"
+    assert len(attempts) == 2
+
+
+def test_long_tools_get_a_sized_timeout():
+    assert network_client.nmap_timeout("192.0.2.1", "all") > 300
+    assert network_client.nmap_timeout("192.0.2.0/24", "top100") == 16 * 30 + network_client.SERVER_MARGIN
+    call = NetworkAPIClient._nmap("192.0.2.1", "all")
+    with NetworkAPIClient("http://api", DEV_KEY) as client:
+        assert client._request(call).extensions["timeout"]["read"] == call.timeout
+
+
+def test_nslookup_without_domain_name():
+    payload = {"dns_server": "192.0.2.53", "domain": None, "ip": "192.0.2.1"}
+    assert NslookupOutput.model_validate(payload).domain is None
+    assert network_client.parse_nslookup({"dns_server": "192.0.2.53", "ip": "192.0.2.1"}).domain is None
+
+
+def test_tool_file_is_self_contained():
+    # OpenWebUI charge le fichier collé seul, sans le paquet openWebUiTools
+    spec = importlib.util.spec_from_file_location("pasted_tool", network_tools.__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    assert isinstance(module.Tools("http://api", DEV_KEY).client, module.NetworkAPIClient)
+    assert "requirements: httpx" in module.__doc__
+    assert network_client.NetworkAPIClient is network_tools.NetworkAPIClient
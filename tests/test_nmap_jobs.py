@@ -0,0 +1,174 @@
+import asyncio
+import os
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import nmap_jobs
+from app.services.nmap_jobs import DiskJobStore, JobStore, MemoryJobStore, NmapJobManager
+
+DEV_KEY = "dev_key_123456"
+ADMIN_KEY = "admin_key_654321"
+
+FAKE_NMAP = """#!/bin/sh
+sleep ${FAKE_NMAP_DELAY:-0}
+for target; do :; done
+cat <<XML
+<?xml version="1.0"?>
+<nmaprun scanner="nmap">
+<host><status state="up"/><address addr="$target" addrtype="ipv4"/>
+<ports>
+<port protocol="tcp" portid="22"><state state="open"/><service name="ssh" product="OpenSSH" version="9.6"/></port>
+<port protocol="tcp" portid="80"><state state="closed"/><service name="http"/></port>
+</ports></host>
+<runstats><finished elapsed="0.1"/></runstats>
+</nmaprun>
+XML
+"""
+
+
+async def wait_for(manager, job_id, statuses, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job["status"] in statuses:
+            return job
+        await asyncio.sleep(0.02)
+    raise AssertionError(f"Statut {statuses} non atteint : {manager.get(job_id)}")
+
+
+def test_job_runs_in_background_and_stores_result(fake_tool):
+    fake_tool("nmap", FAKE_NMAP)
+
+    async def scenario():
+        manager = NmapJobManager(MemoryJobStore(), workers=1)
+        job = manager.submit("127.0.0.1", "top100", None, True)
+        assert job["status"] == "queued"
+        return await wait_for(manager, job["id"], {"done"})
+
+    job = asyncio.run(scenario())
+    assert job["result"]["success"] is True
+    assert [port["port"] for port in job["result"]["output"]["ports"]] == [22]
+
+
+def test_jobs_are_executed_by_priority(fake_tool, monkeypatch):
+    fake_tool("nmap", FAKE_NMAP)
+    monkeypatch.setenv("FAKE_NMAP_DELAY", "0.2")
+
+    async def scenario():
+        manager = NmapJobManager(MemoryJobStore(), workers=1)
+        blocker = manager.submit("127.0.0.1", "top100", None, False, priority=5)
+        low = manager.submit("127.0.0.2", "top100", None, False, priority=9)
+        high = manager.submit("127.0.0.3", "top100", None, False, priority=0)
+        await wait_for(manager, low["id"], {"done"})
+        return manager.get(high["id"]), manager.get(low["id"])
+
+    high, low = asyncio.run(scenario())
+    assert high["started_at"] < low["started_at"]
+
+
+def test_running_job_can_be_cancelled(fake_tool, monkeypatch):
+    fake_tool("nmap", FAKE_NMAP)
+    monkeypatch.setenv("FAKE_NMAP_DELAY", "30")
+
+    async def scenario():
+        manager = NmapJobManager(MemoryJobStore(), workers=1)
+        job = manager.submit("127.0.0.1", "top100", None, False)
+        await wait_for(manager, job["id"], {"running"})
+        start = time.monotonic()
+        manager.cancel(job["id"])
+        await asyncio.sleep(0.1)
+        return manager, manager.get(job["id"]), time.monotonic() - start
+
+    manager, job, elapsed = asyncio.run(scenario())
+    assert job["status"] == "cancelled"
+    assert not manager._running
+    assert elapsed < 5
+
+
+def test_cancel_from_another_worker_stops_the_scan(fake_tool, monkeypatch, tmp_path):
+    fake_tool("nmap", FAKE_NMAP)
+    monkeypatch.setenv("FAKE_NMAP_DELAY", "30")
+    monkeypatch.setattr(nmap_jobs, "NMAP_JOB_CANCEL_POLL", 0.05)
+
+    async def scenario():
+        # Deux workers uvicorn partageant le même répertoire de tâches
+        owner = NmapJobManager(DiskJobStore(str(tmp_path)), workers=1)
+        other = NmapJobManager(DiskJobStore(str(tmp_path)), workers=1)
+        job = owner.submit("127.0.0.1", "top100", None, False)
+        await wait_for(owner, job["id"], {"running"})
+        assert other.cancel(job["id"])["status"] == "cancelled"
+        deadline = time.monotonic() + 5
+        while owner._running and time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+        return owner, owner.get(job["id"])
+
+    owner, job = asyncio.run(scenario())
+    assert not owner._running
+    assert job["status"] == "cancelled" and job["result"] is None
+
+
+def test_result_does_not_overwrite_a_cancelled_job(fake_tool, monkeypatch, tmp_path):
+    fake_tool("nmap", FAKE_NMAP)
+    store = DiskJobStore(str(tmp_path))
+
+    async def scenario():
+        manager = NmapJobManager(store, workers=1)
+        real_run = nmap_jobs.NmapService.run
+
+        async def run_then_cancelled_elsewhere(service, *args):
+            result = await real_run(service, *args)
+            # Annulation enregistrée par un autre worker juste avant la fin du scan
+            NmapJobManager(store).cancel(job["id"])
+            return result
+
+        monkeypatch.setattr(nmap_jobs.NmapService, "run", run_then_cancelled_elsewhere)
+        job = manager.submit("127.0.0.1", "top100", None, False)
+        await wait_for(manager, job["id"], {"cancelled", "done"})
+        await asyncio.sleep(0.1)
+        return manager.get(job["id"])
+
+    assert asyncio.run(scenario())["status"] == "cancelled"
+
+
+def test_disk_store_round_trip_and_rejects_bad_ids(tmp_path):
+    store = DiskJobStore(str(tmp_path))
+    job = {"id": "a" * 32, "status": "done", "finished_at": 0, "result": {"success": True}}
+    store.save(job)
+    assert DiskJobStore(str(tmp_path)).get("a" * 32) == job
+
+    manager = NmapJobManager(store)
+    assert manager.get("../../etc/passwd") is None
+
+
+@pytest.mark.skipif(nmap_jobs.fcntl is None, reason="fcntl indisponible")
+def test_disk_store_fails_jobs_left_by_a_stopped_worker(tmp_path):
+    stopped, alive = DiskJobStore(str(tmp_path)), DiskJobStore(str(tmp_path))
+    for job_id, store, status in (("a", stopped, "queued"), ("b", stopped, "running"),
+                                  ("c", stopped, "done"), ("d", alive, "running")):
+        store.save({"id": job_id * 32, "status": status, "finished_at": None, "result": None})
+    os.close(stopped._lock_fd)  # arrêt du worker : son verrou est libéré
+
+    store = DiskJobStore(str(tmp_path))
+    for job_id in "ab":
+        job = store.get(job_id * 32)
+        assert job["status"] == "failed" and job["finished_at"]
+        assert job["result"]["error"] == nmap_jobs.INTERRUPTED_ERROR
+    assert store.get("c" * 32)["status"] == "done"
+    assert store.get("d" * 32)["status"] == "running"
+    assert not os.path.exists(os.path.join(str(tmp_path), f"{stopped.worker}.lock"))
+
+
+def test_job_endpoints_are_admin_only():
+    client = TestClient(app)
+    response = client.post("/v1/nmap/jobs", params={"host": "127.0.0.1"}, headers={"X-API-Key": DEV_KEY})
+    assert response.status_code == 403
+    response = client.get("/v1/nmap/jobs/" + "0" * 32, headers={"X-API-Key": ADMIN_KEY})
+    assert response.status_code == 404
+
+
+def test_job_store_is_abstract():
+    with pytest.raises(TypeError):
+        JobStore()
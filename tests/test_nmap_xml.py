@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from app.services.nmap_service import NmapService, NmapXMLParser
+
+NMAP_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<nmaprun scanner="nmap" args="nmap -sV -Pn -oX - 192.0.2.0/30">
+<scaninfo type="syn" protocol="tcp" numservices="100"/>
+<host starttime="1"><status state="up" reason="user-set"/>
+<address addr="192.0.2.1" addrtype="ipv4"/><address addr="00:11:22:33:44:55" addrtype="mac"/>
+<hostnames><hostname name="gw.example.test" type="PTR"/></hostnames>
+<ports><extraports state="filtered" count="98"/>
+<port protocol="tcp" portid="22"><state state="open" reason="syn-ack"/><service name="ssh" product="OpenSSH" version="9.6p1" extrainfo="Ubuntu"/></port>
+<port protocol="tcp" portid="443"><state state="closed" reason="reset"/><service name="https" method="table"/></port>
+</ports></host>
+<host starttime="2"><status state="up" reason="user-set"/>
+<address addr="192.0.2.2" addrtype="ipv4"/>
+<hostnames/>
+<ports><port protocol="udp" portid="53"><state state="open"/><service name="domain"/></port></ports>
+</host>
+<runstats><finished time="3" elapsed="2.5"/><hosts up="2" down="0" total="2"/></runstats>
+</nmaprun>
+"""
+
+
+def test_parser_emits_hosts_incrementally():
+    parser = NmapXMLParser()
+    lines = NMAP_XML.splitlines(keepends=True)
+    emitted = []
+    for index, line in enumerate(lines):
+        for host in parser.feed(line):
+            emitted.append((index, host["address"]))
+    # Chaque hôte est produit dès la fermeture de son élément <host>
+    assert [address for _, address in emitted] == ["192.0.2.1", "192.0.2.2"]
+    assert emitted[0][0] < emitted[1][0] < len(lines) - 1
+
+
+def test_parser_extracts_service_versions_and_filters_open_ports():
+    hosts = NmapXMLParser(only_open=True).feed(NMAP_XML)
+    assert hosts[0]["hostnames"] == ["gw.example.test"]
+    assert hosts[0]["ports"] == [{
+        "port": 22, "protocol": "tcp", "state": "open", "service": "ssh",
+        "product": "OpenSSH", "version": "9.6p1", "extrainfo": "Ubuntu"
+    }]
+    assert hosts[1]["ports"][0]["protocol"] == "udp"
+
+
+def test_parser_releases_processed_hosts():
+    parser = NmapXMLParser()
+    parser.feed(NMAP_XML)
+    assert parser._root.findall("host") == []
+
+
+def test_run_scans_cidr_in_a_single_invocation(fake_tool, tmp_path):
+    (tmp_path / "scan.xml").write_text(NMAP_XML)
+    fake_tool("nmap", f"#!/bin/sh\necho \"$@\" >> {tmp_path}/calls\ncat {tmp_path}/scan.xml\n")
+
+    response = asyncio.run(NmapService().run("192.0.2.0/30,gw.example.test", "custom", "22,443,53"))
+    assert response.success
+    assert [host["address"] for host in response.output["hosts"]] == ["192.0.2.1", "192.0.2.2"]
+    assert {port["address"] for port in response.output["ports"]} == {"192.0.2.1", "192.0.2.2"}
+    calls = (tmp_path / "calls").read_text().splitlines()
+    assert calls == ["-sV -Pn -oX - -p 22,443,53 192.0.2.0/30 gw.example.test"]
+
+
+@pytest.mark.parametrize("target", ["10.0.0.0/8", "192.0.2.1,$(whoami)"])
+def test_oversized_or_invalid_targets_are_rejected(target):
+    with pytest.raises(ValueError):
+        NmapService().build_command(target)
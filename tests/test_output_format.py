@@ -0,0 +1,69 @@
+import gzip
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import responses
+from app.main import app
+from app.services import dig_service
+
+DEV_KEY = "dev_key_123456"
+client = TestClient(app)
+
+
+@pytest.fixture
+def fake_dig(monkeypatch):
+    async def fake_resolve(host, record_type, dns_server=None):
+        answers = [{"name": host + ".", "ttl": 60, "type": "A", "data": f"192.0.2.{index}"} for index in range(1, 60)]
+        return {"status": "NOERROR", "server": "127.0.0.1", "answers": answers}
+
+    monkeypatch.setattr(dig_service, "resolve", fake_resolve)
+
+
+def test_fields_projection(fake_dig):
+    response = client.get("/v1/dig", params={"host": "example.com", "fields": "status,server"},
+                          headers={"X-API-Key": DEV_KEY})
+    assert response.status_code == 200
+    assert response.json()["output"] == {"status": "NOERROR", "server": "127.0.0.1"}
+
+
+def test_large_response_is_gzip_compressed(fake_dig, monkeypatch):
+    monkeypatch.setattr(responses, "brotli", None)
+    response = client.get("/v1/dig", params={"host": "example.com"},
+                          headers={"X-API-Key": DEV_KEY, "Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    # httpx décompresse de lui-même : le corps reçu est bien du JSON
+    assert len(response.json()["output"]["answers"]) == 59
+
+    small = client.get("/v1/dig", params={"host": "example.com", "fields": "status"},
+                       headers={"X-API-Key": DEV_KEY, "Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+
+def test_compress_honours_accept_encoding():
+    body = json.dumps({"data": "x" * 4096}).encode()
+    assert responses.compress(body, "identity") is None
+    assert responses.compress(body, "gzip;q=0") is None
+    encoding, compressed = responses.compress(body, "deflate, gzip")
+    assert encoding == "gzip" and gzip.decompress(compressed) == body
+
+
+def test_msgpack_unavailable_is_406(fake_dig, monkeypatch):
+    monkeypatch.setattr(responses, "msgpack", None)
+    response = client.get("/v1/dig", params={"host": "example.com"},
+                          headers={"X-API-Key": DEV_KEY, "Accept": "application/msgpack"})
+    assert response.status_code == 406
+    # JSON reste accepté en second choix
+    fallback = client.get("/v1/dig", params={"host": "example.com"},
+                          headers={"X-API-Key": DEV_KEY, "Accept": "application/msgpack, application/json;q=0.5"})
+    assert fallback.status_code == 200 and fallback.headers["content-type"] == "application/json"
+
+
+def test_msgpack_response(fake_dig):
+    msgpack = pytest.importorskip("msgpack")
+    response = client.get("/v1/dig", params={"host": "example.com", "fields": "status"},
+                          headers={"X-API-Key": DEV_KEY, "Accept": "application/msgpack"})
+    assert response.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(response.content) == {"success": True, "output": {"status": "NOERROR"}, "error": None}
+
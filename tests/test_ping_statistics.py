@@ -0,0 +1,66 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.response_model import CommandResponse
+from app.api.v1.endpoints import ping as ping_endpoint
+from app.services import ping_statistics
+from app.services.ping_service import add_statistics, parse_ping_output
+from app.services.ping_statistics import rtt_statistics
+
+DEV_KEY = "dev_key_123456"
+client = TestClient(app)
+
+LINUX_OUTPUT = """PING 192.0.2.1 (192.0.2.1) 56(84) bytes of data.
+64 bytes from 192.0.2.1: icmp_seq=1 ttl=57 time=10.0 ms
+64 bytes from 192.0.2.1: icmp_seq=3 ttl=57 time=14.0 ms
+64 bytes from 192.0.2.1: icmp_seq=4 ttl=57 time=12.0 ms
+
+--- 192.0.2.1 ping statistics ---
+4 packets transmitted, 3 received, 25% packet loss, time 3004ms
+rtt min/avg/max/mdev = 10.000/12.000/14.000/1.633 ms
+"""
+
+
+def test_parse_keeps_per_packet_rtts_and_lost_packets():
+    result = parse_ping_output(LINUX_OUTPUT, "linux")
+    assert result["rtts"] == [10.0, None, 14.0, 12.0]
+    assert result["rtt_avg"] == 12.0
+
+
+def test_statistics_without_numpy(monkeypatch):
+    monkeypatch.setattr(ping_statistics, "np", None)
+    stats, silent = rtt_statistics([[10.0, None, 14.0, 12.0], [None, None]])
+    assert stats == {"rtt_stddev": 1.633, "jitter": 2.0, "rtt_p50": 12.0, "rtt_p95": 13.8, "rtt_p99": 13.96}
+    assert silent == {"rtt_stddev": 0, "jitter": 0, "rtt_p50": 0, "rtt_p95": 0, "rtt_p99": 0}
+
+
+@pytest.mark.skipif(ping_statistics.np is None, reason="NumPy non installé")
+def test_numpy_and_python_statistics_agree(monkeypatch):
+    series = [[10.0, None, 14.0, 12.0], [1.0], [None, None], [3.5, 2.25, 8.0, 1.0, 4.0]]
+    vectorized = rtt_statistics(series)
+    monkeypatch.setattr(ping_statistics, "np", None)
+    assert rtt_statistics(series) == vectorized
+
+
+def test_add_statistics_can_drop_raw_output_without_touching_shared_result():
+    shared = CommandResponse(success=True, output=parse_ping_output(LINUX_OUTPUT, "linux"), error=None)
+    failed = CommandResponse(success=False, output=None, error="Hôte injoignable")
+    response, unchanged = add_statistics([shared, failed], raw_output=False)
+    assert "raw_output" not in response.output and "raw_output" in shared.output
+    assert response.output["rtt_p50"] == 12.0
+    assert unchanged is failed
+
+
+def test_ping_batch_adds_statistics(monkeypatch):
+    async def fake_measure(host, count, timeout):
+        return CommandResponse(success=True, output=parse_ping_output(LINUX_OUTPUT, "linux"), error=None)
+
+    monkeypatch.setattr(ping_endpoint, "measure_ping", fake_measure)
+    response = client.post("/v1/ping/batch", json={"hosts": ["a.example.com", "b.example.com"], "raw_output": False},
+                           headers={"X-API-Key": DEV_KEY})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 2
+    assert all(line["output"]["jitter"] == 2.0 and "raw_output" not in line["output"] for line in lines)
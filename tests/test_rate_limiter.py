@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+
+from app.core.rate_limiter import MemoryBackend, RateLimiter, RedisBackend, SharedMemoryBackend, fcntl, hash_key
+
+
+def run_hits(limiter, key, limit, times):
+    async def scenario():
+        return [await limiter.hit(key, limit, now=now) for now in times]
+    return asyncio.run(scenario())
+
+
+def test_memory_backend_enforces_limit_within_window():
+    limiter = RateLimiter(MemoryBackend(), window=60)
+    results = run_hits(limiter, "dev", 3, [0, 1, 2, 3])
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert results[-1][1] > 0
+
+
+def test_sliding_window_releases_quota_progressively():
+    limiter = RateLimiter(MemoryBackend(), window=60)
+    # 10 requêtes en fin de fenêtre, puis la fenêtre suivante
+    results = run_hits(limiter, "dev", 10, [50 + i * 0.1 for i in range(10)] + [60, 90, 115])
+    assert all(allowed for allowed, _ in results[:10])
+    assert results[10][0] is False   # début de fenêtre : 10 * (1 - 0) + 0 ≥ 10
+    assert results[11][0] is True    # 10 * 0.5 < 10
+    assert results[12][0] is True
+
+
+def test_cost_counts_several_requests():
+    limiter = RateLimiter(MemoryBackend(), window=60)
+
+    async def scenario():
+        return [await limiter.hit("dev", 10, now=0, cost=cost) for cost in (8, 3, 2, 1)]
+
+    # 8 + 3 > 10 : refusé sans consommer de quota, puis 8 + 2 = 10 autorisé
+    assert [allowed for allowed, _ in asyncio.run(scenario())] == [True, False, True, False]
+
+
+def test_keys_are_independent():
+    limiter = RateLimiter(MemoryBackend(), window=60)
+    run_hits(limiter, "a", 1, [0])
+    assert run_hits(limiter, "b", 1, [0])[0][0] is True
+
+
+@pytest.mark.skipif(fcntl is None, reason="fcntl indisponible")
+def test_shared_memory_backend_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "ratelimit")
+    worker_a = RateLimiter(SharedMemoryBackend(path, slots=64), window=60)
+    worker_b = RateLimiter(SharedMemoryBackend(path, slots=64), window=60)
+    assert run_hits(worker_a, "dev", 2, [0])[0][0] is True
+    assert run_hits(worker_b, "dev", 2, [1])[0][0] is True
+    # Deux workers, une seule limite
+    assert run_hits(worker_a, "dev", 2, [2])[0][0] is False
+
+
+class FakeRedis:
+    """Serveur RESP minimal (INCRBY, DECRBY, EXPIRE, GET, SELECT, AUTH)."""
+
+    def __init__(self, slow_keys=(), delay=0.0):
+        self.data = {}
+        self.connections = 0
+        self.slow_keys, self.delay = slow_keys, delay
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            args = []
+            for _ in range(int(line[1:])):
+                length = int((await reader.readline())[1:])
+                args.append((await reader.readexactly(length + 2))[:-2].decode())
+            command = args[0].upper()
+            if command == "INCRBY" and any(slow in args[1] for slow in self.slow_keys):
+                await asyncio.sleep(self.delay)
+            if command in ("INCRBY", "DECRBY"):
+                delta = int(args[2]) if command == "INCRBY" else -int(args[2])
+                self.data[args[1]] = int(self.data.get(args[1], 0)) + delta
+                writer.write(b":%d\r\n" % self.data[args[1]])
+            elif command == "GET":
+                value = self.data.get(args[1])
+                writer.write(b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(str(value)), str(value).encode()))
+            elif command == "EXPIRE":
+                writer.write(b":1\r\n")
+            else:
+                writer.write(b"+OK\r\n")
+            await writer.drain()
+        writer.close()
+
+
+def test_redis_backend_against_local_resp_server():
+    fake = FakeRedis()
+
+    async def scenario():
+        server = await asyncio.start_server(fake.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        limiter = RateLimiter(RedisBackend(f"redis://:secret@127.0.0.1:{port}/2"), window=60)
+        try:
+            return [await limiter.hit("dev", 2, now=now) for now in (0, 1, 2, 3)]
+        finally:
+            server.close()
+
+    results = asyncio.run(scenario())
+    assert [allowed for allowed, _ in results] == [True, True, False, False]
+    # Les requêtes refusées ne consomment pas de quota, la clé API n'apparaît pas en clair
+    assert list(fake.data.values()) == [2]
+    assert all("dev" not in key for key in fake.data)
+
+
+def test_redis_backend_concurrent_hits_do_not_wait_for_a_slow_reply():
+    backend = RedisBackend("redis://127.0.0.1:0/0", pool_size=4)
+    fake = FakeRedis(slow_keys=[hash_key("slow")], delay=0.3)
+    finished = []
+
+    async def hit(key):
+        await limiter.hit(key, 10, now=0)
+        finished.append(key)
+
+    async def scenario():
+        server = await asyncio.start_server(fake.handle, "127.0.0.1", 0)
+        backend.port = server.sockets[0].getsockname()[1]
+        try:
+            await asyncio.gather(hit("slow"), *(hit(f"fast{i}") for i in range(3)))
+            # Connexions rendues au pool puis réutilisées
+            await asyncio.gather(*(hit(f"fast{i}") for i in range(3)))
+        finally:
+            server.close()
+
+    limiter = RateLimiter(backend, window=60)
+    asyncio.run(scenario())
+    assert finished[3] == "slow"
+    assert fake.connections == 4
+
+
+def test_redis_backend_fails_open_when_unreachable():
+    limiter = RateLimiter(RedisBackend("redis://127.0.0.1:1/0"), window=60, fail_open=True)
+    assert run_hits(limiter, "dev", 1, [0])[0][0] is True
+    limiter = RateLimiter(RedisBackend("redis://127.0.0.1:1/0"), window=60, fail_open=False)
+    assert run_hits(limiter, "dev", 1, [0])[0][0] is False
@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.result_store import ResultStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultStore(str(tmp_path / "results.sqlite3"), enabled=True)
+    yield store
+    store.close()
+
+
+def test_roundtrip_with_age(store):
+    async def scenario():
+        await store.set("dns", {"name": "example.test", "type": "A"}, {"answers": [1, 2]}, 60)
+        # Même paramètres dans un autre ordre → même clé
+        return await store.get("dns", {"type": "A", "name": "example.test"})
+
+    value, age = asyncio.run(scenario())
+    assert value == {"answers": [1, 2]}
+    assert 0 <= age < 5
+
+
+def test_expired_and_too_old_results_are_ignored(store, monkeypatch):
+    store.set_sync("whois", {"target": "example.test"}, "raw", 60)
+    assert store.get_sync("whois", {"target": "example.test"}, max_age=3600) is not None
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 30)
+    assert store.get_sync("whois", {"target": "example.test"}, max_age=10) is None
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert store.get_sync("whois", {"target": "example.test"}) is None
+
+
+def test_results_are_shared_between_workers(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    first, second = ResultStore(path, enabled=True), ResultStore(path, enabled=True)
+    try:
+        first.set_sync("nmap", {"host": "192.0.2.1"}, {"ports": []}, 60)
+        assert second.get_sync("nmap", {"host": "192.0.2.1"})[0] == {"ports": []}
+    finally:
+        first.close()
+        second.close()
+
+
+def test_disabled_store_is_a_no_op(tmp_path):
+    store = ResultStore(str(tmp_path / "results.sqlite3"), enabled=False)
+
+    async def scenario():
+        store.save("dns", {"name": "example.test"}, {}, 60)
+        return await store.get("dns", {"name": "example.test"})
+
+    assert asyncio.run(scenario()) is None
+    assert not (tmp_path / "results.sqlite3").exists()
+
+
+def test_dns_answers_survive_an_empty_memory_cache(store, monkeypatch):
+    from app.services import dns_resolver
+
+    answer = {"status": "NOERROR", "server": "127.0.0.1",
+              "answers": [{"name": "example.test.", "ttl": 300, "type": "A", "data": "192.0.2.10"}]}
+    store.set_sync("dns", dns_resolver._store_params(("example.test", "A", "127.0.0.1", 53)), answer, 300)
+    monkeypatch.setattr(dns_resolver, "result_store", store)
+    dns_resolver.dns_cache.clear()
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("requête réseau inattendue")
+
+    monkeypatch.setattr(dns_resolver, "_query_udp", fail)
+    result = asyncio.run(dns_resolver.resolve("example.test", "A", "127.0.0.1", port=53))
+    assert result["answers"][0]["data"] == "192.0.2.10"
+    assert result["answers"][0]["ttl"] <= 300
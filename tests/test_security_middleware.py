@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import security_middleware
+from app.core.rate_limiter import MemoryBackend, RateLimiter
+from app.core.security_middleware import SecurityMiddleware
+
+DEV_KEY = "dev_key_123456"
+ADMIN_KEY = "admin_key_654321"
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b'{"success":true}'})
+
+
+client = TestClient(SecurityMiddleware(ok_app))
+
+
+@pytest.fixture(autouse=True)
+def fresh_rate_limiter(monkeypatch):
+    monkeypatch.setattr(security_middleware, "rate_limiter", RateLimiter(MemoryBackend()))
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-API-Key": "wrong_key"}, {"X-API-Key": ""}])
+def test_missing_or_invalid_key_is_refused(headers):
+    response = client.get("/v1/ping", params={"host": "example.com"}, headers=headers)
+    assert response.status_code == 403
+    assert response.json() == {"success": False, "error": "Clé API invalide ou manquante"}
+
+
+@pytest.mark.parametrize("path", ["/v1/nmap", "/v1/nmap/jobs", "/v1/monitoring/checks"])
+def test_admin_routes_refuse_developer_key(path):
+    assert client.get(path, headers={"X-API-Key": DEV_KEY}).status_code == 403
+    assert client.get(path, headers={"X-API-Key": ADMIN_KEY}).status_code == 200
+
+
+def test_rate_limit_returns_429_with_retry_after(monkeypatch):
+    monkeypatch.setitem(security_middleware.API_KEYS[DEV_KEY], "rate_limit", 2)
+    statuses = [client.get("/v1/ping", headers={"X-API-Key": DEV_KEY}).status_code for _ in range(2)]
+    response = client.get("/v1/ping", headers={"X-API-Key": DEV_KEY})
+    assert statuses == [200, 200]
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    # Quota propre à chaque clé
+    assert client.get("/v1/ping", headers={"X-API-Key": ADMIN_KEY}).status_code == 200
+
+
+@pytest.mark.parametrize("path,params", [
+    ("/v1/ping", {"host": "example.com;id"}),
+    ("/v1/ping", {"host": "-oX"}),
+    ("/v1/nmap", {"host": "127.0.0.1", "scan_mode": "custom", "ports": "22,abc"}),
+    ("/v1/nmap", {"host": "127.0.0.1", "scan_mode": "custom", "ports": "70000"}),
+    ("/v1/dig", {"host": "example.com", "record_type": "AXFR"}),
+])
+def test_invalid_parameters_are_rejected(path, params):
+    response = client.get(path, params=params, headers={"X-API-Key": ADMIN_KEY})
+    assert response.status_code == 400
+    assert response.json()["success"] is False
+
+
+def test_valid_parameters_reach_the_application():
+    params = {"host": "example.com", "record_type": "mx"}
+    assert client.get("/v1/dig", params=params, headers={"X-API-Key": DEV_KEY}).status_code == 200
+
+
+def test_streamed_response_passes_through_unchanged():
+    messages = [
+        {"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/x-ndjson")]},
+        {"type": "http.response.body", "body": b'{"hop":1}\n', "more_body": True},
+        {"type": "http.response.body", "body": b'{"hop":2}\n', "more_body": True},
+        {"type": "http.response.body", "body": b"", "more_body": False},
+    ]
+
+    async def streaming_app(scope, receive, send):
+        for message in messages:
+            await send(dict(message))
+
+    scope = {
+        "type": "http", "method": "GET", "path": "/v1/traceroute", "query_string": b"host=8.8.8.8&stream=ndjson",
+        "headers": [(b"x-api-key", DEV_KEY.encode())], "client": ("127.0.0.1", 1234),
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(SecurityMiddleware(streaming_app)(scope, receive, send))
+    assert sent == messages
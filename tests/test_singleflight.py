@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from app.services.singleflight import SingleFlight
+
+
+def test_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"success": True}
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do(("ping", "8.8.8.8"), work) for _ in range(20)))
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {"inflight": 0, "executions": 1, "coalesced": 19}
+
+
+def test_different_keys_and_sequential_calls_run_separately():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return len(calls)
+
+    async def scenario():
+        await asyncio.gather(flight.do("a", work), flight.do("b", work))
+        await flight.do("a", work)
+
+    asyncio.run(scenario())
+    assert len(calls) == 3
+
+
+def test_errors_are_propagated_to_every_caller():
+    flight = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("k", failing) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_cancelled_caller_does_not_cancel_shared_execution():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        first = asyncio.ensure_future(flight.do("k", work))
+        second = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import traceroute_service
+
+DEV_KEY = "dev_key_123456"
+ADMIN_KEY = "admin_key_654321"
+client = TestClient(app)
+
+FAKE_TRACEROUTE = """#!/bin/sh
+echo "traceroute to $1 ($1), 30 hops max, 60 byte packets"
+echo " 1  192.168.1.1  0.512 ms  0.430 ms  0.401 ms"
+echo " 2  * * *"
+echo " 3  $1  10.100 ms  10.200 ms  10.300 ms"
+"""
+
+
+@pytest.fixture(autouse=True)
+def subprocess_traceroute(monkeypatch):
+    # Les flux testés ici sont ceux de la commande traceroute (faux exécutable)
+    monkeypatch.setattr(traceroute_service, "TRACEROUTE_ENGINE", "subprocess")
+
+
+def test_traceroute_ndjson_stream(fake_tool):
+    fake_tool("traceroute", FAKE_TRACEROUTE)
+    response = client.get("/v1/traceroute", params={"host": "8.8.8.8", "stream": "ndjson"},
+                          headers={"X-API-Key": DEV_KEY})
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [event["event"] for event in events] == ["hop", "hop", "hop", "done"]
+    assert events[0]["data"] == {"hop": 1, "ip": "192.168.1.1", "latency_ms": [0.512, 0.43, 0.401]}
+    assert events[-1]["data"]["success"] is True
+
+
+def test_traceroute_sse_stream(fake_tool):
+    fake_tool("traceroute", FAKE_TRACEROUTE)
+    response = client.get("/v1/traceroute", params={"host": "8.8.8.8", "stream": "sse"},
+                          headers={"X-API-Key": DEV_KEY})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.startswith("event: hop\ndata: ")
+    assert "event: done\n" in response.text
+
+
+def test_unknown_stream_mode_is_rejected():
+    response = client.get("/v1/traceroute", params={"host": "8.8.8.8", "stream": "xml"},
+                          headers={"X-API-Key": DEV_KEY})
+    assert response.status_code == 400
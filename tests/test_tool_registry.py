@@ -0,0 +1,85 @@
+import os
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import tool_registry
+from app.services.tool_registry import ENDPOINTS, ToolRegistry
+
+ENDPOINT_NAMES = [name for name, _, _ in ENDPOINTS]
+
+
+def test_probe_resolves_paths_versions_and_nmap_xml(fake_tool, monkeypatch):
+    fake_tool("nmap", "#!/bin/sh\nif [ \"$1\" = --version ]; then echo 'Nmap version 7.94'; exit 0; fi\n"
+                      "echo '<?xml version=\"1.0\"?><nmaprun></nmaprun>'\n")
+    monkeypatch.setattr(tool_registry.shutil, "which",
+                        lambda binary: os.path.join(os.environ["PATH"].split(os.pathsep)[0], binary)
+                        if binary == "nmap" else None)
+    registry = ToolRegistry().probe()
+
+    assert registry.path("nmap").endswith("/nmap")
+    assert registry.versions["nmap"] == "Nmap version 7.94"
+    assert registry.capabilities["nmap_xml"] is True
+    # Exécutable absent : nom nu, recherché dans le PATH
+    assert registry.path("whois") == "whois"
+    assert not registry.has("whois")
+
+
+def test_endpoint_requirements(monkeypatch):
+    registry = ToolRegistry()
+    # Avant détection, tout est considéré disponible
+    assert all(registry.endpoints().values())
+
+    registry.probed = True
+    registry.capabilities = {"icmp": None, "traceroute_native": True, "nmap_xml": False}
+    endpoints = registry.endpoints()
+    assert endpoints["ping"] is False
+    assert endpoints["traceroute"] is True
+    assert endpoints["nmap"] is False
+    assert endpoints["dig"] and endpoints["whois"]
+    assert endpoints["monitoring"] is True
+    # Monitoring en mémoire d'un processus : refusé avec plusieurs workers
+    monkeypatch.setattr(tool_registry, "WEB_CONCURRENCY", 4)
+    assert registry.endpoints()["monitoring"] is False
+
+    monkeypatch.setattr(tool_registry, "TOOLS_REQUIRED", ["nmap"])
+    report = registry.report()
+    assert report["ready"] is False
+    assert report["missing"] == ["nmap"]
+
+
+def test_ready_endpoint_without_api_key(monkeypatch):
+    monkeypatch.setattr(tool_registry, "TOOLS_REQUIRED", [])
+    client = TestClient(app)
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["ready"] is True
+
+    monkeypatch.setattr(tool_registry, "TOOLS_REQUIRED", ["unknown"])
+    assert client.get("/ready").status_code == 503
+
+
+def test_endpoint_modules_are_imported_on_first_request():
+    script = (
+        "import sys\n"
+        "from fastapi.testclient import TestClient\n"
+        "from app.main import app\n"
+        "loaded = lambda: sorted(m.rsplit('.', 1)[1] for m in sys.modules if m.startswith('app.api.v1.endpoints.'))\n"
+        "print(loaded())\n"
+        "client = TestClient(app)\n"
+        "# Requête refusée par le middleware de sécurité : rien n'est importé\n"
+        "client.get('/v1/whois', params={'domain': 'example.com'})\n"
+        "print(loaded())\n"
+        "client.get('/v1/whois/unknown', headers={'X-API-Key': 'dev_key_123456'})\n"
+        "print(loaded())\n"
+        "assert client.get('/openapi.json').json()['paths']\n"
+        "print(loaded())\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, env=os.environ, timeout=60)
+    assert result.returncode == 0, result.stderr
+    before, refused, first, everything = result.stdout.splitlines()
+    assert before == refused == "[]"
+    assert first == "['whois']"
+    assert everything == str(sorted(ENDPOINT_NAMES))
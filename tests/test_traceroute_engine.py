@@ -0,0 +1,75 @@
+import asyncio
+import errno
+
+import pytest
+
+from app.services import traceroute_service
+from app.services.traceroute_engine import Hop, Trace, TracerouteUnavailable, trace
+from app.services.traceroute_service import TracerouteService
+
+
+def native_available() -> bool:
+    async def probe():
+        return [hop async for hop in trace("127.0.0.1", max_hops=1, probes=1, timeout=0.5)]
+    try:
+        return bool(asyncio.run(probe()))
+    except (TracerouteUnavailable, OSError):
+        return False
+
+
+requires_native = pytest.mark.skipif(not native_available(), reason="Traceroute natif indisponible dans cet environnement")
+
+
+@requires_native
+def test_loopback_is_reached_at_first_hop():
+    async def scenario():
+        return [hop async for hop in trace("127.0.0.1", timeout=1)]
+
+    hops = asyncio.run(scenario())
+    # Tous les TTL sont sondés, mais seuls les sauts jusqu'à la destination sont retournés
+    assert len(hops) == 1
+    assert hops[0]["hop"] == 1
+    assert hops[0]["ip"] == "127.0.0.1"
+    assert all(isinstance(latency, float) for latency in hops[0]["latency_ms"])
+
+
+@requires_native
+def test_service_uses_native_engine(monkeypatch):
+    monkeypatch.setattr(traceroute_service, "TRACEROUTE_ENGINE", "native")
+    response = asyncio.run(TracerouteService().execute("127.0.0.1"))
+    assert response.success
+    assert response.output[0]["ip"] == "127.0.0.1"
+    assert len(response.output[0]["latency_ms"]) == 3
+
+
+def test_falls_back_to_command_when_native_is_unavailable(monkeypatch, fake_tool):
+    async def unavailable(*args, **kwargs):
+        raise TracerouteUnavailable("test")
+        yield
+
+    fake_tool("traceroute", '#!/bin/sh\necho " 1  $1  0.100 ms  0.200 ms  0.300 ms"\n')
+    monkeypatch.setattr(traceroute_service, "trace", unavailable)
+    monkeypatch.setattr(traceroute_service, "TRACEROUTE_ENGINE", "auto")
+    response = asyncio.run(TracerouteService().execute("127.0.0.1"))
+    assert response.success
+    assert response.output == [{"hop": 1, "ip": "127.0.0.1", "latency_ms": [0.1, 0.2, 0.3]}]
+
+
+def test_unexpected_socket_errors_do_not_spin():
+    class BrokenSocket:
+        calls = 0
+
+        def recvmsg(self, *args):
+            self.calls += 1
+            raise OSError(errno.EBADF, "Bad file descriptor")
+
+        def recvfrom(self, *args):
+            self.calls += 1
+            raise OSError(errno.EBADF, "Bad file descriptor")
+
+    hop = Hop.__new__(Hop)
+    hop.ttl, hop.rtts, hop.sock = 1, [None], BrokenSocket()
+    tracer = Trace.__new__(Trace)
+    tracer.address, tracer.changed = "192.0.2.1", asyncio.Event()
+    tracer._on_readable(hop)
+    assert hop.sock.calls == 2
@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+
+from app.services import whois_client
+from app.services.whois_client import WhoisError, find_referral, lookup, parse_whois, referral_address
+
+REGISTRY_RESPONSE = """   Domain Name: EXAMPLE.TEST
+   Registrar WHOIS Server: {registrar}
+   Registrar: Example Registrar, Inc.
+   Updated Date: 2024-08-14T07:01:34Z
+   Creation Date: 1995-08-14T04:00:00Z
+   Registry Expiry Date: 2025-08-13T04:00:00Z
+   Domain Status: clientTransferProhibited https://icann.org/epp#clientTransferProhibited
+   Name Server: A.IANA-SERVERS.NET
+   Name Server: B.IANA-SERVERS.NET
+>>> Last update of whois database: 2024-09-01T00:00:00Z <<<
+"""
+REGISTRAR_RESPONSE = """Domain Name: example.test
+Registrar: Example Registrar, Inc.
+Registrant Organization: Example Org
+Name Server: a.iana-servers.net
+"""
+
+
+class FakeWhois:
+    """
+    Trois faux serveurs WHOIS locaux : racine (IANA), registre du TLD et registrar.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    async def start(self):
+        self.root = await asyncio.start_server(self.handle_root, "127.0.0.1", 0)
+        self.registry = await asyncio.start_server(self.handle_registry, "127.0.0.1", 0)
+        self.registrar = await asyncio.start_server(self.handle_registrar, "127.0.0.1", 0)
+        self.addresses = {server: "127.0.0.1:%d" % server.sockets[0].getsockname()[1]
+                          for server in (self.root, self.registry, self.registrar)}
+        return self
+
+    def address(self, server) -> str:
+        return self.addresses[server]
+
+    async def respond(self, name, reader, writer, text):
+        self.queries.append((name, (await reader.readline()).decode().strip()))
+        writer.write(text.encode())
+        await writer.drain()
+        writer.close()
+
+    async def handle_root(self, reader, writer):
+        await self.respond("root", reader, writer, f"% IANA WHOIS server\n\nrefer:        {self.address(self.registry)}\n\ndomain:       TEST\nwhois:        {self.address(self.registry)}\n")
+
+    async def handle_registry(self, reader, writer):
+        await self.respond("registry", reader, writer, REGISTRY_RESPONSE.format(registrar=self.address(self.registrar)))
+
+    async def handle_registrar(self, reader, writer):
+        await self.respond("registrar", reader, writer, REGISTRAR_RESPONSE)
+
+    def close(self):
+        for server in (self.root, self.registry, self.registrar):
+            server.close()
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    whois_client.whois_cache.clear()
+    whois_client.server_cache.clear()
+
+
+def run_with_fake(monkeypatch, scenario, allowed=("registry", "registrar")):
+    async def main():
+        fake = await FakeWhois().start()
+        monkeypatch.setattr(whois_client, "WHOIS_ROOT_SERVER", fake.address(fake.root))
+        # Faux serveurs locaux : autorisés explicitement (références vers 127.0.0.1 refusées sinon)
+        monkeypatch.setattr(whois_client, "WHOIS_REFERRAL_ALLOWLIST",
+                            {fake.address(getattr(fake, name)) for name in allowed})
+        try:
+            return await scenario(fake)
+        finally:
+            fake.close()
+    return asyncio.run(main())
+
+
+def test_lookup_follows_iana_and_registrar_referrals(monkeypatch):
+    async def scenario(fake):
+        result = await lookup("Example.TEST.")
+        return fake, result
+
+    fake, result = run_with_fake(monkeypatch, scenario)
+    assert [name for name, _ in fake.queries] == ["root", "registry", "registrar"]
+    assert fake.queries[0][1] == "test"
+    assert fake.queries[1][1] == "example.test"
+    assert result["servers"] == [fake.address(fake.registry), fake.address(fake.registrar)]
+    assert "Registrant Organization: Example Org" in result["raw"]
+
+
+def test_server_map_and_responses_are_cached(monkeypatch):
+    async def scenario(fake):
+        await lookup("example.test")
+        await lookup("example.test")
+        await lookup("other.test")
+        return fake
+
+    fake = run_with_fake(monkeypatch, scenario)
+    # Racine interrogée une seule fois pour .test ; example.test servi par le cache la 2e fois
+    assert [name for name, _ in fake.queries] == ["root", "registry", "registrar", "registry", "registrar"]
+
+
+def test_unreachable_registrar_keeps_registry_answer(monkeypatch):
+    async def scenario(fake):
+        fake.registrar.close()
+        await fake.registrar.wait_closed()
+        return await lookup("example.test")
+
+    result = run_with_fake(monkeypatch, scenario)
+    assert len(result["servers"]) == 1
+    assert "Registry Expiry Date" in result["raw"]
+
+
+def test_referral_to_loopback_is_not_followed(monkeypatch):
+    async def scenario(fake):
+        return fake, await lookup("example.test")
+
+    fake, result = run_with_fake(monkeypatch, scenario, allowed=("registry",))
+    assert [name for name, _ in fake.queries] == ["root", "registry"]
+    assert result["servers"] == [fake.address(fake.registry)]
+
+
+@pytest.mark.parametrize("server", ["127.0.0.1", "localhost", "10.0.0.5", "192.168.1.1", "169.254.169.254"])
+def test_referral_address_refuses_internal_addresses(server):
+    with pytest.raises(WhoisError):
+        asyncio.run(referral_address(server))
+
+
+def test_referrals_limited_to_whois_ports():
+    assert find_referral("ReferralServer: whois://10.0.0.5:6379\n", "whois.arin.net") is None
+    assert find_referral("refer: whois.example.net:22\n", "whois.iana.org") is None
+    assert find_referral("refer: whois.example.net:43\n", "whois.iana.org") == "whois.example.net"
+    assert find_referral("ReferralServer: rwhois://rwhois.example.net\n", "whois.arin.net") == "rwhois.example.net:4321"
+    assert find_referral("ReferralServer: rwhois://rwhois.example.net:43\n", "whois.arin.net") is None
+
+
+def test_unreachable_root_raises(monkeypatch):
+    monkeypatch.setattr(whois_client, "WHOIS_ROOT_SERVER", "127.0.0.1:1")
+    with pytest.raises(WhoisError):
+        asyncio.run(lookup("example.test"))
+
+
+def test_find_referral_ignores_urls_and_current_server():
+    assert find_referral("Registrar WHOIS Server: whois://whois.example.net/\n", "whois.registry.test") == "whois.example.net"
+    assert find_referral("Registrar WHOIS Server: https://rdap.example.net\n", "whois.registry.test") is None
+    assert find_referral("whois: whois.registry.test\n", "whois.registry.test") is None
+
+
+def test_parse_whois_extracts_key_fields():
+    parsed = parse_whois(REGISTRY_RESPONSE.format(registrar="whois.example.net") + REGISTRAR_RESPONSE)
+    assert parsed["registrar"] == "Example Registrar, Inc."
+    assert parsed["creation_date"] == "1995-08-14T04:00:00Z"
+    assert parsed["updated_date"] == "2024-08-14T07:01:34Z"
+    assert parsed["expiration_date"] == "2025-08-13T04:00:00Z"
+    assert parsed["name_servers"] == ["a.iana-servers.net", "b.iana-servers.net"]
+    assert parsed["status"] == ["clientTransferProhibited"]